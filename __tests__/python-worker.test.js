@@ -0,0 +1,70 @@
+const { describe, it, after } = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { PythonWorkerPool } = require('../modules/factor/python-worker');
+
+// python/worker.py 프로토콜을 흉내내는 가짜 워커 (node로 실행)
+const FAKE = `
+const rl = require('readline').createInterface({ input: process.stdin });
+rl.on('line', (line) => {
+  const req = JSON.parse(line);
+  const reply = (body) => process.stdout.write(JSON.stringify({ id: req.id, ...body }) + '\\n');
+  if (req.op === 'ping') return reply({ ok: true, pid: process.pid, uptime_s: 0 });
+  if (req.agent === 'crash') process.exit(3);
+  if (req.agent === 'hang') return;
+  const delay = Number(req.args[0] || 0);
+  setTimeout(() => reply({ ok: true, stdout: req.agent + ':' + process.pid, stderr: '' }), delay);
+});
+`;
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'pyworker-'));
+const script = path.join(dir, 'fake-worker.js');
+fs.writeFileSync(script, FAKE);
+
+function makePool(size, timeout = 2000) {
+  return new PythonWorkerPool({ size, python: process.execPath, script, cwd: dir, timeout });
+}
+
+describe('PythonWorkerPool', () => {
+  const pools = [];
+  after(() => pools.forEach(p => p.close()));
+
+  it('같은 워커 프로세스를 재사용', async () => {
+    const pool = makePool(1); pools.push(pool);
+    const a = await pool.run('data_agent');
+    const b = await pool.run('factor_agent');
+    assert.strictEqual(a.stdout.split(':')[1], b.stdout.split(':')[1]);
+  });
+
+  it('동시 실행 수 = 워커 수', async () => {
+    const pool = makePool(2); pools.push(pool);
+    const start = Date.now();
+    await Promise.all([1, 2, 3, 4].map(() => pool.run('x', ['100'])));
+    const elapsed = Date.now() - start;
+    assert.ok(elapsed >= 190, `elapsed ${elapsed}ms`);
+    assert.ok(pool.queue.length === 0 && pool.idle.length === 2);
+  });
+
+  it('비정상 종료 시 요청 실패 후 재기동', async () => {
+    const pool = makePool(1); pools.push(pool);
+    await assert.rejects(() => pool.run('crash'), /died/);
+    const res = await pool.run('data_agent');
+    assert.strictEqual(res.ok, true);
+    assert.strictEqual(pool.workers[0].restarts, 1);
+  });
+
+  it('타임아웃 시 워커 종료 후 재기동', async () => {
+    const pool = makePool(1, 200); pools.push(pool);
+    await assert.rejects(() => pool.run('hang'), /timeout/);
+    const res = await pool.run('data_agent', [], 2000);
+    assert.strictEqual(res.ok, true);
+  });
+
+  it('헬스체크', async () => {
+    const pool = makePool(2); pools.push(pool);
+    const health = await pool.health();
+    assert.strictEqual(health.length, 2);
+    assert.ok(health.every(h => h.ok && h.pid > 0));
+  });
+});
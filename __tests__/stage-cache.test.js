@@ -0,0 +1,63 @@
+const { describe, it } = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { StageCache, pickSpec, canonical, digestOutputs } = require('../modules/integration/stage-cache');
+
+function tmpDir() {
+  return fs.mkdtempSync(path.join(os.tmpdir(), 'stage-cache-'));
+}
+
+describe('stage-cache', () => {
+  it('pickSpec — 점 경로, 없는 필드는 null', () => {
+    const spec = { name: 'a', risk_limits: { max_turnover: 0.6, daily_loss_limit: 0.03 } };
+    assert.deepStrictEqual(pickSpec(spec, ['name', 'risk_limits.max_turnover', 'portfolio.n']),
+      { name: 'a', 'risk_limits.max_turnover': 0.6, 'portfolio.n': null });
+  });
+
+  it('canonical — 키 순서 무관', () => {
+    assert.strictEqual(canonical({ b: 1, a: { d: [1, 2], c: null } }), canonical({ a: { c: null, d: [1, 2] }, b: 1 }));
+  });
+
+  it('키는 읽는 필드가 바뀔 때만 변경', () => {
+    const cache = new StageCache(tmpDir());
+    const spec = { factors: [{ id: 'f' }], cost_model: { fee_bps: 3 } };
+    const k1 = cache.key('factor', { spec: pickSpec(spec, ['factors']) });
+    const k2 = cache.key('factor', { spec: pickSpec({ ...spec, cost_model: { fee_bps: 9 } }, ['factors']) });
+    const k3 = cache.key('factor', { spec: pickSpec({ ...spec, factors: [{ id: 'g' }] }, ['factors']) });
+    assert.strictEqual(k1, k2);
+    assert.notStrictEqual(k1, k3);
+  });
+
+  it('store → restore (파일 + 디렉터리), digest 기록', () => {
+    const cache = new StageCache(tmpDir());
+    const src = tmpDir();
+    fs.writeFileSync(path.join(src, 'a.json'), '{"x":1}');
+    fs.mkdirSync(path.join(src, 'panel'));
+    fs.writeFileSync(path.join(src, 'panel', 'close.npy'), 'bin');
+    const outputs = ['a.json', 'panel', 'missing.csv'];
+
+    assert.strictEqual(cache.has('data', 'k'), false);
+    const digest = cache.store('data', 'k', src, outputs);
+    assert.strictEqual(cache.has('data', 'k'), true);
+    assert.strictEqual(cache.outputDigest('data', 'k'), digest);
+
+    // 원본을 제자리 수정해도 캐시본은 그대로
+    fs.writeFileSync(path.join(src, 'a.json'), '{"x":2}');
+    const dst = tmpDir();
+    cache.restore('data', 'k', dst, outputs);
+    assert.strictEqual(fs.readFileSync(path.join(dst, 'a.json'), 'utf-8'), '{"x":1}');
+    assert.strictEqual(fs.readFileSync(path.join(dst, 'panel', 'close.npy'), 'utf-8'), 'bin');
+    assert.strictEqual(digestOutputs(dst, outputs), digest);
+  });
+
+  it('prune — 단계별 keep개 유지', () => {
+    const cache = new StageCache(tmpDir(), { keep: 2 });
+    const src = tmpDir();
+    fs.writeFileSync(path.join(src, 'a.json'), '{}');
+    for (const k of ['k1', 'k2', 'k3']) cache.store('factor', k, src, ['a.json']);
+    const left = ['k1', 'k2', 'k3'].filter(k => cache.has('factor', k));
+    assert.strictEqual(left.length, 2);
+  });
+});
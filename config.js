@@ -100,6 +100,8 @@ const config = {
     defaultStrategy: process.env.DEFAULT_STRATEGY || 'low_per_high_roe',
     enforceWhitelist: process.env.ENFORCE_WHITELIST === 'true',
     signalMaxAgeHours: parseInt(process.env.SIGNAL_MAX_AGE_HOURS) || 48,
+    pythonWorker: process.env.PYTHON_WORKER !== 'false', // 상주 워커 사용 (false면 단계별 python3 실행)
+    pythonWorkers: parseInt(process.env.PYTHON_WORKERS) || 1, // 상주 워커 수 = 동시 실행 한도
   },
 
   // 데이터 경로
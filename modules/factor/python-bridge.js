@@ -1,17 +1,47 @@
 /**
  * Node → Python 워커 호출 브릿지
- * child_process.execFile로 Python 스크립트 실행, JSON stdio 통신
+ * 기본: 상주 워커 풀(python/worker.py)에 JSON-lines 요청
+ * PYTHON_WORKER=false: child_process.execFile로 단계마다 Python 스크립트 실행
  */
 const { execFile } = require('child_process');
 const path = require('path');
+const config = require('../../config');
 const logger = require('../../utils/logger');
+const { PythonWorkerPool } = require('./python-worker');
 
 const MOD = 'PyBridge';
 const PYTHON_DIR = path.join(__dirname, '..', '..', 'python');
 const PYTHON = path.join(PYTHON_DIR, '.venv', 'bin', 'python3');
 const TIMEOUT = 60000; // 60초
 
+let pool = null;
+
+function getWorkerPool() {
+  if (!pool) {
+    pool = new PythonWorkerPool({
+      size: config.pipeline.pythonWorkers,
+      python: PYTHON,
+      script: path.join(PYTHON_DIR, 'worker.py'),
+      cwd: PYTHON_DIR,
+      timeout: TIMEOUT,
+    });
+  }
+  return pool;
+}
+
+async function runInWorker(script, args) {
+  logger.info(MOD, `실행(worker): ${script} ${args.join(' ')}`);
+  const res = await getWorkerPool().run(script.replace(/\.py$/, ''), args);
+  if (res.stderr) logger.info(MOD, res.stderr.trim());
+  if (!res.ok) {
+    logger.error(MOD, `실패: ${script} — ${res.error}`);
+    throw new Error(`${script} failed: ${res.error}\n${res.stderr || ''}`);
+  }
+  return (res.stdout || '').trim();
+}
+
 function runPython(script, args = []) {
+  if (config.pipeline.pythonWorker) return runInWorker(script, args);
   return new Promise((resolve, reject) => {
     const scriptPath = path.join(PYTHON_DIR, script);
     const opts = { timeout: TIMEOUT, cwd: PYTHON_DIR, maxBuffer: 10 * 1024 * 1024 };
@@ -29,31 +59,93 @@ function runPython(script, args = []) {
   });
 }
 
-async function runDataAgent(specPath, dataDir, outputDir) {
-  return runPython('data_agent.py', ['--spec', specPath, '--data-dir', dataDir, '--output', outputDir]);
+/**
+ * 관측 옵션 → 에이전트 인자 ({ telemetry: 사이드카 JSON 경로, profile: cProfile 덤프 경로 })
+ */
+function observeArgs({ telemetry = null, profile = null } = {}) {
+  const args = [];
+  if (telemetry) args.push('--telemetry', telemetry);
+  if (profile) args.push('--profile', profile);
+  return args;
 }
 
-async function runFactorAgent(specPath, inputDir, outputDir) {
-  return runPython('factor_agent.py', ['--spec', specPath, '--input', inputDir, '--output', outputDir]);
+async function runDataAgent(specPath, dataDir, outputDir, observe = {}) {
+  return runPython('data_agent.py', ['--spec', specPath, '--data-dir', dataDir, '--output', outputDir,
+    ...observeArgs(observe)]);
 }
 
-async function runPortfolioAgent(specPath, inputDir, outputDir, prevWeights = null) {
+/**
+ * 공유 패널(panelDir, 다른 data_agent 출력)을 참조하고 리밸런싱 일정만 outputDir에 기록 — 배치 실행용
+ */
+async function runDataLink(specPath, panelDir, outputDir, observe = {}) {
+  return runPython('data_agent.py', ['--spec', specPath, '--panel-from', panelDir, '--output', outputDir,
+    ...observeArgs(observe)]);
+}
+
+async function runFactorAgent(specPath, inputDir, outputDir, factorStore = null, observe = {}) {
+  const args = ['--spec', specPath, '--input', inputDir, '--output', outputDir];
+  if (factorStore) args.push('--factor-store', factorStore);
+  return runPython('factor_agent.py', [...args, ...observeArgs(observe)]);
+}
+
+async function runPortfolioAgent(specPath, inputDir, outputDir, prevWeights = null, observe = {}) {
   const args = ['--spec', specPath, '--input', inputDir, '--output', outputDir];
   if (prevWeights) args.push('--prev-weights', prevWeights);
-  return runPython('portfolio_agent.py', args);
+  return runPython('portfolio_agent.py', [...args, ...observeArgs(observe)]);
 }
 
-async function runBacktestAgent(specPath, dataDir, weightsPath, outputDir) {
+async function runBacktestAgent(specPath, dataDir, weightsPath, outputDir, observe = {}) {
   return runPython('backtest_agent.py', [
     '--spec', specPath, '--data-dir', dataDir, '--weights', weightsPath, '--output', outputDir,
+    ...observeArgs(observe),
   ]);
 }
 
-async function runReporterAgent(runDir, signalsPath, weightsPath) {
+async function runReporterAgent(runDir, signalsPath, weightsPath, observe = {}) {
   const args = ['--run-dir', runDir];
   if (signalsPath) args.push('--signals', signalsPath);
   if (weightsPath) args.push('--weights', weightsPath);
-  return runPython('reporter_agent.py', args);
+  return runPython('reporter_agent.py', [...args, ...observeArgs(observe)]);
+}
+
+async function runPipeline(specPath, dataDir, runDir, artifactsDir = null, observe = {}) {
+  const args = ['--spec', specPath, '--data-dir', dataDir, '--run-dir', runDir];
+  if (artifactsDir) args.push('--artifacts', artifactsDir);
+  return runPython('pipeline.py', [...args, ...observeArgs(observe)]);
+}
+
+/**
+ * 라이브 트랙 증분 갱신 — 새 거래일 일봉(candlesPath)만 반영 (상태는 stateDir, 최초 1회는 runDailySeed)
+ */
+async function runDailyAgent(specPath, stateDir, candlesPath, dataDir, observe = {}) {
+  return runPython('daily_agent.py', ['--spec', specPath, '--state', stateDir, '--candles', candlesPath,
+    '--data-dir', dataDir, ...observeArgs(observe)]);
+}
+
+/**
+ * 라이브 트랙 초기화 — data_agent 출력 + weights.json의 백테스트 곡선으로 시작
+ */
+async function runDailySeed(specPath, stateDir, inputDir, weightsPath, observe = {}) {
+  return runPython('daily_agent.py', ['--spec', specPath, '--state', stateDir, '--seed', '--input', inputDir,
+    '--weights', weightsPath, ...observeArgs(observe)]);
+}
+
+/**
+ * 실행 디렉터리를 레지스트리(runs/registry.sqlite)에 색인 — 캐시 복원으로 에이전트가 기록하지 않은 실행용
+ */
+async function runRegistryIndex(runDir) {
+  return runPython('registry.py', ['index', '--run-dir', runDir]);
+}
+
+async function health() {
+  if (!config.pipeline.pythonWorker) return { mode: 'exec', workers: [] };
+  return { mode: 'worker', workers: await getWorkerPool().health() };
+}
+
+function shutdown() {
+  if (pool) pool.close();
+  pool = null;
 }
 
-module.exports = { runPython, runDataAgent, runFactorAgent, runPortfolioAgent, runBacktestAgent, runReporterAgent };
+module.exports = { runPython, health, shutdown, runDataAgent, runDataLink, runFactorAgent, runPortfolioAgent, runBacktestAgent, runReporterAgent,
+  runPipeline, runRegistryIndex, runDailyAgent, runDailySeed };
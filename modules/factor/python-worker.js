@@ -0,0 +1,139 @@
+/**
+ * 상주 Python 워커 풀
+ * python/worker.py를 띄워두고 JSON-lines(stdio)로 에이전트 실행 요청
+ * - 동시 실행 수 = 워커 수 (초과 요청은 대기열)
+ * - 워커 비정상 종료 시 진행 중 요청 실패 처리 후 다음 요청에서 자동 재기동
+ * - 요청 타임아웃 시 해당 워커 강제 종료 (재기동 대상)
+ */
+const { spawn } = require('child_process');
+const readline = require('readline');
+const logger = require('../../utils/logger');
+
+const MOD = 'PyWorker';
+
+class PythonWorker {
+  constructor(id, { python, script, cwd, timeout = 60000 }) {
+    this.id = id;
+    this.python = python;
+    this.script = script;
+    this.cwd = cwd;
+    this.timeout = timeout;
+    this.proc = null;
+    this.pending = new Map();
+    this.seq = 0;
+    this.restarts = -1; // 첫 기동은 재기동으로 세지 않음
+  }
+
+  get alive() {
+    return this.proc !== null;
+  }
+
+  start() {
+    if (this.proc) return;
+    this.restarts += 1;
+    const proc = spawn(this.python, [this.script], { cwd: this.cwd, stdio: ['pipe', 'pipe', 'pipe'] });
+    this.proc = proc;
+
+    readline.createInterface({ input: proc.stdout }).on('line', (line) => {
+      let msg;
+      try { msg = JSON.parse(line); } catch { return logger.info(MOD, `#${this.id} ${line}`); }
+      const entry = this.pending.get(msg.id);
+      if (!entry) return;
+      this.pending.delete(msg.id);
+      clearTimeout(entry.timer);
+      entry.resolve(msg);
+    });
+    proc.stdin.on('error', (err) => logger.warn(MOD, `#${this.id} stdin: ${err.message}`));
+    proc.stderr.on('data', (buf) => logger.info(MOD, `#${this.id} ${buf.toString().trim()}`));
+    proc.on('error', (err) => this._onExit(proc, `spawn error: ${err.message}`));
+    proc.on('exit', (code, signal) => this._onExit(proc, `exit code=${code} signal=${signal}`));
+    logger.info(MOD, `#${this.id} 기동 (pid=${proc.pid})`);
+  }
+
+  _onExit(proc, reason) {
+    if (this.proc !== proc) return;
+    this.proc = null;
+    if (this.pending.size > 0) logger.warn(MOD, `#${this.id} 비정상 종료: ${reason}`);
+    for (const entry of this.pending.values()) {
+      clearTimeout(entry.timer);
+      entry.reject(new Error(`python worker #${this.id} died: ${reason}`));
+    }
+    this.pending.clear();
+  }
+
+  request(payload, timeout = this.timeout) {
+    this.start();
+    const id = ++this.seq;
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`python worker #${this.id} timeout after ${timeout}ms`));
+        this.kill();
+      }, timeout);
+      this.pending.set(id, { resolve, reject, timer });
+      this.proc.stdin.write(JSON.stringify({ ...payload, id }) + '\n');
+    });
+  }
+
+  kill() {
+    const proc = this.proc;
+    if (!proc) return;
+    this._onExit(proc, 'killed'); // 종료 이벤트 전에 분리 → 다음 요청은 새 프로세스로
+    proc.kill('SIGKILL');
+  }
+
+  stop() {
+    if (this.proc) this.proc.stdin.end();
+  }
+}
+
+class PythonWorkerPool {
+  constructor({ size = 1, ...opts }) {
+    this.workers = Array.from({ length: Math.max(1, size) }, (_, i) => new PythonWorker(i + 1, opts));
+    this.idle = [...this.workers];
+    this.queue = [];
+  }
+
+  _acquire() {
+    if (this.idle.length > 0) return Promise.resolve(this.idle.shift());
+    return new Promise(resolve => this.queue.push(resolve));
+  }
+
+  _release(worker) {
+    const next = this.queue.shift();
+    if (next) next(worker);
+    else this.idle.push(worker);
+  }
+
+  /**
+   * 에이전트 실행 — 응답 {ok, stdout, stderr, error, duration_ms}
+   */
+  async run(agent, args = [], timeout) {
+    const worker = await this._acquire();
+    try {
+      return await worker.request({ op: 'run', agent, args }, timeout);
+    } finally {
+      this._release(worker);
+    }
+  }
+
+  /**
+   * 헬스체크 — 워커별 ping (워커가 에이전트 실행 중이어도 즉시 응답, 미기동 워커는 기동)
+   */
+  async health(timeout = 15000) {
+    return Promise.all(this.workers.map(async (w) => {
+      try {
+        const res = await w.request({ op: 'ping' }, timeout);
+        return { id: w.id, ok: res.ok, pid: res.pid, uptimeS: res.uptime_s, restarts: w.restarts };
+      } catch (err) {
+        return { id: w.id, ok: false, error: err.message, restarts: w.restarts };
+      }
+    }));
+  }
+
+  close() {
+    for (const w of this.workers) w.stop();
+  }
+}
+
+module.exports = { PythonWorker, PythonWorkerPool };
@@ -3,18 +3,173 @@
  *
  * Spec → Data → Factors → Portfolio → Backtest → Report
  * 각 단계 실패 시 즉시 중단 (fail-closed)
+ * inProcess 옵션: python/pipeline.py 한 번 호출로 전 단계를 메모리 전달 실행
+ * 단계별 실행은 stage-cache로 키 적중 시 산출물 재사용 (cache: false로 비활성)
+ * 실행한 단계는 에이전트 텔레메트리 사이드카(<runDir>/telemetry/<step>.json)를 steps[].telemetry로 병합
+ * profile: true면 단계별 cProfile 덤프(<runDir>/profile/<step>.prof) 추가
+ * 결과는 runs/registry.sqlite에 색인 (python/registry.py로 조회·비교)
+ * runBatch: strategies/의 모든 스펙 실행 — 가격/재무 패널은 data/processed/_shared에 1회 빌드하고
+ *   전략별 data 단계는 패널 참조(panel_ref.json) + 리밸런싱 일정만 기록, 이후 단계는 동시 실행 한도 내 병렬
  */
 const fs = require('fs');
 const path = require('path');
 const logger = require('../../utils/logger');
 const bridge = require('../factor/python-bridge');
+const config = require('../../config');
+const { asyncPool } = require('../../utils/pool');
+const { StageCache, pickSpec, digestTree, digestFiles, digestOutputs } = require('./stage-cache');
 
 const MOD = 'Pipeline';
 const BASE_DIR = path.join(__dirname, '..', '..');
 const DATA_DIR = path.join(BASE_DIR, 'data');
 const RUNS_DIR = path.join(BASE_DIR, 'runs');
+const STRATEGIES_DIR = path.join(BASE_DIR, 'strategies');
+const PYTHON_DIR = path.join(BASE_DIR, 'python');
+const CACHE_DIR = path.join(DATA_DIR, 'cache', 'stages');
+const FACTOR_STORE_DIR = path.join(DATA_DIR, 'cache', 'factors');
+const SHARED_DIR = path.join(DATA_DIR, 'processed', '_shared');
 
-async function run(specPath) {
+// 단계 정의: 읽는 스펙 필드 / 산출물 (캐시 키·복원 대상)
+const STAGES = {
+  data: { script: 'data_agent.py', spec: ['rebalance'], outputs: ['panel', 'fundamentals', 'panel_ref.json', 'rebalance_dates.json', 'data_summary.json'] },
+  // 배치 실행: 공유 패널 1회 빌드 / 전략별로는 패널 참조 + 리밸런싱 일정만
+  panel: { script: 'data_agent.py', spec: [], outputs: ['panel', 'fundamentals', 'data_summary.json'] },
+  link: { script: 'data_agent.py', spec: ['rebalance'], outputs: ['panel_ref.json', 'rebalance_dates.json', 'data_summary.json', 'panel', 'fundamentals'] },
+  factor: { script: 'factor_agent.py', spec: ['factors', 'signal'], outputs: ['signals.csv', 'factor_summary.json', 'signal_history'] },
+  portfolio: { script: 'portfolio_agent.py', spec: ['portfolio', 'risk_limits.max_turnover'], outputs: ['weights.json', 'portfolio_summary.json', 'weight_history'] },
+  backtest: { script: 'backtest_agent.py', spec: ['name', 'cost_model', 'walk_forward', 'bootstrap', 'factors', 'signal', 'portfolio'], outputs: ['run_result.json', 'trades.csv'] },
+  report: { script: 'reporter_agent.py', spec: [], outputs: ['report.md'] },
+};
+
+/**
+ * 에이전트 코드 digest — 에이전트끼리 서로 import하므로(backtest → factor/portfolio 등)
+ * 단계 스크립트만이 아니라 python/*.py + python/core/*.{py,json}(sector_map.json 등) 전체를 해시
+ */
+function codeDigest() {
+  const listed = (dir, exts) => (fs.existsSync(dir)
+    ? fs.readdirSync(dir).filter(f => exts.includes(path.extname(f))).map(f => path.join(dir, f))
+    : []);
+  return digestFiles([...listed(PYTHON_DIR, ['.py']), ...listed(path.join(PYTHON_DIR, 'core'), ['.py', '.json'])]);
+}
+
+/**
+ * 단계별 관측 옵션 (python-bridge observeArgs 형식)
+ */
+function observeOptions(ctx, name) {
+  return {
+    telemetry: path.join(ctx.runDir, 'telemetry', `${name}.json`),
+    profile: ctx.profile ? path.join(ctx.runDir, 'profile', `${name}.prof`) : null,
+  };
+}
+
+function readTelemetry(file) {
+  try {
+    return JSON.parse(fs.readFileSync(file, 'utf-8'));
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * 단계 텔레메트리 합계 (실행된 단계만 — 캐시 적중 단계는 측정값 없음)
+ */
+function summarizeTelemetry(steps) {
+  const records = steps.map(s => s.telemetry).filter(Boolean);
+  if (records.length === 0) return null;
+  const sum = key => records.reduce((acc, r) => acc + (r[key] || 0), 0);
+  return {
+    measured_steps: records.length,
+    wall_ms: Math.round(sum('wall_ms')),
+    cpu_ms: Math.round(sum('cpu_ms')),
+    peak_rss_mb: Math.max(...records.map(r => r.peak_rss_mb || 0)),
+    bytes_read: sum('bytes_read'),
+    bytes_written: sum('bytes_written'),
+  };
+}
+
+/**
+ * 캐시 적중이면 산출물 복원, 아니면 실행 후 저장. 반환값(산출물 내용 digest)은 다음 단계 입력.
+ */
+async function cachedStep(ctx, name, inputs, outDir, exec) {
+  const def = STAGES[name];
+  const key = ctx.cache.key(name, {
+    spec: pickSpec(ctx.spec, def.spec),
+    code: codeDigest(),
+    inputs,
+  });
+  const hit = ctx.useCache && ctx.cache.has(name, key);
+  const step = { step: name, status: 'ok', cache: hit ? 'hit' : 'miss', key: key.slice(0, 12) };
+  let digest;
+  if (hit) {
+    ctx.cache.restore(name, key, outDir, def.outputs);
+    digest = ctx.cache.outputDigest(name, key);
+  } else {
+    const observe = observeOptions(ctx, name);
+    try {
+      await exec(observe);
+    } finally {
+      const telemetry = readTelemetry(observe.telemetry);
+      if (telemetry) step.telemetry = telemetry;
+    }
+    digest = ctx.useCache ? ctx.cache.store(name, key, outDir, def.outputs) : digestOutputs(outDir, def.outputs);
+  }
+  ctx.status.steps.push(step);
+  return digest;
+}
+
+function rawDigest() {
+  return {
+    historical: digestTree(path.join(DATA_DIR, 'historical')),
+    fundamentals: digestTree(path.join(DATA_DIR, 'fundamentals')),
+  };
+}
+
+async function runStages(ctx, specPath, runDir, processedDir) {
+  // Step 1: Data Agent (배치 실행이면 공유 패널 참조만)
+  logger.info(MOD, `[1/5] Data Agent 실행`);
+  let dataDigest;
+  if (ctx.shared) {
+    const linkDigest = await cachedStep(ctx, 'link', { panel: ctx.shared.digest }, processedDir,
+      observe => bridge.runDataLink(specPath, ctx.shared.dir, processedDir, observe));
+    dataDigest = `${ctx.shared.digest}:${linkDigest}`;
+  } else {
+    dataDigest = await cachedStep(ctx, 'data', rawDigest(), processedDir,
+      observe => bridge.runDataAgent(specPath, DATA_DIR, processedDir, observe));
+  }
+
+  // Step 2: Factor Agent
+  logger.info(MOD, `[2/5] Factor Agent 실행`);
+  const factorDigest = await cachedStep(ctx, 'factor', { data: dataDigest }, processedDir,
+    observe => bridge.runFactorAgent(specPath, processedDir, processedDir, FACTOR_STORE_DIR, observe));
+
+  // Step 3: Portfolio Agent
+  logger.info(MOD, `[3/5] Portfolio Agent 실행`);
+  const portfolioDigest = await cachedStep(ctx, 'portfolio', { data: dataDigest, factor: factorDigest }, processedDir,
+    observe => bridge.runPortfolioAgent(specPath, processedDir, processedDir, null, observe));
+
+  const weightsPath = path.join(processedDir, 'weights.json');
+
+  // Step 4: Backtest Agent
+  logger.info(MOD, `[4/5] Backtest Agent 실행`);
+  const backtestDigest = await cachedStep(ctx, 'backtest', { data: dataDigest, portfolio: portfolioDigest }, runDir,
+    observe => bridge.runBacktestAgent(specPath, processedDir, weightsPath, runDir, observe));
+
+  // Step 5: Reporter Agent
+  logger.info(MOD, `[5/5] Reporter Agent 실행`);
+  const signalsPath = path.join(processedDir, 'signals.csv');
+  await cachedStep(ctx, 'report', { backtest: backtestDigest, factor: factorDigest, portfolio: portfolioDigest }, runDir,
+    observe => bridge.runReporterAgent(runDir, signalsPath, weightsPath, observe));
+
+  // 캐시에서 복원된 결과는 에이전트가 레지스트리에 기록하지 않았으므로 파일에서 색인
+  if (ctx.status.steps.some(s => ['backtest', 'report'].includes(s.step) && s.cache === 'hit')) {
+    await bridge.runRegistryIndex(runDir);
+  }
+}
+
+/**
+ * 스펙 1개 실행. shared/stageCache는 runBatch 내부용 (공유 패널 { dir, digest }, 배치 공용 캐시).
+ */
+async function run(specPath, { inProcess = false, cache = true, profile = false, shared = null, stageCache = null } = {}) {
   const startTime = Date.now();
   specPath = path.resolve(specPath);
   const spec = JSON.parse(fs.readFileSync(specPath, 'utf-8'));
@@ -29,44 +184,37 @@ async function run(specPath) {
 
   // 스펙 복사 (재현성)
   fs.copyFileSync(specPath, path.join(runDir, 'strategy_spec.json'));
+  // 같은 날 재실행 시 이전 텔레메트리/프로파일이 섞이지 않도록
+  fs.rmSync(path.join(runDir, 'telemetry'), { recursive: true, force: true });
+  fs.rmSync(path.join(runDir, 'profile'), { recursive: true, force: true });
 
   const status = { runId, strategy: strategyName, steps: [], error: null };
 
   try {
-    // Step 1: Data Agent
-    logger.info(MOD, `[1/5] Data Agent 실행`);
-    await bridge.runDataAgent(specPath, DATA_DIR, processedDir);
-    status.steps.push({ step: 'data', status: 'ok' });
-
-    // Step 2: Factor Agent
-    logger.info(MOD, `[2/5] Factor Agent 실행`);
-    await bridge.runFactorAgent(specPath, processedDir, processedDir);
-    status.steps.push({ step: 'factor', status: 'ok' });
-
-    // Step 3: Portfolio Agent
-    logger.info(MOD, `[3/5] Portfolio Agent 실행`);
-    await bridge.runPortfolioAgent(specPath, processedDir, processedDir);
-    status.steps.push({ step: 'portfolio', status: 'ok' });
-
-    const weightsPath = path.join(processedDir, 'weights.json');
-
-    // Step 4: Backtest Agent
-    logger.info(MOD, `[4/5] Backtest Agent 실행`);
-    await bridge.runBacktestAgent(specPath, processedDir, weightsPath, runDir);
-    status.steps.push({ step: 'backtest', status: 'ok' });
-
-    // Step 5: Reporter Agent
-    logger.info(MOD, `[5/5] Reporter Agent 실행`);
-    const signalsPath = path.join(processedDir, 'signals.csv');
-    await bridge.runReporterAgent(runDir, signalsPath, weightsPath);
-    status.steps.push({ step: 'report', status: 'ok' });
+    if (inProcess) {
+      // 단일 프로세스: 중간 산출물은 advisory-engine이 읽는 processedDir에만 저장
+      logger.info(MOD, `[1/1] In-process pipeline 실행`);
+      const observe = observeOptions({ runDir, profile }, 'pipeline');
+      await bridge.runPipeline(specPath, DATA_DIR, runDir, processedDir, observe);
+      const telemetry = readTelemetry(observe.telemetry);
+      status.steps.push({ step: 'pipeline', status: 'ok', ...(telemetry ? { telemetry } : {}) });
+    } else {
+      const ctx = { spec, status, runDir, profile, shared, cache: stageCache || new StageCache(CACHE_DIR), useCache: cache };
+      await runStages(ctx, specPath, runDir, processedDir);
+      status.cache = {
+        hits: status.steps.filter(s => s.cache === 'hit').length,
+        misses: status.steps.filter(s => s.cache === 'miss').length,
+      };
+    }
 
     status.duration_ms = Date.now() - startTime;
+    status.telemetry = summarizeTelemetry(status.steps);
     logger.info(MOD, `완료: ${runId} (${status.duration_ms}ms)`);
 
   } catch (error) {
     status.error = error.message;
     status.duration_ms = Date.now() - startTime;
+    status.telemetry = summarizeTelemetry(status.steps);
     logger.error(MOD, `실패: ${error.message}`);
   }
 
@@ -75,16 +223,104 @@ async function run(specPath) {
   return status;
 }
 
+function listSpecs(strategiesDir) {
+  return fs.readdirSync(strategiesDir)
+    .filter(f => f.endsWith('.json'))
+    .sort()
+    .map(f => path.join(strategiesDir, f));
+}
+
+/**
+ * strategies/의 모든 스펙 실행 — 패널 1회 빌드 후 전략별 단계를 concurrency개씩 병렬 실행
+ * 상주 워커 모드에서는 워커 수(PYTHON_WORKERS)가 실제 병렬도 상한
+ */
+async function runBatch({ strategiesDir = STRATEGIES_DIR, concurrency = config.pipeline.pythonWorkers,
+  cache = true, profile = false } = {}) {
+  if (!Number.isInteger(concurrency) || concurrency < 1) {
+    throw new Error(`concurrency는 1 이상 정수: ${concurrency}`);
+  }
+  const startTime = Date.now();
+  const specs = listSpecs(strategiesDir);
+  const today = new Date().toISOString().slice(0, 10);
+  const batchDir = path.join(RUNS_DIR, `${today}_batch`);
+  fs.mkdirSync(batchDir, { recursive: true });
+  fs.rmSync(path.join(batchDir, 'telemetry'), { recursive: true, force: true });
+  fs.rmSync(path.join(batchDir, 'profile'), { recursive: true, force: true });
+
+  const status = { batchId: path.basename(batchDir), concurrency, steps: [], runs: [], error: null };
+  // 전략 수만큼 단계 항목이 쌓이므로 배치 1회분은 LRU에서 밀려나지 않게
+  const stageCache = new StageCache(CACHE_DIR, { keep: Math.max(10, specs.length * 2) });
+
+  try {
+    if (specs.length === 0) throw new Error(`스펙 없음: ${strategiesDir}`);
+    // 전략명이 실행/중간 산출물 디렉터리 이름 — 겹치면 병렬 실행끼리 덮어씀
+    const names = specs.map(f => JSON.parse(fs.readFileSync(f, 'utf-8')).name || 'unnamed');
+    const dup = names.find((n, i) => names.indexOf(n) !== i);
+    if (dup) throw new Error(`전략명 중복: ${dup}`);
+
+    // 공유 패널 (리밸런싱 일정은 전략별 link 단계에서 계산)
+    logger.info(MOD, `[batch] 공유 패널 빌드 (${specs.length} strategies)`);
+    const spec = JSON.parse(fs.readFileSync(specs[0], 'utf-8'));
+    const ctx = { spec, status, runDir: batchDir, profile, cache: stageCache, useCache: cache };
+    fs.mkdirSync(SHARED_DIR, { recursive: true });
+    const digest = await cachedStep(ctx, 'panel', rawDigest(), SHARED_DIR,
+      observe => bridge.runDataAgent(specs[0], DATA_DIR, SHARED_DIR, observe));
+    const shared = { dir: SHARED_DIR, digest };
+
+    logger.info(MOD, `[batch] 전략 ${specs.length}개 실행 (동시 ${concurrency})`);
+    const settled = await asyncPool(concurrency, specs,
+      specPath => run(specPath, { cache, profile, shared, stageCache }));
+    status.runs = settled.map((r, i) => (r.status === 'fulfilled'
+      ? { runId: r.value.runId, strategy: r.value.strategy, error: r.value.error, duration_ms: r.value.duration_ms }
+      : { spec: path.basename(specs[i]), error: r.reason && r.reason.message }));
+    const failed = status.runs.filter(r => r.error).length;
+    if (failed) status.error = `${failed}/${specs.length} strategies failed`;
+  } catch (error) {
+    status.error = error.message;
+    logger.error(MOD, `[batch] 실패: ${error.message}`);
+  }
+
+  status.duration_ms = Date.now() - startTime;
+  status.telemetry = summarizeTelemetry(status.steps);
+  logger.info(MOD, `[batch] 완료: ${status.batchId} (${status.duration_ms}ms)`);
+  fs.writeFileSync(path.join(batchDir, 'batch_status.json'), JSON.stringify(status, null, 2));
+  return status;
+}
+
+function argValue(name) {
+  const i = process.argv.indexOf(name);
+  return i >= 0 ? process.argv[i + 1] : undefined;
+}
+
 // CLI 직접 실행
 if (require.main === module) {
   const specPath = process.argv[2];
-  if (!specPath) {
-    console.error('Usage: node pipeline-runner.js <strategy_spec.json>');
+  const batch = process.argv.includes('--batch');
+  if (!specPath || (!batch && specPath.startsWith('--'))) {
+    console.error('Usage: node pipeline-runner.js <strategy_spec.json> [--in-process] [--no-cache] [--profile]');
+    console.error('       node pipeline-runner.js --batch [--strategies DIR] [--concurrency N] [--no-cache] [--profile]');
+    process.exit(1);
+  }
+  const concurrency = argValue('--concurrency');
+  if (batch && concurrency !== undefined && !/^[1-9]\d*$/.test(concurrency)) {
+    console.error(`--concurrency는 1 이상 정수: ${concurrency}`);
     process.exit(1);
   }
-  run(path.resolve(specPath))
+  const options = {
+    cache: !process.argv.includes('--no-cache'),
+    profile: process.argv.includes('--profile'),
+  };
+  const job = batch
+    ? runBatch({
+      ...options,
+      ...(argValue('--strategies') ? { strategiesDir: path.resolve(argValue('--strategies')) } : {}),
+      ...(concurrency ? { concurrency: Number(concurrency) } : {}),
+    })
+    : run(path.resolve(specPath), { ...options, inProcess: process.argv.includes('--in-process') });
+  job
     .then(s => console.log(JSON.stringify(s, null, 2)))
-    .catch(e => { console.error(e); process.exit(1); });
+    .catch(e => { console.error(e); process.exitCode = 1; })
+    .finally(() => bridge.shutdown());
 }
 
-module.exports = { run };
+module.exports = { run, runBatch };
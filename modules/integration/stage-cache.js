@@ -0,0 +1,183 @@
+/**
+ * 파이프라인 단계 캐시 (content-addressed)
+ *
+ * 단계 키 = hash(단계명 + 단계가 읽는 스펙 필드 + 코드 digest + 입력 digest)
+ * 입력 digest: 원천 데이터는 파일 stat(이름/크기/mtime), 앞 단계 산출물은 내용 digest
+ * → 앞 단계가 재실행돼도 산출물이 같으면 뒤 단계는 캐시 적중
+ *
+ * 저장: <root>/<stage>/<key>/ 에 산출물 복사 (지원 FS면 reflink)
+ * 하드링크는 쓰지 않음 — 에이전트가 JSON/CSV를 제자리 덮어쓰면 캐시본까지 바뀜
+ */
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+
+function sha256(data) {
+  return crypto.createHash('sha256').update(data).digest('hex');
+}
+
+/**
+ * 스펙에서 경로 목록에 해당하는 필드만 추출 ('risk_limits.max_turnover' 형식 지원)
+ */
+function pickSpec(spec, fields) {
+  const out = {};
+  for (const field of fields) {
+    const value = field.split('.').reduce((o, k) => (o == null ? undefined : o[k]), spec);
+    out[field] = value === undefined ? null : value;
+  }
+  return out;
+}
+
+/**
+ * 키 정렬 JSON (같은 내용이면 같은 문자열)
+ */
+function canonical(value) {
+  if (Array.isArray(value)) return `[${value.map(canonical).join(',')}]`;
+  if (value && typeof value === 'object') {
+    return `{${Object.keys(value).sort().map(k => `${JSON.stringify(k)}:${canonical(value[k])}`).join(',')}}`;
+  }
+  return JSON.stringify(value);
+}
+
+function listFiles(dir, base = dir) {
+  if (!fs.existsSync(dir)) return [];
+  const out = [];
+  for (const ent of fs.readdirSync(dir, { withFileTypes: true })) {
+    const full = path.join(dir, ent.name);
+    if (ent.isDirectory()) out.push(...listFiles(full, base));
+    else if (ent.isFile()) out.push(path.relative(base, full));
+  }
+  return out.sort();
+}
+
+/**
+ * 디렉터리 stat digest (이름/크기/mtime) — 원천 데이터용, 내용은 읽지 않음
+ */
+function digestTree(dir, { exclude = [] } = {}) {
+  const lines = listFiles(dir)
+    .filter(rel => !exclude.some(prefix => rel.startsWith(prefix)))
+    .map(rel => {
+      const st = fs.statSync(path.join(dir, rel));
+      return `${rel}\t${st.size}\t${st.mtimeMs}`;
+    });
+  return sha256(lines.join('\n'));
+}
+
+/**
+ * 파일 내용 digest — 에이전트 코드용
+ */
+function digestFiles(files) {
+  const hash = crypto.createHash('sha256');
+  for (const f of [...files].sort()) {
+    hash.update(f);
+    hash.update(fs.existsSync(f) ? fs.readFileSync(f) : '');
+  }
+  return hash.digest('hex');
+}
+
+/**
+ * 산출물 내용 digest (파일/디렉터리, 없는 산출물도 구분)
+ */
+function digestOutputs(dir, outputs) {
+  const files = [];
+  for (const name of outputs) {
+    const full = path.join(dir, name);
+    if (!fs.existsSync(full)) files.push(`${full}#missing`);
+    else if (fs.statSync(full).isDirectory()) files.push(...listFiles(full).map(rel => path.join(full, rel)));
+    else files.push(full);
+  }
+  const hash = crypto.createHash('sha256');
+  for (const f of files) {
+    hash.update(path.relative(dir, f));
+    if (fs.existsSync(f)) hash.update(fs.readFileSync(f));
+  }
+  return hash.digest('hex');
+}
+
+function copyTree(src, dst) {
+  if (fs.statSync(src).isDirectory()) {
+    fs.mkdirSync(dst, { recursive: true });
+    for (const name of fs.readdirSync(src)) copyTree(path.join(src, name), path.join(dst, name));
+    return;
+  }
+  fs.copyFileSync(src, dst, fs.constants.COPYFILE_FICLONE);
+}
+
+class StageCache {
+  constructor(root, { keep = 10 } = {}) {
+    this.root = root;
+    this.keep = keep;
+  }
+
+  key(stage, parts) {
+    return sha256(canonical({ stage, ...parts }));
+  }
+
+  entryDir(stage, key) {
+    return path.join(this.root, stage, key);
+  }
+
+  has(stage, key) {
+    return fs.existsSync(path.join(this.entryDir(stage, key), '.complete'));
+  }
+
+  /**
+   * 저장 시 기록한 산출물 내용 digest
+   */
+  outputDigest(stage, key) {
+    return JSON.parse(fs.readFileSync(path.join(this.entryDir(stage, key), '.complete'), 'utf-8')).digest;
+  }
+
+  /**
+   * 캐시 산출물 → targetDir 복원 (기존 동명 산출물은 교체)
+   */
+  restore(stage, key, targetDir, outputs) {
+    const dir = this.entryDir(stage, key);
+    fs.mkdirSync(targetDir, { recursive: true });
+    for (const name of outputs) {
+      const src = path.join(dir, name);
+      const dst = path.join(targetDir, name);
+      fs.rmSync(dst, { recursive: true, force: true });
+      if (fs.existsSync(src)) copyTree(src, dst);
+    }
+    const now = new Date();
+    fs.utimesSync(path.join(dir, '.complete'), now, now); // LRU 기준 갱신
+  }
+
+  /**
+   * srcDir 산출물 → 캐시 저장 (tmp에 쓰고 rename, 없는 산출물은 건너뜀). 산출물 digest 반환.
+   */
+  store(stage, key, srcDir, outputs) {
+    const digest = digestOutputs(srcDir, outputs);
+    const dir = this.entryDir(stage, key);
+    const tmp = `${dir}.tmp-${process.pid}`;
+    fs.rmSync(tmp, { recursive: true, force: true });
+    fs.mkdirSync(tmp, { recursive: true });
+    for (const name of outputs) {
+      const src = path.join(srcDir, name);
+      if (fs.existsSync(src)) copyTree(src, path.join(tmp, name));
+    }
+    fs.writeFileSync(path.join(tmp, '.complete'), JSON.stringify({ stage, key, outputs, digest }));
+    fs.rmSync(dir, { recursive: true, force: true });
+    fs.renameSync(tmp, dir);
+    this.prune(stage);
+    return digest;
+  }
+
+  /**
+   * 단계별 최근 사용 keep개만 유지
+   */
+  prune(stage) {
+    const stageDir = path.join(this.root, stage);
+    const entries = fs.readdirSync(stageDir)
+      .map(name => ({ name, marker: path.join(stageDir, name, '.complete') }))
+      .filter(e => fs.existsSync(e.marker))
+      .map(e => ({ ...e, mtime: fs.statSync(e.marker).mtimeMs }))
+      .sort((a, b) => b.mtime - a.mtime);
+    for (const e of entries.slice(this.keep)) {
+      fs.rmSync(path.join(stageDir, e.name), { recursive: true, force: true });
+    }
+  }
+}
+
+module.exports = { StageCache, pickSpec, canonical, digestTree, digestFiles, digestOutputs };
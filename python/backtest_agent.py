@@ -1,131 +1,352 @@
 """Backtest Agent — 월 리밸런싱 시뮬레이션 + 성과 지표
 
 비용 반영 + walk-forward OOS 검증 + 유동성 제약
+spec.signal.history면 weights.json 옆 weight_history/ 스케줄로 리밸런싱일마다 종목 재선정.
+spec.walk_forward 지정 시 rolling/anchored N-fold: fold마다 학습 구간 말 기준으로
+팩터·비중을 다시 산출(refit)하고 다음 테스트 구간에서 평가, fold는 프로세스 풀로 병렬.
 """
 import json, sys, os, argparse
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from core.schemas import load_and_validate
-from core.cost_model import apply_cost_to_return
+from core import telemetry, run_registry
+from core.cost_model import apply_cost_to_return, participation_capacity, simulate_execution, DEFAULT_EXECUTION
+from core.panel import to_wide, load_price_panel, load_fundamentals
+from core.metrics import batch_metrics, round_metrics, month_labels, RF_ANNUAL, TRADING_DAYS
+from core.bootstrap import significance
+from core.data_clock import fundamentals_asof
+from factor_agent import universe, factor_ranks, combine_scores
+from portfolio_agent import build_weights, weight_schedule, load_weight_history
 
 def calc_metrics(returns: pd.Series) -> dict:
-    """CAGR, Sharpe, Sortino, MDD, Win Rate, Profit Factor"""
+    """CAGR, Sharpe, Sortino, MDD, Win Rate, Profit Factor (단일 시계열 — core.metrics 배치 엔진 래핑)"""
     if returns.empty or len(returns) < 2:
         return {"cagr": 0, "sharpe": 0, "sortino": 0, "mdd": 0, "win_rate": 0, "profit_factor": 0}
+    return round_metrics(batch_metrics(returns.to_numpy(dtype=float), month_labels(returns.index)))
 
-    # CAGR
-    total = (1 + returns).prod()
-    years = len(returns) / 252
-    cagr = total ** (1 / max(years, 0.01)) - 1 if total > 0 else -1
-
-    # Sharpe (연율화, 무위험 3%)
-    rf_daily = 0.03 / 252
-    excess = returns - rf_daily
-    sharpe = excess.mean() / excess.std() * np.sqrt(252) if excess.std() > 0 else 0
-
-    # Sortino
-    downside = returns[returns < 0]
-    down_std = downside.std() if len(downside) > 1 else 1e-8
-    sortino = (returns.mean() - rf_daily) / down_std * np.sqrt(252)
-
-    # MDD
-    cumulative = (1 + returns).cumprod()
-    peak = cumulative.cummax()
-    drawdown = (cumulative - peak) / peak
-    mdd = drawdown.min()
-
-    # Win Rate / Profit Factor (월 단위)
-    monthly = returns.resample("ME").sum() if hasattr(returns.index, "freq") else returns
-    wins = monthly[monthly > 0]
-    losses = monthly[monthly < 0]
-    win_rate = len(wins) / max(len(monthly), 1)
-    profit_factor = wins.sum() / abs(losses.sum()) if len(losses) > 0 and losses.sum() != 0 else float("inf")
+def _rebalance_index(dates: pd.DatetimeIndex, rebal_dates: list) -> np.ndarray:
+    """리밸런싱일 → 거래일 인덱스 (해당일 이후 첫 거래일). 첫 거래일은 항상 진입."""
+    idx = dates.searchsorted(pd.to_datetime(pd.Index(rebal_dates))) if rebal_dates else np.array([], dtype=int)
+    return np.unique(np.concatenate([[0], idx[idx < len(dates)]])).astype(int)
 
-    return {
-        "cagr": round(float(cagr), 4),
-        "sharpe": round(float(sharpe), 2),
-        "sortino": round(float(sortino), 2),
-        "mdd": round(float(mdd), 4),
-        "win_rate": round(float(win_rate), 4),
-        "profit_factor": round(float(profit_factor), 2),
-    }
+def _target_matrix(weights, codes: pd.Index, dates: pd.DatetimeIndex, starts: np.ndarray) -> np.ndarray:
+    """리밸런싱 시점별 목표 비중 행렬 (K × N).
+
+    weights가 dict면 매 리밸런싱마다 동일 목표로 복귀,
+    DataFrame(날짜 × 종목)이면 각 리밸런싱일 기준 가장 최근 행을 사용.
+    """
+    if isinstance(weights, pd.DataFrame):
+        table = weights.sort_index().reindex(columns=codes, fill_value=0).fillna(0)
+        row = np.searchsorted(pd.to_datetime(table.index), dates[starts], side="right") - 1
+        w = np.vstack([np.zeros(len(codes)), table.to_numpy(dtype=float)])
+        return w[row + 1]
+    target = pd.Series(weights, dtype=float).reindex(codes, fill_value=0).to_numpy()
+    return np.broadcast_to(target, (len(starts), len(codes))).copy()
+
+def run_backtest(prices: pd.DataFrame, weights, cost_spec: dict,
+                 rebal_dates: list, volume: pd.DataFrame = None) -> tuple[pd.Series, list]:
+    """리밸런싱 백테스트: 리밸런싱일마다 목표 비중 복귀, 사이 구간은 비중 드리프트.
 
-def run_backtest(prices: pd.DataFrame, weights: dict, cost_spec: dict,
-                 rebal_dates: list) -> tuple[pd.Series, list]:
-    """단순 백테스트: 리밸런싱 날짜마다 비중 조정, 일별 수익률 계산"""
-    if prices.empty or not weights:
+    (날짜 × 종목) 수익률 행렬에서 구간별 누적 성장률을 한 번에 계산하고,
+    리밸런싱 직전 드리프트 비중 대비 회전율만큼 비용 차감.
+    cost_spec.execution 지정 + volume 제공 시 체결 시뮬레이션(참여율 상한·이월·제곱근 충격)으로 대체.
+    prices: long 가격 패널 또는 (날짜 × 종목) 종가 행렬
+    weights: {code: weight} 또는 리밸런싱일 × 종목 DataFrame
+    volume: (날짜 × 종목) 거래량 — long 패널이면 prices에서 생성
+    """
+    if prices.empty or weights is None or len(weights) == 0:
         return pd.Series(dtype=float), []
 
-    trades = []
     # 종목별 일별 수익률 피벗
-    pivot = prices.pivot_table(index="date", columns="code", values="close")
-    daily_ret = pivot.pct_change().fillna(0)
+    pivot = to_wide(prices, "close") if "code" in prices.columns else prices
+    daily_ret = pivot.astype(float).pct_change().replace([np.inf, -np.inf], np.nan).fillna(0)
+    dates, codes = daily_ret.index, daily_ret.columns
 
-    # 포트폴리오 일별 수익률
-    weight_series = pd.Series(weights)
-    codes_in_data = [c for c in weight_series.index if c in daily_ret.columns]
-    if not codes_in_data:
+    weight_codes = weights.columns if isinstance(weights, pd.DataFrame) else pd.Index(list(weights))
+    if not weight_codes.isin(codes).any():
         return pd.Series(dtype=float), []
 
-    # 보유 비중으로 가중 수익률 계산
-    w = weight_series.reindex(daily_ret.columns, fill_value=0)
-    port_ret = (daily_ret * w).sum(axis=1)
+    starts = _rebalance_index(dates, rebal_dates)
+    W = _target_matrix(weights, codes, dates, starts)            # K × N
+    cash = 1.0 - W.sum(axis=1)                                     # 미편입 비중 = 현금
+
+    flags = np.zeros(len(dates), dtype=bool)
+    flags[starts] = True
+    seg = np.cumsum(flags) - 1                                     # 일자별 구간 번호
+
+    # 구간 시작 대비 누적 성장률: exp(L_t - L_{start-1})
+    R = daily_ret.to_numpy(dtype=float)
+    L = np.cumsum(np.log1p(np.maximum(R, -0.999999)), axis=0)
+    base = np.vstack([np.zeros(len(codes)), L])[starts]
+    growth = np.exp(L - base[seg])
+
+    # 구간 시작 = 1 기준 포트폴리오 가치 → 일별 수익률
+    value = (growth * W[seg]).sum(axis=1) + cash[seg]
+    prev_value = np.concatenate([[1.0], value[:-1]])
+    prev_value[starts] = 1.0
+    gross = value / prev_value - 1
+
+    # 리밸런싱 직전 드리프트 비중 → 매매 비중 / 회전율 (편도)
+    drift = np.zeros_like(W)
+    if len(starts) > 1:
+        end = starts[1:] - 1
+        drift[1:] = growth[end] * W[:-1] / value[end][:, None]
+    trade = W - drift
+    turnover = 0.5 * np.abs(trade).sum(axis=1)
 
-    # 비용 차감 (리밸런싱 시점)
     fee_bps = cost_spec.get("fee_bps", 3)
     slip_bps = cost_spec.get("slippage_bps", 5)
-    turnover = sum(weights.values())  # 초기 진입 = 100% 회전
-    cost = 2 * (fee_bps + slip_bps) / 10000 * turnover
-    if not port_ret.empty:
-        port_ret.iloc[0] -= cost
+    if volume is None and cost_spec.get("execution") and "code" in prices.columns and "volume" in prices.columns:
+        volume = to_wide(prices, "volume")
+    execution = None
+    if cost_spec.get("execution") and volume is not None:
+        # 체결 시뮬레이션: 일별 체결분에만 비용, 미체결 비중 수익률 보정
+        exe = {**DEFAULT_EXECUTION, **(cost_spec["execution"] if isinstance(cost_spec["execution"], dict) else {})}
+        capacity = participation_capacity(volume.reindex(index=dates, columns=codes).to_numpy(dtype=float),
+                                          pivot.to_numpy(dtype=float), exe["capital"], exe["max_participation"])
+        sigma = daily_ret.rolling(exe["vol_window"], min_periods=2).std().shift(1)
+        sigma = sigma.T.fillna(sigma.median(axis=1)).T.fillna(0.02).to_numpy()
+        execution = simulate_execution(trade, starts, R, capacity, sigma, fee_bps, slip_bps,
+                                       exe["max_participation"], exe["impact_coef"])
+        net = gross + execution["adjust"] - execution["cost"]
+    else:
+        net = gross.copy()
+        net[starts] = apply_cost_to_return(gross[starts], turnover, fee_bps, slip_bps)
+    port_ret = pd.Series(net, index=dates)
 
     # 거래 기록
-    for code, w_val in weights.items():
-        trades.append({"date": str(port_ret.index[0]) if not port_ret.empty else "",
-                       "code": code, "action": "BUY", "weight": round(w_val, 4)})
+    k_idx, j_idx = np.nonzero(np.abs(trade) > 1e-6)
+    trade_dates = dates[starts].strftime("%Y-%m-%d")
+    trades = [{"date": trade_dates[k], "code": codes[j],
+               "action": "BUY" if trade[k, j] > 0 else "SELL",
+               "weight": round(float(abs(trade[k, j])), 4),
+               "target": round(float(W[k, j]), 4)}
+              for k, j in zip(k_idx, j_idx)]
+    if execution is not None:
+        for t, k, j in zip(trades, k_idx, j_idx):
+            t["filled"] = round(float(execution["filled"][k, j]), 4)
+            t["fill_days"] = int(execution["days"][k, j])
 
     return port_ret, trades
 
-def main():
-    parser = argparse.ArgumentParser(description="Backtest Agent")
-    parser.add_argument("--spec", required=True)
-    parser.add_argument("--data-dir", required=True, help="data_agent 출력 디렉터리")
-    parser.add_argument("--weights", required=True, help="weights.json 경로")
-    parser.add_argument("--output", required=True)
-    args = parser.parse_args()
+def window_metrics(returns: np.ndarray, bounds: list) -> list[dict]:
+    """구간별 CAGR / Sharpe / MDD / 누적수익률.
+
+    수익률·제곱·로그성장 누적합으로 구간 통계를 O(1)에 계산 (MDD만 구간 누적최대 스캔).
+    bounds: [(start, end)] — end 미포함 인덱스
+    """
+    r = np.asarray(returns, dtype=float)
+    S1 = np.concatenate([[0.0], np.cumsum(r)])
+    S2 = np.concatenate([[0.0], np.cumsum(r * r)])
+    L = np.concatenate([[0.0], np.cumsum(np.log1p(np.maximum(r, -0.999999)))])
+    rf_daily = RF_ANNUAL / TRADING_DAYS
+
+    out = []
+    for s, e in bounds:
+        n = e - s
+        if n < 2:
+            out.append({"cagr": 0, "sharpe": 0, "mdd": 0, "total_return": 0})
+            continue
+        mean = (S1[e] - S1[s]) / n
+        var = max((S2[e] - S2[s] - n * mean * mean) / (n - 1), 0.0)
+        std = np.sqrt(var)
+        sharpe = (mean - rf_daily) / std * np.sqrt(TRADING_DAYS) if std > 0 else 0
+        total = np.exp(L[e] - L[s])
+        cagr = total ** (1 / max(n / TRADING_DAYS, 0.01)) - 1
+        wealth = L[s + 1:e + 1]
+        mdd = np.exp(wealth - np.maximum.accumulate(wealth)).min() - 1
+        out.append({
+            "cagr": round(float(cagr), 4),
+            "sharpe": round(float(sharpe), 2),
+            "mdd": round(float(mdd), 4),
+            "total_return": round(float(total - 1), 4),
+        })
+    return out
+
+def walk_forward_folds(n: int, cfg: dict) -> list[tuple]:
+    """거래일 n개 → [(train_start, train_end, test_start, test_end)] (end 미포함).
+
+    rolling: 학습 구간 길이 고정 / anchored: 학습 시작 0 고정 (구간 확장)
+    train_days 미지정 시 n / (folds+1), test_days 미지정 시 남은 구간을 folds 등분 (나머지는 마지막 fold)
+    """
+    folds = int(cfg.get("folds", 4))
+    if folds < 1:
+        return []
+    train = int(cfg.get("train_days") or n // (folds + 1))
+    test = int(cfg.get("test_days") or (n - train) // folds)
+    if train < 2 or test < 2:
+        return []
+    anchored = cfg.get("mode", "rolling") == "anchored"
+    out = []
+    for k in range(folds):
+        test_start = train + k * test
+        test_end = test_start + test if cfg.get("test_days") or k < folds - 1 else n
+        test_end = min(test_end, n)
+        if test_end - test_start < 2:
+            break
+        out.append((0 if anchored else test_start - train, test_start, test_start, test_end))
+    return out
+
+def refit_weights(spec: dict, close: pd.DataFrame, fundamentals: pd.DataFrame) -> dict:
+    """주어진 구간 데이터로 팩터 스코어 → 비중 재산출"""
+    codes = universe(close, fundamentals)
+    if len(codes) < 2:
+        return {}
+    factor_df = factor_ranks(spec["factors"], close, fundamentals, codes)
+    signals = combine_scores(factor_df, spec["signal"]["weights"], spec["signal"].get("method", "rank_sum"))
+    return build_weights(signals, spec, prices=close)
+
+def backtest_targets(spec: dict, close: pd.DataFrame, weights, rebal_dates: list):
+    """risk_parity면 보유 종목 비중을 리밸런싱일마다 그 시점까지의 공분산으로 재산출한 스케줄"""
+    if spec["portfolio"].get("method") == "risk_parity" and isinstance(weights, dict) and weights \
+            and not close.empty:
+        return weight_schedule(close, list(weights), rebal_dates, spec)
+    return weights
+
+# --- fold 워커 상태 ---
+_WF = {}
+
+def _init_fold_worker(spec: dict, close: pd.DataFrame, fundamentals: pd.DataFrame, rebal_dates: list,
+                      volume: pd.DataFrame = None):
+    _WF.update({"spec": spec, "close": close, "fundamentals": fundamentals, "rebal_dates": rebal_dates,
+                "volume": volume})
+
+def run_fold(fold: tuple) -> dict:
+    """fold 하나: 학습 구간 말 기준 refit → 학습/테스트 구간 일별 수익률"""
+    train_start, train_end, test_start, test_end = fold
+    spec, close, known = _WF["spec"], _WF["close"], _WF["fundamentals"]
+    # 학습 구간 말일에 알려진 재무 vintage만 사용 (룩어헤드 방지)
+    if "asof_date" in known.columns:
+        known = known[known["asof_date"] == close.index[train_end - 1]]
+    weights = refit_weights(spec, close.iloc[:train_end], known)
+
+    def window(start, end):
+        targets = backtest_targets(spec, close.iloc[:end], weights, _WF["rebal_dates"])
+        ret, trades = run_backtest(close.iloc[start:end], targets, spec["cost_model"], _WF["rebal_dates"],
+                                   _WF["volume"])
+        return (ret.to_numpy() if not ret.empty else np.zeros(end - start)), len(trades)
+
+    train_ret, _ = window(train_start, train_end)
+    test_ret, n_trades = window(test_start, test_end)
+    return {"train": train_ret, "test": test_ret, "holdings": len(weights), "trades": n_trades}
+
+def walk_forward(spec: dict, close: pd.DataFrame, fundamentals: pd.DataFrame, rebal_dates: list,
+                 volume: pd.DataFrame = None) -> dict:
+    """N-fold walk-forward → fold별 지표 + 집계
+
+    in_sample/out_of_sample은 둘 다 fold 평균 (같은 키) — rolling 학습 구간은 서로 겹쳐 이어붙일 수 없으므로
+    """
+    cfg = spec["walk_forward"]
+    dates = close.index
+    folds = walk_forward_folds(len(dates), cfg)
+    if not folds:
+        return {}
+
+    # fold별 학습 말일 기준 as-of 재무를 한 번에 조회
+    if not fundamentals.empty and "report_date" in fundamentals.columns:
+        fundamentals = fundamentals_asof(fundamentals, [dates[train_end - 1] for _, train_end, _, _ in folds])
 
-    spec = load_and_validate(args.spec)
-    os.makedirs(args.output, exist_ok=True)
+    workers = min(int(cfg.get("workers") or os.cpu_count() or 1), len(folds))
+    init_args = (spec, close, fundamentals, rebal_dates, volume)
+    if workers <= 1:
+        _init_fold_worker(*init_args)
+        results = [run_fold(f) for f in folds]
+        _WF.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_fold_worker, initargs=init_args) as pool:
+            results = list(pool.map(run_fold, folds))
 
-    # 데이터 로드
-    prices_path = os.path.join(args.data_dir, "prices.csv")
-    prices = pd.read_csv(prices_path, parse_dates=["date"], dtype={"code": str}) if os.path.exists(prices_path) else pd.DataFrame()
+    # fold 수익률을 이어붙여 누적합 한 번으로 구간 지표 계산
+    def stitched(part):
+        arrays = [r[part] for r in results]
+        ends = np.cumsum([len(a) for a in arrays])
+        return np.concatenate(arrays), list(zip(np.concatenate([[0], ends[:-1]]), ends))
+    train_ret, train_bounds = stitched("train")
+    test_ret, test_bounds = stitched("test")
+    train_m = window_metrics(train_ret, train_bounds)
+    test_m = window_metrics(test_ret, test_bounds)
 
-    with open(args.weights) as f:
-        weights = json.load(f)
+    fold_rows = []
+    for k, ((tr_s, tr_e, te_s, te_e), res) in enumerate(zip(folds, results)):
+        is_sharpe, oos_sharpe = train_m[k]["sharpe"], test_m[k]["sharpe"]
+        fold_rows.append({
+            "fold": k + 1,
+            "train": {"start": str(dates[tr_s].date()), "end": str(dates[tr_e - 1].date())},
+            "test": {"start": str(dates[te_s].date()), "end": str(dates[te_e - 1].date())},
+            "train_metrics": train_m[k],
+            "test_metrics": test_m[k],
+            "sharpe_ratio": round(oos_sharpe / is_sharpe, 2) if is_sharpe > 0 else None,
+            "holdings": res["holdings"],
+            "trades": res["trades"],
+        })
 
-    rebal_path = os.path.join(args.data_dir, "rebalance_dates.json")
-    rebal_dates = json.load(open(rebal_path)) if os.path.exists(rebal_path) else []
+    keys = ("cagr", "sharpe", "mdd", "total_return")
+    is_mean = {k: round(float(np.mean([m[k] for m in train_m])), 4) for k in keys}
+    oos_mean = {k: round(float(np.mean([m[k] for m in test_m])), 4) for k in keys}
+    ratios = [f["sharpe_ratio"] for f in fold_rows if f["sharpe_ratio"] is not None]
+    return {
+        "mode": cfg.get("mode", "rolling"),
+        "in_sample": is_mean,
+        "out_of_sample": oos_mean,
+        "folds": fold_rows,
+        "aggregate": {
+            "folds": len(fold_rows),
+            "in_sample_mean": is_mean,
+            "out_of_sample_mean": oos_mean,
+            "sharpe_degradation": round(1 - oos_mean["sharpe"] / is_mean["sharpe"], 2) if is_mean["sharpe"] > 0 else None,
+            "median_sharpe_ratio": round(float(np.median(ratios)), 2) if ratios else None,
+            "oos_positive_folds": round(float(np.mean([m["total_return"] > 0 for m in test_m])), 2),
+        },
+    }
+
+def execution_summary(trades: list) -> dict:
+    """체결 시뮬레이션 요약 (거래 비중 가중 평균 체결률, 미완료 주문 수, 평균 체결 일수)"""
+    if not trades or "filled" not in trades[0]:
+        return {}
+    df = pd.DataFrame(trades)
+    done = df[df["fill_days"] >= 0]
+    return {
+        "avg_fill": round(float((df["filled"] * df["weight"]).sum() / max(df["weight"].sum(), 1e-12)), 4),
+        "unfilled_orders": int((df["filled"] < 1).sum()),
+        "avg_fill_days": round(float(done["fill_days"].mean()), 2) if not done.empty else None,
+    }
+
+def holdings_count(weights) -> int:
+    """보유 종목 수 (스케줄이면 마지막 리밸런싱 기준)"""
+    if isinstance(weights, pd.DataFrame):
+        return int((weights.iloc[-1] > 0).sum()) if len(weights) else 0
+    return len(weights)
 
-    # 백테스트 실행
-    port_ret, trades = run_backtest(prices, weights, spec["cost_model"], rebal_dates)
+def evaluate(spec: dict, prices: pd.DataFrame, weights, rebal_dates: list,
+             fundamentals: pd.DataFrame = None, volume: pd.DataFrame = None) -> tuple[dict, list, pd.Series]:
+    """백테스트 + 성과 지표 + walk-forward → (run_result, trades, 일별 수익률)"""
+    close = to_wide(prices, "close") if "code" in prices.columns else prices
+    if volume is None and "code" in prices.columns and "volume" in prices.columns:
+        volume = to_wide(prices, "volume")
+    targets = backtest_targets(spec, close, weights, rebal_dates)
+    port_ret, trades = run_backtest(close, targets, spec["cost_model"], rebal_dates, volume)
 
     # 성과 지표
     metrics = calc_metrics(port_ret)
 
-    # Walk-forward: IS 70% / OOS 30%
     wf = {"in_sample": metrics, "out_of_sample": metrics}
-    if len(port_ret) > 20:
+    if spec.get("walk_forward") and not prices.empty:
+        # N-fold refit walk-forward
+        fundamentals = fundamentals if fundamentals is not None else pd.DataFrame()
+        wf = walk_forward(spec, close, fundamentals, rebal_dates, volume) or wf
+    elif len(port_ret) > 20:
+        # 단일 분할: IS 70% / OOS 30%
         split = int(len(port_ret) * 0.7)
         wf["in_sample"] = calc_metrics(port_ret.iloc[:split])
         wf["out_of_sample"] = calc_metrics(port_ret.iloc[split:])
-        # IS/OOS 괴리 경고
-        is_sharpe = wf["in_sample"]["sharpe"]
-        oos_sharpe = wf["out_of_sample"]["sharpe"]
-        if is_sharpe > 0 and oos_sharpe / max(is_sharpe, 0.01) < 0.5:
-            wf["warning"] = "IS/OOS 성과 괴리 > 50% — 과최적화 의심"
 
-    # 결과 저장
+    # IS/OOS 괴리 경고
+    is_sharpe = wf["in_sample"]["sharpe"]
+    oos_sharpe = wf["out_of_sample"]["sharpe"]
+    if wf["in_sample"] is not metrics and is_sharpe > 0 and oos_sharpe / max(is_sharpe, 0.01) < 0.5:
+        wf["warning"] = "IS/OOS 성과 괴리 > 50% — 과최적화 의심"
+
     run_result = {
         "strategy": spec["name"],
         "period": {
@@ -134,21 +355,81 @@ def main():
         },
         "metrics": metrics,
         "walk_forward": wf,
-        "holdings": len(weights),
+        "holdings": holdings_count(weights),
+        "rebalances": len({t["date"] for t in trades}),
         "cost_model": spec["cost_model"],
     }
-
-    with open(os.path.join(args.output, "run_result.json"), "w") as f:
-        json.dump(run_result, f, indent=2, default=str)
-
-    # 거래 기록
-    if trades:
-        pd.DataFrame(trades).to_csv(os.path.join(args.output, "trades.csv"), index=False)
+    if execution_summary(trades):
+        run_result["execution"] = execution_summary(trades)
+    if spec.get("bootstrap") is not None and len(port_ret) > 2:
+        # 블록 부트스트랩 신뢰구간 + PSR/DSR (IS/OOS 단일 비교 보완)
+        run_result["bootstrap"] = significance(port_ret, spec["bootstrap"])
 
     print(f"[BacktestAgent] 전략: {spec['name']}")
     print(f"[BacktestAgent] CAGR: {metrics['cagr']:.2%} | Sharpe: {metrics['sharpe']:.2f} | MDD: {metrics['mdd']:.2%}")
     if "warning" in wf:
         print(f"[BacktestAgent] ⚠ {wf['warning']}")
+    boot = run_result.get("bootstrap", {})
+    if boot:
+        lo, hi = boot["sharpe"]["ci"]
+        print(f"[BacktestAgent] Sharpe {boot['confidence']:.0%} CI [{lo:.2f}, {hi:.2f}] | "
+              f"PSR: {boot['psr']:.2f} | DSR: {boot['dsr']:.2f} (trials={boot['trials']})")
+        if "warning" in boot:
+            print(f"[BacktestAgent] ⚠ {boot['warning']}")
+    return run_result, trades, port_ret
+
+def write_outputs(run_result: dict, trades: list, output: str):
+    """run_result.json + trades.csv"""
+    os.makedirs(output, exist_ok=True)
+    with open(os.path.join(output, "run_result.json"), "w") as f:
+        json.dump(run_result, f, indent=2, default=str)
+    if trades:
+        pd.DataFrame(trades).to_csv(os.path.join(output, "trades.csv"), index=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest Agent")
+    parser.add_argument("--spec", required=True)
+    parser.add_argument("--data-dir", required=True, help="data_agent 출력 디렉터리")
+    parser.add_argument("--weights", required=True, help="weights.json 경로")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--registry", default=None,
+                        help=f"실행 레지스트리 경로 (기본: <output 상위>/{run_registry.REGISTRY_FILE})")
+    parser.add_argument("--no-registry", action="store_true", help="실행 레지스트리 기록 안 함")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with telemetry.session("backtest_agent", args.telemetry, args.profile) as tel:
+        spec = load_and_validate(args.spec)
+
+        # 데이터 로드
+        with telemetry.phase(tel, "load"):
+            fields = ["close", "volume"] if spec["cost_model"].get("execution") else ["close"]
+            panel = load_price_panel(args.data_dir, fields)
+            prices = panel.get("close", pd.DataFrame())
+
+            with open(args.weights) as f:
+                weights = json.load(f)
+            if spec["signal"].get("history"):
+                schedule = load_weight_history(os.path.dirname(os.path.abspath(args.weights)))
+                if schedule is None:
+                    print("[BacktestAgent] weight_history 없음 — weights.json 고정 비중 사용", file=sys.stderr)
+                else:
+                    weights = schedule
+
+            rebal_path = os.path.join(args.data_dir, "rebalance_dates.json")
+            rebal_dates = json.load(open(rebal_path)) if os.path.exists(rebal_path) else []
+            fundamentals = load_fundamentals(args.data_dir) if spec.get("walk_forward") else None
+
+        with telemetry.phase(tel, "compute"):
+            run_result, trades, port_ret = evaluate(spec, prices, weights, rebal_dates, fundamentals,
+                                                    panel.get("volume"))
+        telemetry.count(tel, dates=len(prices), codes=prices.shape[1], holdings=holdings_count(weights), trades=len(trades),
+                        rebalance_dates=len(rebal_dates))
+        with telemetry.phase(tel, "write"):
+            write_outputs(run_result, trades, args.output)
+            if not args.no_registry:
+                run_registry.record(args.registry or run_registry.default_path(args.output), args.output,
+                                    run_result, spec, port_ret)
 
 if __name__ == "__main__":
     main()
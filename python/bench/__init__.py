@@ -0,0 +1 @@
+"""벤치마크 — 합성 데이터 생성기(synth) + 에이전트 핵심 함수 측정(run)"""
@@ -0,0 +1,157 @@
+"""Python 에이전트 벤치마크 — 합성 KRX 데이터로 핵심 함수별 wall time / peak memory 측정
+
+  python -m bench.run --scale small            # 측정 + 저장된 기준선 대비 회귀 검사 (회귀 시 exit 1)
+  python -m bench.run --scale full --update    # 기준선 갱신 (bench/baselines.json)
+
+wall time: 준비 단계와 분리해 repeat회 중 최솟값. peak memory: tracemalloc 측정 실행 1회
+(NumPy/pandas 버퍼 포함, 첫 실행이라 워밍업 겸함). 가격 파싱은 --workers 1이면 전부 현재 프로세스.
+합성 데이터는 <tmp>/invest-quant-bench/<scale>에 한 번 생성해 재사용.
+"""
+import json, os, sys, argparse, platform, shutil, tempfile, time, tracemalloc
+import numpy as np
+import pandas as pd
+from bench.synth import SCALES, generate
+from core.panel import to_wide
+from core.data_clock import get_rebalance_dates
+from data_agent import build_price_panel, build_fundamental_panel
+from factor_agent import universe, compute_factor, score_signals
+from portfolio_agent import build_weights
+from backtest_agent import run_backtest, calc_metrics
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+SPEC_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "strategies", "low_per_high_roe.json")
+DEFAULT_THRESHOLDS = {"wall": 0.25, "memory": 0.15}  # 기준선 대비 허용 증가율
+MIN_WALL_DELTA = 0.005  # 이보다 작은 절대 증가(초)는 측정 잡음으로 보고 무시
+
+def default_data_dir(scale: str) -> str:
+    return os.path.join(tempfile.gettempdir(), "invest-quant-bench", scale)
+
+def measure(fn, repeat: int) -> dict:
+    """fn 1회 tracemalloc 실행(peak) + repeat회 시간 측정(min)"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return {"wall_s": round(min(times), 6), "peak_mb": round(peak / 2 ** 20, 3)}
+
+def cases(data_dir: str, spec: dict, workers: int):
+    """(이름, 측정 대상 함수) 순서대로 생성 — 앞 단계 결과를 다음 단계 입력으로 준비 (준비 시간은 제외)"""
+    cache_dir = tempfile.mkdtemp(prefix="bench-price-cache-")
+    try:
+        yield "build_price_panel[cold]", lambda: build_price_panel(data_dir, cache_dir, rebuild=True, workers=workers)
+        prices = build_price_panel(data_dir, cache_dir, workers=workers)
+        yield "build_price_panel[cached]", lambda: build_price_panel(data_dir, cache_dir, workers=workers)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    close, volume = to_wide(prices, "close"), to_wide(prices, "volume")
+    del prices
+    fundamentals = build_fundamental_panel(data_dir)
+    codes = universe(close, fundamentals)
+    for fspec in spec["factors"]:
+        yield f"compute_factor[{fspec['id']}]", lambda f=fspec: compute_factor(f, None, fundamentals, codes, close=close)
+
+    signals = score_signals(spec, close, fundamentals)
+    rp_spec = {**spec, "portfolio": {**spec["portfolio"], "method": "risk_parity"}}
+    yield "build_weights[top_n_equal]", lambda: build_weights(signals, spec, prices=close)
+    yield "build_weights[risk_parity]", lambda: build_weights(signals, rp_spec, prices=close)
+
+    weights = build_weights(signals, spec, prices=close)
+    rebal = get_rebalance_dates(close.index[0].strftime("%Y-%m-%d"), close.index[-1].strftime("%Y-%m-%d"),
+                                spec["rebalance"]["freq"])
+    exe_cost = {**spec["cost_model"], "execution": {"capital": 1e10}}
+    yield "run_backtest[flat]", lambda: run_backtest(close, weights, spec["cost_model"], rebal)
+    yield "run_backtest[execution]", lambda: run_backtest(close, weights, exe_cost, rebal, volume)
+
+    port_ret, _ = run_backtest(close, weights, spec["cost_model"], rebal)
+    yield "calc_metrics", lambda: calc_metrics(port_ret)
+
+def machine_info() -> dict:
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count()}
+
+def compare(results: dict, baseline: dict, thresholds: dict) -> list:
+    """기준선 대비 회귀 목록 [(이름, 항목, 측정값, 기준값)]"""
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        limit = {**thresholds, **base.get("threshold", {})}
+        wall_limit = base["wall_s"] * (1 + limit["wall"])
+        if res["wall_s"] > wall_limit and res["wall_s"] - base["wall_s"] > MIN_WALL_DELTA:
+            regressions.append((name, "wall_s", res["wall_s"], base["wall_s"]))
+        if res["peak_mb"] > base["peak_mb"] * (1 + limit["memory"]):
+            regressions.append((name, "peak_mb", res["peak_mb"], base["peak_mb"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Python 에이전트 벤치마크")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=None, help="합성 데이터 위치 (기본: <tmp>/invest-quant-bench/<scale>)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1, help="가격 파일 파싱 프로세스 수")
+    parser.add_argument("--filter", default=None, help="이름에 이 문자열이 들어간 벤치마크만")
+    parser.add_argument("--update", action="store_true", help="측정값으로 기준선 갱신")
+    parser.add_argument("--output", default=None, help="측정 결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    data_dir = args.data_dir or default_data_dir(args.scale)
+    t = time.perf_counter()
+    manifest = generate(data_dir, args.scale, args.seed)
+    print(f"[Bench] 데이터: {data_dir} ({manifest['codes']}종목 × {manifest['days']}일, "
+          f"준비 {time.perf_counter() - t:.1f}s)", file=sys.stderr)
+    with open(SPEC_PATH) as f:
+        spec = json.load(f)
+
+    results = {}
+    for name, fn in cases(data_dir, spec, args.workers):
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(fn, args.repeat)
+        print(f"[Bench] {name:32s} {results[name]['wall_s'] * 1000:10.1f} ms {results[name]['peak_mb']:10.1f} MB",
+              file=sys.stderr)
+
+    stored = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            stored = json.load(f)
+    thresholds = {**DEFAULT_THRESHOLDS, **stored.get("thresholds", {})}
+    key = f"{args.scale}:{args.seed}"
+    baseline = stored.get("baselines", {}).get(key, {})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"scale": args.scale, "seed": args.seed, "machine": machine_info(), "results": results}, f,
+                      indent=2)
+
+    if args.update:
+        merged = {**baseline.get("results", {}), **results}
+        stored.setdefault("thresholds", DEFAULT_THRESHOLDS)
+        stored.setdefault("baselines", {})[key] = {"machine": machine_info(), "results": merged}
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(stored, f, indent=2)
+            f.write("\n")
+        print(f"[Bench] 기준선 갱신: {key} ({len(results)}건)")
+        return
+
+    if not baseline:
+        print(f"[Bench] 기준선 없음: {key} — --update로 기록")
+        return
+    regressions = compare(results, baseline["results"], thresholds)
+    for name, metric, value, base in regressions:
+        print(f"[Bench] 회귀: {name} {metric} {value} (기준 {base}, +{value / base - 1:.0%})")
+    if regressions:
+        sys.exit(1)
+    print(f"[Bench] 회귀 없음 ({len(results)}건, 기준 {key})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""합성 KRX 데이터 생성기 — data/historical, data/fundamentals와 같은 JSON 형식
+
+historical/{code}.json   [{date: YYYYMMDD, open, high, low, close, volume}, …] (data-collector 저장 형식)
+fundamentals/{code}.json {code, name, score, ratios, history, breakdown}    (collect-data 저장 형식)
+
+시드 고정: 같은 (scale, seed)면 같은 파일. 종목별 난수열은 (seed, 종목 번호)로 분리해
+병렬 생성 순서와 무관. 시장 공통 수익률 + 종목 베타/고유 변동, 상장 지연·상장폐지 종목 포함.
+"""
+import json, os, sys, argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+SCALES = {
+    "full": {"codes": 2500, "years": 20},   # KRX 전 종목 × 20년
+    "medium": {"codes": 500, "years": 5},
+    "small": {"codes": 100, "years": 2},
+}
+TRADING_DAYS = 250
+END_DATE = "2024-12-30"
+MANIFEST_FILE = "bench_manifest.json"
+FORMAT = 1
+
+def trading_dates(years: int) -> pd.DatetimeIndex:
+    return pd.bdate_range(end=END_DATE, periods=years * TRADING_DAYS)
+
+def stock_codes(n: int, seed: int) -> list:
+    """6자리 종목코드 (끝자리 0, 중복 없음)"""
+    picks = np.random.default_rng(seed).choice(np.arange(100, 100_000), size=n, replace=False)
+    return [f"{c * 10:06d}" for c in np.sort(picks)]
+
+def market_returns(days: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng([seed, 0xC0FFEE])
+    return rng.normal(0.0003, 0.011, days)
+
+def synth_candles(i: int, days: int, market: np.ndarray, seed: int) -> tuple[int, np.ndarray]:
+    """종목 i → (상장 시작 행, (일수 × [open, high, low, close, volume]) 정수 배열)"""
+    rng = np.random.default_rng([seed, i])
+    listing = rng.random()
+    start = int(rng.integers(days // 10, days * 3 // 4)) if listing < 0.15 else 0
+    end = int(rng.integers(days // 2, days)) if listing > 0.95 else days
+
+    beta, vol = rng.uniform(0.5, 1.5), rng.uniform(0.01, 0.035)
+    r = beta * market[start:end] + rng.normal(0, vol, end - start)
+    close = np.maximum(np.round(rng.lognormal(np.log(20000), 1.0) * np.exp(np.cumsum(r))), 1)
+    prev = np.concatenate([[close[0]], close[:-1]])
+    open_ = np.maximum(np.round(prev * (1 + rng.normal(0, vol / 3, len(close)))), 1)
+    high = np.round(np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, len(close)))))
+    low = np.maximum(np.round(np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, len(close))))), 1)
+    volume = np.round(rng.lognormal(np.log(rng.uniform(2e4, 2e6)), 0.6, len(close)))
+    return start, np.column_stack([open_, high, low, close, volume]).astype(np.int64)
+
+def synth_fundamentals(i: int, code: str, dates: pd.DatetimeIndex, start: int, seed: int) -> dict:
+    """분기말 공시 vintage 이력 (상장 이후) — 마지막이 ratios, 나머지는 history"""
+    rng = np.random.default_rng([seed, i, 1])
+    quarters = pd.date_range(dates[start], dates[-1], freq=pd.offsets.QuarterEnd())
+    per, pbr, roe = rng.uniform(4, 30), rng.uniform(0.3, 3), rng.uniform(-5, 25)
+    vintages = []
+    for q in quarters:
+        per = float(np.clip(per * np.exp(rng.normal(0, 0.1)), 1, 200))
+        pbr = float(np.clip(pbr * np.exp(rng.normal(0, 0.08)), 0.1, 20))
+        roe = float(np.clip(roe + rng.normal(0, 1.5), -50, 60))
+        vintages.append({"per": round(per, 2), "pbr": round(pbr, 2), "roe": round(roe, 2),
+                         "debtRatio": round(float(rng.uniform(20, 250)), 2),
+                         "operatingMargin": round(float(rng.uniform(-10, 30)), 2),
+                         "reportDate": q.strftime("%Y-%m-%d")})
+    return {"code": code, "name": f"합성{code}", "score": int(rng.integers(20, 90)),
+            "ratios": vintages[-1] if vintages else {}, "history": vintages[:-1], "breakdown": {}}
+
+def write_stock(task: tuple) -> str:
+    """종목 하나의 일봉/재무 파일 쓰기 (프로세스 풀 워커)"""
+    i, code, out_dir, years, seed = task
+    dates = trading_dates(years)
+    start, ohlcv = synth_candles(i, len(dates), market_returns(len(dates), seed), seed)
+    labels = dates[start:start + len(ohlcv)].strftime("%Y%m%d")
+    candles = [{"date": d, "open": int(o), "high": int(h), "low": int(lo), "close": int(c), "volume": int(v)}
+               for d, (o, h, lo, c, v) in zip(labels, ohlcv.tolist())]
+    with open(os.path.join(out_dir, "historical", f"{code}.json"), "w") as f:
+        json.dump(candles, f, indent=2)
+    if np.random.default_rng([seed, i, 2]).random() < 0.95:  # 일부 종목은 재무 없음
+        with open(os.path.join(out_dir, "fundamentals", f"{code}.json"), "w") as f:
+            json.dump(synth_fundamentals(i, code, dates, start, seed), f, indent=2, ensure_ascii=False)
+    return code
+
+def generate(out_dir: str, scale: str = "small", seed: int = 0, workers: int = None, force: bool = False) -> dict:
+    """out_dir에 합성 데이터 생성 (같은 설정으로 이미 생성돼 있으면 건너뜀) → manifest"""
+    conf = SCALES[scale]
+    manifest = {"format": FORMAT, "scale": scale, "seed": seed, **conf, "days": conf["years"] * TRADING_DAYS}
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) == manifest:
+                return manifest
+
+    if os.path.exists(manifest_path):  # 중간에 끊겨도 불완전한 생성분을 재사용하지 않도록
+        os.remove(manifest_path)
+    for sub in ("historical", "fundamentals"):
+        os.makedirs(os.path.join(out_dir, sub), exist_ok=True)
+        for name in os.listdir(os.path.join(out_dir, sub)):
+            os.remove(os.path.join(out_dir, sub, name))
+    tasks = [(i, code, out_dir, conf["years"], seed) for i, code in enumerate(stock_codes(conf["codes"], seed))]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for t in tasks:
+            write_stock(t)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(write_stock, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 KRX 데이터 생성")
+    parser.add_argument("--output", required=True, help="데이터 디렉터리 (historical/, fundamentals/ 생성)")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="기존 생성분이 있어도 다시 생성")
+    args = parser.parse_args(argv)
+    m = generate(args.output, args.scale, args.seed, args.workers, args.force)
+    print(f"[Synth] {args.output}: {m['codes']}종목 × {m['days']}일 (scale={m['scale']}, seed={m['seed']})",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""블록 부트스트랩 유의성 검정 — 포트폴리오 일별 수익률 재표본 → 지표 신뢰구간 + PSR / DSR
+
+재표본  stationary (Politis-Romano, 블록 길이 ~ 기하분포 평균 block) 또는 circular (고정 길이 block),
+        끝에서 처음으로 이어지는 원형 연결. (T × chunk) 인덱스 행렬로 일괄 생성하고
+        max_bytes 상한 안에서 chunk 단위로 core.metrics.batch_metrics 채점.
+PSR     왜도·첨도 보정 Sharpe가 기준값을 넘을 확률 (Bailey & López de Prado)
+DSR     기준값 = 시행 trials회 중 기대 최대 Sharpe. 시행 간 Sharpe 표준편차(trial_sharpe_std, 연율)가
+        없으면 부트스트랩 Sharpe 표준편차로 대신함.
+"""
+import math
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from core.metrics import batch_metrics, month_labels, TRADING_DAYS, RF_ANNUAL, ROUNDING
+
+DEFAULTS = {"samples": 2000, "method": "stationary", "block": None, "confidence": 0.95, "seed": 0,
+            "trials": 1, "trial_sharpe_std": None}
+REPORTED = ("sharpe", "cagr", "mdd")
+MAX_BYTES = 32 * 1024 ** 2  # chunk 작업 메모리 상한 (작을수록 할당 재사용 — 더 키워도 빨라지지 않음)
+WORK_ARRAYS = 12  # batch_metrics가 (T × chunk) 크기로 동시에 잡는 float64 배열 수 (대략)
+EULER_GAMMA = 0.5772156649015329
+_NORMAL = NormalDist()
+
+def default_block(n: int) -> int:
+    """평균 블록 길이 기본값 n^(1/3)"""
+    return max(1, round(n ** (1 / 3)))
+
+def resample_indices(rng: np.random.Generator, n: int, k: int, block: int,
+                     method: str = "stationary") -> np.ndarray:
+    """(n × k) 재표본 인덱스 — 열마다 원형 블록을 이어붙인 시계열 하나"""
+    t = np.arange(n)[:, None]
+    if method == "circular":
+        new_block = np.broadcast_to(t % block == 0, (n, k))
+    else:
+        new_block = rng.random((n, k)) < 1.0 / block
+        new_block[0] = True
+    starts = rng.integers(0, n, size=(n, k))
+    head = np.maximum.accumulate(np.where(new_block, t, 0), axis=0)  # 각 위치가 속한 블록의 시작 위치
+    return (np.take_along_axis(starts, head, axis=0) + t - head) % n
+
+def bootstrap_metrics(returns, months=None, samples: int = 2000, block: int = None, method: str = "stationary",
+                      seed: int = 0, max_bytes: int = MAX_BYTES) -> dict:
+    """재표본 samples개의 지표 → {지표: 길이 samples 배열}. 메모리는 chunk당 max_bytes 이내.
+
+    같은 seed · 길이 · max_bytes면 같은 재표본.
+    """
+    r = np.nan_to_num(np.asarray(returns, dtype=float))
+    n = len(r)
+    block = block or default_block(n)
+    months = month_labels(None, n) if months is None else np.asarray(months)
+    rng = np.random.default_rng(seed)
+    chunk = max(1, min(samples, max_bytes // max(n * 8 * WORK_ARRAYS, 1)))
+    parts = []
+    for done in range(0, samples, chunk):
+        idx = resample_indices(rng, n, min(chunk, samples - done), block, method)
+        parts.append(batch_metrics(r[idx], months))
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+def _daily_sharpe(r: np.ndarray) -> float:
+    std = r.std(ddof=1)
+    return float((r.mean() - RF_ANNUAL / TRADING_DAYS) / std) if std > 0 else 0.0
+
+def probabilistic_sharpe(returns, benchmark: float = 0.0) -> float:
+    """PSR: 일별 Sharpe가 benchmark(일별)를 넘을 확률 — 표본 왜도·첨도 보정"""
+    r = np.asarray(returns, dtype=float)
+    r = r[~np.isnan(r)]
+    n = len(r)
+    if n < 3 or r.std() == 0:
+        return 0.0
+    sr = _daily_sharpe(r)
+    z = (r - r.mean()) / r.std()
+    skew, kurt = float((z ** 3).mean()), float((z ** 4).mean())
+    denom = 1 - skew * sr + (kurt - 1) / 4 * sr * sr
+    if denom <= 0:
+        return 0.0
+    return _NORMAL.cdf((sr - benchmark) * math.sqrt(n - 1) / math.sqrt(denom))
+
+def expected_max_sharpe(trials: int, sharpe_std: float) -> float:
+    """독립 시행 trials회의 기대 최대 Sharpe (sharpe_std와 같은 단위). 시행 1회면 0."""
+    if trials <= 1 or sharpe_std <= 0:
+        return 0.0
+    return sharpe_std * ((1 - EULER_GAMMA) * _NORMAL.inv_cdf(1 - 1 / trials)
+                         + EULER_GAMMA * _NORMAL.inv_cdf(1 - 1 / (trials * math.e)))
+
+def significance(returns: pd.Series, cfg: dict = None) -> dict:
+    """일별 수익률 → 부트스트랩 신뢰구간 + PSR / DSR (run_result["bootstrap"] 형식)
+
+    cfg: samples, method ("stationary" | "circular"), block (기본 n^(1/3)), confidence, seed,
+         trials (전략 선택까지 시도한 변형 수), trial_sharpe_std (변형 간 연율 Sharpe 표준편차)
+    """
+    cfg = {**DEFAULTS, **(cfg or {})}
+    r = returns.to_numpy(dtype=float)
+    n = len(r)
+    if n < 3:
+        return {}
+    block = int(cfg["block"] or default_block(n))
+    months = month_labels(returns.index) if isinstance(returns.index, pd.DatetimeIndex) else None
+    point = batch_metrics(r, months)
+    boot = bootstrap_metrics(r, months, int(cfg["samples"]), block, cfg["method"], int(cfg["seed"]))
+
+    alpha = (1 - cfg["confidence"]) / 2
+    out = {"samples": int(cfg["samples"]), "method": cfg["method"], "block": block,
+           "confidence": cfg["confidence"]}
+    for k in REPORTED:
+        lo, hi = np.quantile(boot[k], [alpha, 1 - alpha])
+        out[k] = {"estimate": round(float(point[k][0]), ROUNDING[k]),
+                  "ci": [round(float(lo), ROUNDING[k]), round(float(hi), ROUNDING[k])],
+                  "std": round(float(boot[k].std(ddof=1)), 4)}
+    out["p_sharpe_le_0"] = round(float((boot["sharpe"] <= 0).mean()), 4)
+
+    # PSR (기준 0) / DSR (기준 = 기대 최대 Sharpe) — 일별 단위로 계산
+    trials = int(cfg["trials"])
+    sharpe_std = cfg["trial_sharpe_std"] if cfg["trial_sharpe_std"] is not None else float(boot["sharpe"].std(ddof=1))
+    sr0 = expected_max_sharpe(trials, sharpe_std / math.sqrt(TRADING_DAYS))
+    out["psr"] = round(probabilistic_sharpe(r), 4)
+    out["dsr"] = round(probabilistic_sharpe(r, sr0), 4)
+    out["trials"] = trials
+    out["sharpe_threshold"] = round(sr0 * math.sqrt(TRADING_DAYS), 2)
+    if out["dsr"] < cfg["confidence"]:
+        out["warning"] = f"DSR {out['dsr']:.2f} < {cfg['confidence']} — 시행 수 보정 후 Sharpe 유의성 부족"
+    return out
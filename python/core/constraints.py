@@ -0,0 +1,97 @@
+"""포트폴리오 제약 투영 — 종목 상한 / 섹터 상한 / 회전율을 동시에 만족하는 비중
+
+(시점 × 종목) 비중 행렬과 종목별 섹터 번호 배열로 일괄 처리.
+섹터 매핑은 core/sector_map.json ({code: sector})에서 로드.
+"""
+import json, os
+import numpy as np
+
+SECTOR_MAP_PATH = os.path.join(os.path.dirname(__file__), "sector_map.json")
+DEFAULT_SECTOR = "기타"
+
+def load_sector_map(path: str = SECTOR_MAP_PATH) -> dict:
+    """{code: sector} (파일 없으면 빈 dict → 전 종목 DEFAULT_SECTOR)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def sector_index(codes: list, sector_map: dict) -> tuple[np.ndarray, list]:
+    """종목 목록 → (섹터 번호 배열, 섹터명 목록)"""
+    labels = [sector_map.get(c, DEFAULT_SECTOR) for c in codes]
+    names = sorted(set(labels))
+    lookup = {s: i for i, s in enumerate(names)}
+    return np.array([lookup[s] for s in labels], dtype=int), names
+
+def _clip(W: np.ndarray, max_weight: float, onehot: np.ndarray, cap_sector: bool, sector_cap: float):
+    """종목 상한 / 섹터 상한으로 자름 → (비중, 상한에 걸린 종목 마스크)"""
+    bound = W >= max_weight - 1e-12
+    W = np.minimum(W, max_weight)
+    if cap_sector:
+        totals = W @ onehot                                              # K × G
+        scale = np.where(totals > sector_cap, sector_cap / np.maximum(totals, 1e-300), 1.0)
+        W = W * (scale @ onehot.T)
+        bound |= ((totals >= sector_cap - 1e-12) @ onehot.T) > 0
+    return W, bound
+
+def cap_weights(W: np.ndarray, max_weight: float = 1.0, sectors: np.ndarray = None,
+                sector_cap: float = 1.0, max_iter: int = 100) -> np.ndarray:
+    """종목 상한 / 섹터 상한 초과분을 여유 종목에 비례 재배분 (K × N, 행 합 1 유지).
+
+    상한 안에 1을 다 담을 수 없으면(불가능) 남는 비중은 현금 (행 합 < 1, 백테스트는 1 − Σw를 현금 처리).
+    전부 0인 행은 그대로.
+    """
+    W = np.array(W, dtype=float, ndmin=2)
+    N = W.shape[1]
+    onehot = np.eye(int(sectors.max()) + 1)[sectors] if sectors is not None and N else np.ones((N, 1))
+    cap_sector = sectors is not None and sector_cap < 1.0
+    for _ in range(max_iter):
+        W, bound = _clip(W, max_weight, onehot, cap_sector, sector_cap)
+        deficit = 1.0 - W.sum(axis=1)
+        free = np.where(bound, 0.0, W)
+        free_sum = free.sum(axis=1)
+        active = (deficit > 1e-12) & (free_sum > 0)
+        if not active.any():
+            return W
+        W = W + free * np.where(active, deficit / np.maximum(free_sum, 1e-300), 0.0)[:, None]
+    return _clip(W, max_weight, onehot, cap_sector, sector_cap)[0]
+
+def limit_turnover(W: np.ndarray, prev: np.ndarray, max_turnover: float) -> np.ndarray:
+    """Σ|w − prev| > max_turnover인 행은 prev 쪽으로 변화분 축소 (prev + (w − prev) × scale)"""
+    delta = W - prev
+    turnover = np.abs(delta).sum(axis=1)
+    scale = np.where(turnover > max_turnover, max_turnover / np.maximum(turnover, 1e-300), 1.0)
+    return prev + delta * scale[:, None]
+
+def violations(W: np.ndarray, max_weight: float = 1.0, sectors: np.ndarray = None, sector_cap: float = 1.0,
+               prev: np.ndarray = None, max_turnover: float = None) -> np.ndarray:
+    """행별 최대 제약 위반량"""
+    v = np.maximum(W - max_weight, 0).max(axis=1) if W.shape[1] else np.zeros(len(W))
+    if sectors is not None and W.shape[1]:
+        totals = W @ np.eye(int(sectors.max()) + 1)[sectors]
+        v = np.maximum(v, np.maximum(totals - sector_cap, 0).max(axis=1))
+    if prev is not None and max_turnover is not None:
+        v = np.maximum(v, np.maximum(np.abs(W - prev).sum(axis=1) - max_turnover, 0))
+    return v
+
+def project_weights(W: np.ndarray, max_weight: float = 1.0, sectors: np.ndarray = None,
+                    sector_cap: float = 1.0, prev: np.ndarray = None, max_turnover: float = None,
+                    max_iter: int = 50, tol: float = 1e-9) -> np.ndarray:
+    """상한 재배분 ↔ 회전율 축소를 번갈아 적용해 세 제약을 동시에 만족하는 고정점으로 수렴.
+
+    W, prev: (K × N) — 열은 현재/이전 보유 종목의 합집합
+    prev가 상한을 만족하면 1~2회에 수렴. 동시 만족이 불가능하면 상한을 우선(마지막에 상한 적용) —
+    상한 자체가 불가능하면 cap_weights처럼 남는 비중은 현금.
+    """
+    W = np.array(W, dtype=float, ndmin=2)
+    use_turnover = prev is not None and max_turnover is not None
+    if use_turnover:
+        prev = np.array(prev, dtype=float, ndmin=2)
+    for _ in range(max_iter):
+        W = cap_weights(W, max_weight, sectors, sector_cap)
+        if not use_turnover:
+            return W
+        W = limit_turnover(W, prev, max_turnover)
+        if violations(W, max_weight, sectors, sector_cap, prev, max_turnover).max(initial=0) <= tol:
+            return W
+    return cap_weights(W, max_weight, sectors, sector_cap)
@@ -1,4 +1,5 @@
-"""거래비용 모델 — 수수료 + 슬리피지"""
+"""거래비용 모델 — 수수료 + 슬리피지 + 유동성 제약 체결 시뮬레이션"""
+import numpy as np
 
 def calc_trade_cost(amount: float, fee_bps: float, slippage_bps: float) -> float:
     """거래 비용 계산 (편도)"""
@@ -19,3 +20,57 @@ def check_liquidity(order_amount: float, daily_volume: float, price: float, max_
     """유동성 체크: 일거래량의 max_pct 초과 주문 불가"""
     daily_value = daily_volume * price
     return order_amount <= daily_value * max_pct
+
+# --- 체결 시뮬레이터 (유동성 제약 + 시장충격) ---
+DEFAULT_EXECUTION = {
+    "capital": 1e9,            # 운용 규모 (원) — 비중 → 거래대금 환산
+    "max_participation": 0.1,  # 일 거래대금 대비 최대 체결 비율
+    "impact_coef": 0.1,        # 충격비용 = coef × σ_daily × sqrt(참여율)
+    "vol_window": 20,          # σ 추정 창 (거래일)
+}
+
+def participation_capacity(volume, close, capital: float, max_participation: float):
+    """일별 체결 가능 비중 (T × N) = max_participation × 거래량 × 종가 / 운용 규모. 거래 없으면 0."""
+    return max_participation * np.nan_to_num(np.asarray(volume, dtype=float) * np.asarray(close, dtype=float)) / capital
+
+def sqrt_impact(traded, capacity, sigma, max_participation: float, impact_coef: float):
+    """제곱근 시장충격 비용 (비중 단위): traded × coef × σ × sqrt(참여율)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        participation = np.where(capacity > 0, max_participation * traded / capacity, 0.0)
+    return traded * impact_coef * sigma * np.sqrt(np.clip(participation, 0.0, None))
+
+def simulate_execution(trade, starts, returns, capacity, sigma, fee_bps: float, slippage_bps: float,
+                       max_participation: float, impact_coef: float) -> dict:
+    """리밸런싱 매매 → 일별 체결 (종목·일자 벡터화, 리밸런싱 구간 단위 순회).
+
+    trade: (K × N) 리밸런싱별 매매 비중 (목표 − 드리프트), starts: 길이 K 구간 시작 인덱스
+    returns / capacity / sigma: (T × N) 일별 수익률 / 체결 가능 비중 / 일 변동성
+    구간 안에서 누적 체결 가능량(cumsum)까지 체결, 미체결분은 다음 날로 이월되고
+    다음 리밸런싱 매매에 합산. 미체결 비중은 이전 포지션(매수=현금, 매도=보유)에 남은 것으로
+    보고 수익률을 1차 보정.
+    반환: {"adjust": (T,) 수익률 보정, "cost": (T,) 비용, "filled": (K × N) 구간 말 체결률,
+           "days": (K × N) 전량 체결까지 일수 (-1 = 미완료)}
+    """
+    T, N = returns.shape
+    K = len(starts)
+    ends = np.append(starts[1:], T)
+    unit_cost = (fee_bps + slippage_bps) / 10000
+    adjust, cost = np.zeros(T), np.zeros(T)
+    filled, days = np.ones((K, N)), np.full((K, N), -1)
+    carry = np.zeros(N)
+    for k in range(K):
+        s, e = starts[k], ends[k]
+        order = trade[k] + carry                                   # 이월분 포함 주문 (부호 = 방향)
+        size = np.abs(order)
+        cumcap = np.cumsum(capacity[s:e], axis=0)                  # 구간 누적 체결 가능량
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(size > 0, np.minimum(cumcap / size, 1.0), 1.0)
+        traded = np.diff(frac, axis=0, prepend=0.0) * size         # 일별 체결 비중
+        cost[s:e] = (traded * unit_cost + sqrt_impact(traded, capacity[s:e], sigma[s:e],
+                                                      max_participation, impact_coef)).sum(axis=1)
+        adjust[s:e] = -((1.0 - frac) * order * returns[s:e]).sum(axis=1)
+        filled[k] = frac[-1]
+        done = frac >= 1.0
+        days[k] = np.where(done.any(axis=0), done.argmax(axis=0), -1)
+        carry = (1.0 - frac[-1]) * order
+    return {"adjust": adjust, "cost": cost, "filled": filled, "days": days}
@@ -2,6 +2,8 @@
 
 리밸런싱일 기준 T-1까지만 데이터 접근 허용.
 재무 데이터는 공시일+1 기준으로 사용 가능 시점 태깅.
+재무 이력은 종목별 전 vintage를 보관하고, 사용 가능일(report_date + 래그) 정렬 인덱스로
+여러 기준일 × 전 종목 as-of 조회를 merge_asof 한 번으로 처리.
 """
 import pandas as pd
 from datetime import timedelta
@@ -14,14 +16,46 @@ def get_available_price_data(prices: pd.DataFrame, rebalance_date: str) -> pd.Da
     cutoff = pd.Timestamp(rebalance_date) - timedelta(days=1)
     return prices[prices.index <= cutoff].copy()
 
+def vintage_index(financials: pd.DataFrame, lag_days: int = FINANCIAL_LAG_DAYS) -> pd.DataFrame:
+    """재무 이력 → available_date(report_date + 래그) 오름차순 정렬. 같은 (code, report_date)는 마지막 것만."""
+    df = financials.copy()
+    df["report_date"] = pd.to_datetime(df["report_date"]).astype("datetime64[ns]")
+    df = df.drop_duplicates(["code", "report_date"], keep="last")
+    df["available_date"] = df["report_date"] + pd.Timedelta(days=lag_days)
+    return df.sort_values(["available_date", "code"], kind="stable").reset_index(drop=True)
+
+def fundamentals_asof(financials: pd.DataFrame, dates: list, lag_days: int = FINANCIAL_LAG_DAYS) -> pd.DataFrame:
+    """기준일 × 종목별로 그 시점에 알려진 최신 vintage (long: asof_date, code, ...).
+
+    report_date + lag_days <= 기준일 인 vintage 중 가장 최근 것. 아직 알려진 vintage가 없는 종목은 행 없음.
+    """
+    if financials.empty or "report_date" not in financials.columns:
+        return financials.assign(asof_date=pd.NaT).iloc[:0]
+    vintages = vintage_index(financials, lag_days)
+    asof = pd.DatetimeIndex(pd.to_datetime(pd.Index(dates))).astype("datetime64[ns]").unique().sort_values()
+    codes = vintages["code"].unique()
+    grid = pd.DataFrame({
+        "asof_date": asof.repeat(len(codes)),
+        "code": pd.Index(codes).tolist() * len(asof),
+    })
+    merged = pd.merge_asof(grid, vintages, left_on="asof_date", right_on="available_date",
+                           by="code", direction="backward")
+    return merged.dropna(subset=["available_date"]).reset_index(drop=True)
+
+def latest_vintage(financials: pd.DataFrame) -> pd.DataFrame:
+    """종목별 최신 vintage 1행 (래그 미적용 — 현재 시점 시그널용)"""
+    if financials.empty or "report_date" not in financials.columns:
+        return financials
+    df = financials.sort_values("report_date", kind="stable")
+    return df.drop_duplicates("code", keep="last").reset_index(drop=True)
+
 def get_available_financial_data(financials: pd.DataFrame, rebalance_date: str) -> pd.DataFrame:
-    """공시 래그 반영된 재무 데이터만 반환.
+    """공시 래그 반영된 재무 데이터 — 종목별 리밸런싱일에 알려진 최신 vintage 1행.
     report_date + FINANCIAL_LAG_DAYS <= rebalance_date 인 것만 사용.
     """
-    cutoff = pd.Timestamp(rebalance_date) - timedelta(days=FINANCIAL_LAG_DAYS)
-    if "report_date" in financials.columns:
-        return financials[financials["report_date"] <= cutoff].copy()
-    return financials
+    if "report_date" not in financials.columns:
+        return financials
+    return fundamentals_asof(financials, [rebalance_date]).drop(columns=["asof_date", "available_date"])
 
 def get_rebalance_dates(start: str, end: str, freq: str = "M") -> list[str]:
     """리밸런싱 일정 생성 (월초 영업일 기준)"""
@@ -0,0 +1,392 @@
+"""팩터 수식 엔진 — 수식 문자열 → 공통 부분식 공유 DAG → (날짜 × 종목) NumPy 일괄 계산
+
+문법 (Python 식 부분집합):
+  재무 컬럼   per, pbr, roe, debt_ratio, op_margin (대소문자 무시, 최신 공시 vintage 횡단면)
+  가격        close (날짜 × 종목 패널)
+  산술        + - * / 단항-, 숫자 상수. 0으로 나누면 NaN.
+  시계열      ret(n, skip=0)  n거래일 창 첫날→끝날 수익률 (최근 skip일 제외, n ≥ 2)
+              vol(n)          일수익률 n일 표본 표준편차
+              ma(x, n)        n일 이동평균
+              std(x, n)       n일 이동 표본 표준편차
+              delay(x, n)     n일 전 값
+  원소별      log(x), abs(x)
+
+ret/vol은 delay/std 등 원시 노드로 전개한 뒤 (연산, 입력 노드, 인자) 키로 중복 제거하므로
+한 스펙의 모든 팩터가 같은 부분식(예: delay(close, 5))을 한 번만 계산.
+시계열 결과는 종목별 마지막 관측일 값으로 횡단면화 (evaluate_history는 기준일마다 같은 규칙).
+모든 연산은 종목(열)별 독립 — 종목 부분집합만 계산해도 결과가 같음 (factor_store 증분 계산 전제).
+"""
+import ast
+import numpy as np
+import pandas as pd
+from core.panel import last_observed, last_observed_rows
+from core.data_clock import latest_vintage, vintage_index, fundamentals_asof
+from core import factor_store
+
+PRICE_FIELDS = ("close",)
+FUNDAMENTAL_COLUMNS = ("per", "pbr", "roe", "debt_ratio", "op_margin")  # data_agent 재무 패널 컬럼
+ROLLING_OPS = {"ma": "mean", "std": "std"}
+UNARY_OPS = ("log", "abs")
+_BINOPS = {ast.Add: "add", ast.Sub: "sub", ast.Mult: "mul", ast.Div: "div"}
+
+def parse(formula: str) -> ast.expr:
+    """수식 → AST (문법 오류는 ValueError)"""
+    try:
+        return ast.parse(formula.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"수식 문법 오류: {formula!r} ({e.msg})") from None
+
+def _int_arg(node: ast.expr, formula: str) -> int:
+    if isinstance(node, ast.Constant) and isinstance(node.value, int) and node.value >= 0:
+        return node.value
+    raise ValueError(f"{formula!r}: 기간 인자는 0 이상 정수 상수")
+
+def _call_args(node: ast.Call, formula: str, names: tuple) -> list:
+    """위치/키워드 인자 → names 순서 목록 (빠진 인자는 None)"""
+    if len(node.args) > len(names):
+        raise ValueError(f"{formula!r}: {node.func.id}() 인자 과다")
+    args = list(node.args) + [None] * (len(names) - len(node.args))
+    for kw in node.keywords:
+        if kw.arg not in names or args[names.index(kw.arg)] is not None:
+            raise ValueError(f"{formula!r}: {node.func.id}() 인자 {kw.arg!r} 오류")
+        args[names.index(kw.arg)] = kw.value
+    return args
+
+class _Builder(ast.NodeVisitor):
+    """AST → 노드 목록 (중복 제거). 노드: (연산, 입력 노드 id …, 정수 인자 …), 종류: panel | cross | const"""
+
+    def __init__(self, program: dict, formula: str):
+        self.program, self.formula = program, formula
+
+    def node(self, key: tuple, kind: str) -> int:
+        ids = self.program["ids"]
+        if key not in ids:
+            ids[key] = len(self.program["nodes"])
+            self.program["nodes"].append(key)
+            self.program["kinds"].append(kind)
+        return ids[key]
+
+    def kind(self, *ids) -> str:
+        kinds = [self.program["kinds"][i] for i in ids]
+        return "panel" if "panel" in kinds else "cross" if "cross" in kinds else "const"
+
+    def const(self, value: float) -> int:
+        return self.node(("const", float(value)), "const")
+
+    def binary(self, op: str, a: int, b: int) -> int:
+        nodes = self.program["nodes"]
+        if nodes[a][0] == "const" and nodes[b][0] == "const":
+            x, y = nodes[a][1], nodes[b][1]
+            return self.const({"add": x + y, "sub": x - y, "mul": x * y,
+                               "div": x / y if y != 0 else np.nan}[op])
+        if op in ("add", "mul") and b < a:  # 교환 법칙 정규화
+            a, b = b, a
+        return self.node((op, a, b), self.kind(a, b))
+
+    def panel_op(self, op: str, a: int, n: int, label: str = None) -> int:
+        label = label or op
+        if self.program["kinds"][a] != "panel":
+            raise ValueError(f"{self.formula!r}: {label}()는 가격 시계열에만 적용 가능")
+        if op == "delay" and n == 0:
+            return a
+        if op != "delay" and n < (2 if op == "std" else 1):
+            raise ValueError(f"{self.formula!r}: {label}() 기간이 너무 짧음")
+        return self.node((op, a, n), "panel")
+
+    def returns(self, end_lag: int, start_lag: int) -> int:
+        """(close[t-end_lag] − close[t-start_lag]) / close[t-start_lag]"""
+        close = self.field("close")
+        end = self.panel_op("delay", close, end_lag)
+        start = self.panel_op("delay", close, start_lag)
+        return self.binary("div", self.binary("sub", end, start), start)
+
+    def field(self, name: str) -> int:
+        if name in PRICE_FIELDS:
+            self.program["fields"].add(name)
+            return self.node(("field", name), "panel")
+        if name not in FUNDAMENTAL_COLUMNS:
+            raise ValueError(f"{self.formula!r}: 알 수 없는 이름 {name!r} "
+                             f"(가격 {', '.join(PRICE_FIELDS)} / 재무 {', '.join(FUNDAMENTAL_COLUMNS)})")
+        self.program["columns"].add(name)
+        return self.node(("column", name), "cross")
+
+    def visit_Expression(self, node):
+        return self.visit(node.body)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"{self.formula!r}: 숫자 상수만 허용")
+        return self.const(node.value)
+
+    def visit_Name(self, node):
+        return self.field(node.id.lower())
+
+    def visit_UnaryOp(self, node):
+        a = self.visit(node.operand)
+        if isinstance(node.op, ast.USub):
+            return self.binary("mul", self.const(-1.0), a)
+        if isinstance(node.op, ast.UAdd):
+            return a
+        raise ValueError(f"{self.formula!r}: 지원하지 않는 단항 연산")
+
+    def visit_BinOp(self, node):
+        op = _BINOPS.get(type(node.op))
+        if op is None:
+            raise ValueError(f"{self.formula!r}: 지원하지 않는 연산자")
+        return self.binary(op, self.visit(node.left), self.visit(node.right))
+
+    def visit_Call(self, node):
+        name = node.func.id.lower() if isinstance(node.func, ast.Name) else None
+        if name == "ret":
+            n, skip = _call_args(node, self.formula, ("n", "skip"))
+            if n is None:
+                raise ValueError(f"{self.formula!r}: ret() 기간 필요")
+            n = _int_arg(n, self.formula)
+            if n < 2:
+                raise ValueError(f"{self.formula!r}: ret() 기간은 2 이상")
+            skip = _int_arg(skip, self.formula) if skip is not None else 0
+            return self.returns(skip, n + skip - 1)
+        if name == "vol":
+            (n,) = _call_args(node, self.formula, ("n",))
+            if n is None:
+                raise ValueError(f"{self.formula!r}: vol() 기간 필요")
+            return self.panel_op("std", self.returns(0, 1), _int_arg(n, self.formula), "vol")
+        if name in ROLLING_OPS or name == "delay":
+            x, n = _call_args(node, self.formula, ("x", "n"))
+            if x is None or n is None:
+                raise ValueError(f"{self.formula!r}: {name}(x, n) 형식")
+            return self.panel_op(ROLLING_OPS.get(name, name), self.visit(x), _int_arg(n, self.formula), name)
+        if name in UNARY_OPS:
+            (x,) = _call_args(node, self.formula, ("x",))
+            if x is None:
+                raise ValueError(f"{self.formula!r}: {name}(x) 형식")
+            a = self.visit(x)
+            return self.node((name, a), self.kind(a))
+        raise ValueError(f"{self.formula!r}: 알 수 없는 함수 {ast.unparse(node.func)}")
+
+    def generic_visit(self, node):
+        raise ValueError(f"{self.formula!r}: 지원하지 않는 구문 {type(node).__name__}")
+
+def compile_formulas(formulas: dict) -> dict:
+    """{팩터 id: 수식} → 프로그램 (노드 목록 공유). 수식 오류는 ValueError."""
+    program = {"nodes": [], "kinds": [], "ids": {}, "outputs": {}, "fields": set(), "columns": set()}
+    for fid, formula in formulas.items():
+        program["outputs"][fid] = _Builder(program, formula).visit(parse(formula))
+    return program
+
+# --- 평가 ---
+
+def _shift(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if n < len(x):
+        out[n:] = x[:len(x) - n]
+    return out
+
+def _window_sum(x: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """n일 창 합계 + 창 안 NaN 유무 (누적합 차분, O(T))"""
+    nan = np.isnan(x)
+    c = np.concatenate([np.zeros((1,) + x.shape[1:]), np.cumsum(np.where(nan, 0.0, x), axis=0)])
+    k = np.concatenate([np.zeros((1,) + x.shape[1:]), np.cumsum(nan, axis=0)])
+    s = np.full_like(x, np.nan)
+    gap = np.ones(x.shape, dtype=bool)
+    if n <= len(x):
+        s[n - 1:] = c[n:] - c[:-n]
+        gap[n - 1:] = (k[n:] - k[:-n]) > 0
+    return s, gap
+
+def _rolling(x: np.ndarray, n: int, op: str) -> np.ndarray:
+    """pandas rolling(n) 기본값과 같은 규칙: 창 안에 NaN이 있거나 창이 덜 차면 NaN"""
+    s1, gap = _window_sum(x, n)
+    mean = s1 / n
+    if op == "mean":
+        return np.where(gap, np.nan, mean)
+    # 평균을 뺀 뒤 제곱합 — 가격 수준이 커도 상쇄 오차 억제
+    valid = ~np.isnan(x)
+    center = np.where(valid, x, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+    s1c, _ = _window_sum(x - center, n)
+    s2c, _ = _window_sum((x - center) ** 2, n)
+    var = np.maximum((s2c - s1c * s1c / n) / (n - 1), 0.0)
+    return np.where(gap, np.nan, np.sqrt(var))
+
+def _children(key: tuple) -> tuple:
+    """입력 노드 id (나머지 원소는 상수/이름/기간 인자)"""
+    if key[0] in _BINOPS.values():
+        return key[1:3]
+    return () if key[0] in ("const", "field", "column") else key[1:2]
+
+def _apply(key: tuple, vals: dict, leaves: dict) -> np.ndarray:
+    op = key[0]
+    if op == "const":
+        return np.float64(key[1])
+    if op in ("field", "column"):
+        return leaves[key]
+    a = vals[key[1]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if op == "add":
+            return a + vals[key[2]]
+        if op == "sub":
+            return a - vals[key[2]]
+        if op == "mul":
+            return a * vals[key[2]]
+        if op == "div":
+            b = vals[key[2]]
+            return np.where(b != 0, a / np.where(b != 0, b, 1.0), np.nan)
+        if op == "log":
+            return np.where(a > 0, np.log(np.where(a > 0, a, 1.0)), np.nan)
+        if op == "abs":
+            return np.abs(a)
+    if op == "delay":
+        return _shift(a, key[2])
+    return _rolling(a, key[2], op)
+
+def _subgraph(nodes: list, targets) -> list:
+    """targets 계산에 필요한 노드 id (오름차순 = 위상 순서)"""
+    need, stack = set(), list(targets)
+    while stack:
+        i = stack.pop()
+        if i not in need:
+            need.add(i)
+            stack.extend(_children(nodes[i]))
+    return sorted(need)
+
+def _execute(nodes: list, targets, leaves: dict) -> dict:
+    """targets에 필요한 노드만 한 번씩 계산, 마지막 사용 후 해제 → {target: 값}"""
+    order = _subgraph(nodes, targets)
+    last_use = {child: i for i in order for child in _children(nodes[i])}
+    keep = set(targets)
+    vals = {}
+    for i in order:
+        vals[i] = _apply(nodes[i], vals, leaves)
+        for child in _children(nodes[i]):
+            if last_use[child] == i and child not in keep:
+                del vals[child]
+    return {i: vals[i] for i in targets}
+
+def signature(program: dict, i: int) -> str:
+    """노드 i의 정규화 정의 문자열 (팩터 id·표기와 무관)"""
+    key = program["nodes"][i]
+    if key[0] in ("const", "field", "column"):
+        return f"{key[0]}:{key[1]!r}"
+    kids = [signature(program, c) for c in _children(key)]
+    return f"{key[0]}({','.join(kids + [str(a) for a in key[1 + len(kids):]])})"
+
+def lookback(program: dict, i: int) -> int:
+    """노드 i 한 행을 계산하는 데 필요한 과거 행 수"""
+    key = program["nodes"][i]
+    if key[0] in ("const", "field", "column"):
+        return 0
+    depth = max(lookback(program, c) for c in _children(key))
+    if key[0] == "delay":
+        return depth + key[2]
+    return depth + key[2] - 1 if key[0] in ROLLING_OPS.values() else depth
+
+def price_only(program: dict, i: int) -> bool:
+    """재무 컬럼 없이 가격 시계열만으로 계산되는 panel 노드인지 (팩터 저장소 대상)"""
+    nodes = program["nodes"]
+    return program["kinds"][i] == "panel" and all(nodes[j][0] != "column" for j in _subgraph(nodes, [i]))
+
+def _run(program: dict, targets: set, close_w: pd.DataFrame, leaves: dict, store: str = None) -> dict:
+    """targets 노드 실행 — 가격만 쓰는 시계열 노드는 store에서 읽고 빠진 부분만 계산"""
+    nodes = program["nodes"]
+    stored = {i for i in targets if store and len(close_w) and price_only(program, i)}
+    vals = _execute(nodes, [i for i in targets if i not in stored], leaves)
+    for i in stored:
+        compute = lambda X, i=i: np.broadcast_to(
+            _execute(nodes, [i], {("field", "close"): X})[i], X.shape)
+        vals[i] = factor_store.fetch(store, signature(program, i), close_w, compute, lookback(program, i))
+    return vals
+
+def evaluate(program: dict, close: pd.DataFrame, fundamentals: pd.DataFrame, codes: list,
+             store: str = None) -> pd.DataFrame:
+    """프로그램 실행 → (종목 × 팩터 id) 원값. 노드는 한 번씩만 계산하고 마지막 사용 후 해제.
+
+    close: (날짜 × 종목) 종가, fundamentals: long 재무 패널 (최신 vintage 사용)
+    store: 팩터 저장소 디렉터리 — 가격만 쓰는 시계열 팩터는 저장소에서 읽고 빠진 부분만 계산
+    없는 재무 컬럼 / 가격 없는 종목은 NaN.
+    """
+    kinds, outputs = program["kinds"], program["outputs"]
+    close_w = close.reindex(columns=codes) if not close.empty else pd.DataFrame(index=[], columns=codes)
+    leaves = {("field", "close"): close_w.to_numpy(dtype=float)} if "close" in program["fields"] else {}
+    if program["columns"]:
+        latest = latest_vintage(fundamentals).set_index("code").reindex(codes) if not fundamentals.empty \
+            else pd.DataFrame(index=codes)
+        for col in program["columns"]:
+            leaves[("column", col)] = latest[col].to_numpy(dtype=float) if col in latest.columns \
+                else np.full(len(codes), np.nan)
+
+    vals = _run(program, set(outputs.values()), close_w, leaves, store)
+
+    out = {}
+    for fid, i in outputs.items():
+        if kinds[i] == "panel":
+            panel = pd.DataFrame(np.broadcast_to(vals[i], close_w.shape), index=close_w.index, columns=codes)
+            col = last_observed(panel, close_w).reindex(codes) if len(close_w) \
+                else pd.Series(np.nan, index=codes)
+            out[fid] = col.to_numpy(dtype=float)
+        else:
+            out[fid] = np.broadcast_to(np.asarray(vals[i], dtype=float), (len(codes),)).copy()
+    return pd.DataFrame(out, index=codes, columns=list(outputs))
+
+def _pit_column(vintages: pd.DataFrame, col: str, close: pd.DataFrame, codes: list) -> np.ndarray:
+    """재무 컬럼 → (날짜 × 종목) 시점 패널: 각 거래일에 사용 가능한 최신 vintage 값 (전진 채움)"""
+    T, N = close.shape
+    out = np.full((T, N), np.nan)
+    if col not in vintages.columns:
+        return out
+    j = pd.Index(codes).get_indexer(vintages["code"])
+    t = close.index.searchsorted(pd.DatetimeIndex(vintages["available_date"]), side="left")
+    keep = (j >= 0) & (t < T)
+    seen = np.zeros((T, N), dtype=bool)
+    out[t[keep], j[keep]] = vintages[col].to_numpy(dtype=float)[keep]  # available_date 오름차순 → 나중 vintage 우선
+    seen[t[keep], j[keep]] = True
+    src = np.maximum.accumulate(np.where(seen, np.arange(T)[:, None], 0), axis=0)
+    filled = out[src, np.arange(N)]
+    return np.where(np.maximum.accumulate(seen, axis=0), filled, np.nan)
+
+def evaluate_history(program: dict, close: pd.DataFrame, fundamentals: pd.DataFrame, codes: list,
+                     dates: list, store: str = None) -> dict:
+    """기준일별 팩터 원값 → {팩터 id: (K × N) 배열} — 시계열 노드는 전 구간 한 번 계산 후 기준일 행만 추출.
+
+    기준일 d의 값: 가격은 d 전일까지 종목별 마지막 관측일 값, 재무는 d에 사용 가능한 vintage
+    (data_clock 공시 래그, 가격과 섞인 수식은 각 거래일에 사용 가능한 vintage).
+    """
+    kinds, outputs = program["kinds"], program["outputs"]
+    dates = pd.DatetimeIndex(pd.to_datetime(pd.Index(dates)))
+    close_w = close.reindex(columns=codes) if not close.empty else pd.DataFrame(index=pd.DatetimeIndex([]), columns=codes)
+    K, N = len(dates), len(codes)
+
+    panel_ids = {i for i in outputs.values() if kinds[i] == "panel"}
+    cross_ids = set(outputs.values()) - panel_ids
+    panel_cols = {program["nodes"][j][1] for i in panel_ids for j in _subgraph(program["nodes"], [i])
+                  if program["nodes"][j][0] == "column"}
+    vintages = vintage_index(fundamentals) if not fundamentals.empty and "report_date" in fundamentals.columns \
+        else pd.DataFrame(columns=["code", "available_date"])
+
+    vals = {}
+    if cross_ids:
+        asof = fundamentals_asof(fundamentals, list(dates)) if len(vintages) else pd.DataFrame()
+        leaves = {}
+        for col in program["columns"]:
+            wide = asof.pivot(index="asof_date", columns="code", values=col) if col in asof.columns \
+                else pd.DataFrame()
+            leaves[("column", col)] = wide.reindex(index=dates, columns=codes).to_numpy(dtype=float)
+        vals.update(_execute(program["nodes"], list(cross_ids), leaves))
+    if panel_ids and len(close_w):
+        leaves = {("field", "close"): close_w.to_numpy(dtype=float)} if "close" in program["fields"] else {}
+        for col in panel_cols:
+            leaves[("column", col)] = _pit_column(vintages, col, close_w, codes)
+        vals.update(_run(program, panel_ids, close_w, leaves, store))
+
+    rows = last_observed_rows(close_w, dates) if len(close_w) else np.full((K, N), -1)
+    out = {}
+    for fid, i in outputs.items():
+        if i in panel_ids:
+            if not len(close_w):
+                out[fid] = np.full((K, N), np.nan)
+                continue
+            panel = np.broadcast_to(vals[i], close_w.shape)
+            picked = panel[np.maximum(rows, 0), np.arange(N)]
+            out[fid] = np.where(rows >= 0, picked, np.nan)
+        else:
+            out[fid] = np.broadcast_to(np.asarray(vals[i], dtype=float), (K, N)).copy()
+    return out
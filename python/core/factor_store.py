@@ -0,0 +1,132 @@
+"""팩터 저장소 — 정규화된 팩터 정의별 (날짜 × 종목) 값을 디스크에 보관해 전략·실행 간 재사용
+
+<root>/<key>/{meta.json, dates.npy, values.npy, versions.npy}
+  key       정규화 정의 문자열의 sha256 (팩터 id·수식 표기와 무관)
+  versions  종목별 원천 버전 (panel.VERSION_ATTR — data_agent manifest rev, 과거 정정 시에만 바뀜)
+values.npy는 memmap으로 읽고, 버전이 같은 종목은 요청 구간과 겹치는 날짜를 재사용,
+새 종목·버전이 바뀐 종목은 전 구간, 뒤에 추가된 날짜는 lookback 워밍업 포함 구간만 계산.
+요청이 저장 구간의 앞부분·중간이면 (요청 시작이 저장 시작보다 늦으면 앞 lookback행만 다시 계산) 읽기만 하고,
+저장 구간을 덮는 요청일 때만 항목을 다시 씀 — 기간이 다른 전략이 서로의 항목을 밀어내지 않도록.
+버전 표가 없는 패널(csv 폴백·메모리에서 만든 패널)은 저장소를 쓰지 않고 매번 계산.
+총 용량이 max_bytes를 넘으면 최근 사용이 오래된 항목부터 삭제 (LRU).
+"""
+import hashlib, json, os, shutil
+import numpy as np
+import pandas as pd
+from core.panel import panel_versions
+
+FORMAT = 2
+FACTOR_STORE_DIR = os.path.join("cache", "factors")  # 원천 데이터 디렉터리 기준 기본 위치
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+def entry_key(definition: str) -> str:
+    return hashlib.sha256(f"{FORMAT}:{definition}".encode()).hexdigest()
+
+def _read_entry(path: str):
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT:
+            return None
+        entry = {"codes": meta["codes"],
+                 "dates": np.load(os.path.join(path, "dates.npy")),
+                 "versions": np.load(os.path.join(path, "versions.npy")),
+                 "values": np.load(os.path.join(path, "values.npy"), mmap_mode="r")}
+    except (OSError, ValueError, KeyError):
+        return None
+    os.utime(os.path.join(path, "meta.json"))  # LRU 기준 갱신
+    return entry
+
+def _write_entry(path: str, definition: str, dates: np.ndarray, codes: list, values: np.ndarray,
+                 versions: np.ndarray):
+    """tmp에 쓰고 교체 (동시에 같은 항목을 쓴 쪽이 있으면 그쪽 결과 유지)"""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "dates.npy"), dates)
+    np.save(os.path.join(tmp, "values.npy"), values)
+    np.save(os.path.join(tmp, "versions.npy"), versions)
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({"format": FORMAT, "definition": definition, "codes": codes, "shape": list(values.shape)}, f)
+    shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def _entry_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+def prune(root: str, max_bytes: int = DEFAULT_MAX_BYTES) -> int:
+    """최근 사용 순으로 max_bytes까지만 유지. 삭제한 항목 수 반환."""
+    if not os.path.isdir(root):
+        return 0
+    entries = []
+    for name in os.listdir(root):
+        marker = os.path.join(root, name, "meta.json")
+        if os.path.exists(marker):
+            entries.append((os.path.getmtime(marker), name))
+    total, removed = 0, 0
+    for _, name in sorted(entries, reverse=True):
+        path = os.path.join(root, name)
+        total += _entry_bytes(path)
+        if total > max_bytes:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+def fetch(root: str, definition: str, close: pd.DataFrame, compute, lookback: int,
+          max_bytes: int = DEFAULT_MAX_BYTES) -> np.ndarray:
+    """저장된 값 재사용 + 빠진 날짜/종목만 계산 → (날짜 × 종목) 배열 (close와 같은 모양).
+
+    compute: 종가 배열 (t × n) → 같은 모양 팩터 값. 행 앞 lookback일이 워밍업.
+    """
+    X = close.to_numpy(dtype=float)
+    versions = panel_versions(close)
+    if versions is None:
+        return compute(X)
+    path = os.path.join(root, entry_key(definition))
+    dates = pd.DatetimeIndex(close.index).to_numpy(dtype="datetime64[ns]")
+    codes = [str(c) for c in close.columns]
+    T, N = X.shape
+    entry = _read_entry(path)
+
+    out = np.full((T, N), np.nan)
+    hit = np.zeros(N, dtype=bool)
+    a, b = 0, 0  # 요청 [0, b)행 = 저장 [a, a+b)행
+    if entry is not None and len(entry["dates"]):
+        E = entry["dates"]
+        a = int(np.searchsorted(E, dates[0]))
+        b = min(len(E) - a, T)
+        if b > 0 and np.array_equal(E[a:a + b], dates[:b]):
+            pos = {c: j for j, c in enumerate(entry["codes"])}
+            src = np.array([pos.get(c, -1) for c in codes])
+            known = src >= 0
+            hit = known & (versions != 0) & (entry["versions"][np.where(known, src, 0)] == versions)
+            out[:b, hit] = entry["values"][a:a + b][:, src[hit]]
+        else:
+            a, b = 0, 0
+    fresh = ~hit
+    if fresh.any():
+        out[:, fresh] = compute(X[:, fresh])
+    if hit.any() and a > 0:  # 요청 시작이 저장 시작보다 늦음 — 워밍업이 잘린 앞 구간은 요청 기준으로 다시 계산
+        w = min(lookback, T)
+        out[:w, hit] = compute(X[:w, hit])
+    if hit.any() and b < T:
+        start = max(b - lookback, 0)
+        out[b:, hit] = compute(X[start:, hit])[b - start:]
+
+    covers = entry is None or not len(entry["dates"]) or \
+        (dates[0] <= entry["dates"][0] and dates[-1] >= entry["dates"][-1])
+    if covers and (fresh.any() or b < T):
+        keep_codes, keep_values, keep_versions = codes, out, versions
+        if entry is not None and a == 0 and b == T == len(entry["dates"]):  # 같은 구간 — 요청에 없는 저장 종목 유지
+            extra = [j for j, c in enumerate(entry["codes"]) if c not in set(codes)]
+            if extra:
+                keep_codes = codes + [entry["codes"][j] for j in extra]
+                keep_values = np.hstack([out, entry["values"][:, extra]])
+                keep_versions = np.concatenate([versions, entry["versions"][extra]])
+        os.makedirs(root, exist_ok=True)
+        _write_entry(path, definition, dates, keep_codes, keep_values, keep_versions)
+        prune(root, max_bytes)
+    return out
@@ -0,0 +1,112 @@
+"""성과 지표 엔진 — (시점 × 시계열) 수익률 행렬을 열 단위로 한 번에 계산
+
+NaN은 관측 없음으로 취급 (길이가 다른 수익률 흐름을 NaN 패딩해 함께 계산 가능).
+"""
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+RF_ANNUAL = 0.03
+MONTH_BLOCK = 21  # 날짜 인덱스가 없을 때 월 버킷 길이 (거래일)
+METRIC_KEYS = ("cagr", "sharpe", "sortino", "mdd", "win_rate", "profit_factor")
+ROUNDING = {"cagr": 4, "sharpe": 2, "sortino": 2, "mdd": 4, "win_rate": 4, "profit_factor": 2}
+
+def _as_matrix(returns) -> np.ndarray:
+    r = np.asarray(returns, dtype=float)
+    return r[:, None] if r.ndim == 1 else r
+
+def month_labels(index, n: int = None) -> np.ndarray:
+    """월 버킷 라벨: DatetimeIndex면 연*12+월, 아니면 MONTH_BLOCK 거래일 블록"""
+    if isinstance(index, pd.DatetimeIndex):
+        return (index.year * 12 + index.month).to_numpy()
+    return np.arange(len(index) if n is None else n) // MONTH_BLOCK
+
+def _log_wealth(r: np.ndarray) -> np.ndarray:
+    """누적 로그 성장 (NaN 구간은 성장 0)"""
+    return np.cumsum(np.log1p(np.maximum(np.nan_to_num(r), -0.999999)), axis=0)
+
+def batch_metrics(returns, months=None) -> dict:
+    """CAGR, Sharpe, Sortino, MDD, Win Rate, Profit Factor — 열마다 하나씩.
+
+    returns: (T,) 또는 (T × K) 일별 수익률
+    months: 길이 T 월 버킷 라벨 (시간순), None이면 MONTH_BLOCK 거래일 블록
+    반환: {지표: 길이 K 배열}. 관측 2개 미만인 열은 전 지표 0.
+    """
+    r = _as_matrix(returns)
+    T, K = r.shape
+    valid = ~np.isnan(r)
+    x = np.where(valid, r, 0.0)
+    n = valid.sum(axis=0)
+    n_safe = np.maximum(n, 1)
+    rf_daily = RF_ANNUAL / TRADING_DAYS
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        # CAGR
+        L = _log_wealth(r)
+        total = np.exp(L[-1]) if T else np.ones(K)
+        years = np.maximum(n / TRADING_DAYS, 0.01)
+        cagr = total ** (1 / years) - 1
+
+        # Sharpe (연율화, 무위험 3%) — 초과수익 표준편차 = 수익률 표준편차
+        mean = x.sum(axis=0) / n_safe
+        var = ((x - mean) ** 2 * valid).sum(axis=0) / np.maximum(n - 1, 1)
+        std = np.sqrt(var)
+        sharpe = np.where(std > 0, (mean - rf_daily) / std * np.sqrt(TRADING_DAYS), 0.0)
+
+        # Sortino (하방 편차: 음수 수익률의 표본 표준편차, 2개 미만이면 1e-8)
+        neg = valid & (x < 0)
+        n_neg = neg.sum(axis=0)
+        neg_mean = np.where(neg, x, 0).sum(axis=0) / np.maximum(n_neg, 1)
+        neg_var = ((x - neg_mean) ** 2 * neg).sum(axis=0) / np.maximum(n_neg - 1, 1)
+        down_std = np.where(n_neg > 1, np.sqrt(neg_var), 1e-8)
+        sortino = (mean - rf_daily) / down_std * np.sqrt(TRADING_DAYS)
+
+        # MDD (누적 최대 대비)
+        peak = np.maximum.accumulate(np.where(valid, L, -np.inf), axis=0)
+        mdd = np.where(valid, np.exp(L - peak) - 1, 0.0).min(axis=0) if T else np.zeros(K)
+
+        # Win Rate / Profit Factor (월 단위 합산)
+        labels = month_labels(None, T) if months is None else np.asarray(months)
+        if T:
+            starts = np.flatnonzero(np.concatenate([[True], labels[1:] != labels[:-1]]))
+            monthly = np.add.reduceat(x, starts, axis=0)
+            observed = np.add.reduceat(valid, starts, axis=0) > 0
+        else:
+            monthly = observed = np.zeros((0, K))
+        wins = observed & (monthly > 0)
+        losses = observed & (monthly < 0)
+        win_rate = wins.sum(axis=0) / np.maximum(observed.sum(axis=0), 1)
+        win_sum = np.where(wins, monthly, 0).sum(axis=0)
+        loss_sum = np.where(losses, monthly, 0).sum(axis=0)
+        profit_factor = np.where(loss_sum != 0, win_sum / np.abs(loss_sum), np.inf)
+
+    out = {"cagr": cagr, "sharpe": sharpe, "sortino": sortino, "mdd": mdd,
+           "win_rate": win_rate, "profit_factor": profit_factor}
+    short = n < 2
+    return {k: np.where(short, 0.0, v) for k, v in out.items()}
+
+def round_metrics(metrics: dict, col: int = 0) -> dict:
+    """batch_metrics 결과의 한 열 → 반올림된 dict (run_result.json 형식)"""
+    return {k: round(float(metrics[k][col]), ROUNDING[k]) for k in METRIC_KEYS}
+
+def rolling_sharpe(returns, window: int) -> np.ndarray:
+    """window 거래일 이동 Sharpe (연율화) — 누적합으로 O(T). 앞 window-1 행은 NaN."""
+    r = np.nan_to_num(_as_matrix(returns))
+    T = r.shape[0]
+    out = np.full(r.shape, np.nan)
+    if window < 2 or T < window:
+        return out
+    S1 = np.vstack([np.zeros(r.shape[1]), np.cumsum(r, axis=0)])
+    S2 = np.vstack([np.zeros(r.shape[1]), np.cumsum(r * r, axis=0)])
+    s1 = S1[window:] - S1[:-window]
+    s2 = S2[window:] - S2[:-window]
+    mean = s1 / window
+    std = np.sqrt(np.maximum((s2 - window * mean * mean) / (window - 1), 0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[window - 1:] = np.where(std > 0, (mean - RF_ANNUAL / TRADING_DAYS) / std * np.sqrt(TRADING_DAYS), 0.0)
+    return out
+
+def rolling_drawdown(returns) -> np.ndarray:
+    """시점별 낙폭 (누적 최대 대비, ≤ 0) — running max로 O(T)"""
+    L = _log_wealth(_as_matrix(returns))
+    return np.exp(L - np.maximum.accumulate(L, axis=0)) - 1
@@ -0,0 +1,99 @@
+"""온라인 성과 지표 — 수익률을 이어받아 누적하는 영속 누산기 (core.metrics batch_metrics와 같은 정의)
+
+  state = new_state()
+  update(state, returns, month_labels(index))   # 1일분이든 전 구간이든 O(추가분)
+  metrics(state)                                 # run_result 형식 (반올림)
+
+Sharpe / Sortino  Welford 평균·제곱편차 합 (전체 / 음수 수익률), 배치 병합은 Chan 병합식
+MDD               누적 로그 성장 + 최고치
+Win Rate / PF     월 버킷: 마감된 달은 집계만, 진행 중인 달은 합계 유지
+state는 JSON 직렬화 가능한 dict (−inf 최고치는 None).
+"""
+import math
+import numpy as np
+from core.metrics import TRADING_DAYS, RF_ANNUAL, ROUNDING, METRIC_KEYS
+
+def new_state() -> dict:
+    return {"n": 0, "mean": 0.0, "m2": 0.0,
+            "neg_n": 0, "neg_mean": 0.0, "neg_m2": 0.0,
+            "log_wealth": 0.0, "peak": None, "mdd": 0.0,
+            "month": None, "month_sum": 0.0,
+            "months": 0, "wins": 0, "losses": 0, "win_sum": 0.0, "loss_sum": 0.0}
+
+def _merge(state: dict, prefix: str, x: np.ndarray):
+    """Welford 누산기에 배치 x 병합 (n, mean, m2)"""
+    nb = len(x)
+    if nb == 0:
+        return
+    na, ma = state[f"{prefix}n"], state[f"{prefix}mean"]
+    mb = float(x.mean())
+    m2b = float(((x - mb) ** 2).sum())
+    n = na + nb
+    delta = mb - ma
+    state[f"{prefix}n"] = n
+    state[f"{prefix}mean"] = ma + delta * nb / n
+    state[f"{prefix}m2"] += m2b + delta * delta * na * nb / n
+
+def _close_month(state: dict, total: float):
+    state["months"] += 1
+    if total > 0:
+        state["wins"] += 1
+        state["win_sum"] += total
+    elif total < 0:
+        state["losses"] += 1
+        state["loss_sum"] += total
+
+def update(state: dict, returns, months) -> dict:
+    """일별 수익률 (시간순) 누적. NaN은 관측 없음. months: 같은 길이 월 버킷 라벨 (metrics.month_labels)."""
+    r = np.asarray(returns, dtype=float).ravel()
+    valid = ~np.isnan(r)
+    x, labels = r[valid], np.asarray(months).ravel()[valid]
+    if len(x) == 0:
+        return state
+
+    _merge(state, "", x)
+    _merge(state, "neg_", x[x < 0])
+
+    L = state["log_wealth"] + np.cumsum(np.log1p(np.maximum(x, -0.999999)))
+    peak = np.maximum.accumulate(L if state["peak"] is None else np.maximum(L, state["peak"]))
+    state["mdd"] = min(state["mdd"], float(np.exp((L - peak).min()) - 1))
+    state["log_wealth"], state["peak"] = float(L[-1]), float(peak[-1])
+
+    # 월 버킷: 진행 중인 달과 라벨이 같으면 이어서 합산, 마지막 버킷은 진행 중으로 남김
+    starts = np.flatnonzero(np.concatenate([[True], labels[1:] != labels[:-1]]))
+    sums = np.add.reduceat(x, starts)
+    if state["month"] is not None:
+        if labels[0] == state["month"]:
+            sums[0] += state["month_sum"]
+        else:
+            _close_month(state, state["month_sum"])
+    for total in sums[:-1]:
+        _close_month(state, float(total))
+    state["month"], state["month_sum"] = int(labels[-1]), float(sums[-1])
+    return state
+
+def metrics(state: dict) -> dict:
+    """누산기 → CAGR, Sharpe, Sortino, MDD, Win Rate, Profit Factor (run_result 형식, 관측 2개 미만이면 0)"""
+    n = state["n"]
+    if n < 2:
+        return {k: 0 for k in METRIC_KEYS}
+    rf_daily = RF_ANNUAL / TRADING_DAYS
+    total = math.exp(state["log_wealth"])
+    cagr = total ** (1 / max(n / TRADING_DAYS, 0.01)) - 1
+
+    std = math.sqrt(max(state["m2"], 0.0) / (n - 1))
+    sharpe = (state["mean"] - rf_daily) / std * math.sqrt(TRADING_DAYS) if std > 0 else 0.0
+    neg_n = state["neg_n"]
+    down_std = math.sqrt(max(state["neg_m2"], 0.0) / max(neg_n - 1, 1)) if neg_n > 1 else 1e-8
+    sortino = (state["mean"] - rf_daily) / down_std * math.sqrt(TRADING_DAYS)
+
+    # 진행 중인 달까지 포함해 집계 (state는 그대로)
+    tally = {k: state[k] for k in ("months", "wins", "losses", "win_sum", "loss_sum")}
+    if state["month"] is not None:
+        _close_month(tally, state["month_sum"])
+    win_rate = tally["wins"] / max(tally["months"], 1)
+    profit_factor = tally["win_sum"] / abs(tally["loss_sum"]) if tally["loss_sum"] != 0 else float("inf")
+
+    out = {"cagr": cagr, "sharpe": sharpe, "sortino": sortino, "mdd": state["mdd"],
+           "win_rate": win_rate, "profit_factor": profit_factor}
+    return {k: round(float(out[k]), ROUNDING[k]) for k in METRIC_KEYS}
@@ -0,0 +1,261 @@
+"""패널 변환 — long (date, code) ↔ wide (날짜 × 종목) + 컬럼형 바이너리 저장
+
+압축 표현 (메모리·디스크 공통):
+  code   정렬된 종목 사전 + 정수 id (메모리: Categorical, 디스크: int32 + meta 사전)
+  date   디스크에는 1970-01-01 기준 int32 일수 (자정이 아닌 시각이 있으면 datetime64 유지)
+  OHLCV  float32로 손실 없이 표현되면 float32 (KRX 가격은 정수 원), 아니면 float64
+float32 값은 연산 지점에서 float64로 올려 계산 (결과는 float64 저장과 동일).
+
+원천 버전: 가격 패널 DataFrame.attrs[VERSION_ATTR]에 종목별 원천 데이터 버전 표(data_agent manifest rev)를
+싣고 panel/versions.npy로 함께 저장 — 팩터 저장소가 행렬을 해시하지 않고 재사용 여부를 판단하는 키.
+행 추가·부분 선택은 버전을 유지하지만, 메모리에서 값을 고친 패널은 attrs를 비워야 함.
+"""
+import json, os, shutil
+import numpy as np
+import pandas as pd
+
+EPOCH = np.datetime64("1970-01-01", "D")
+VERSION_ATTR = "versions"  # attrs 키 — {"codes": 정렬된 종목 배열, "tokens": uint64 버전}
+
+def version_table(revs: dict) -> dict:
+    """{code: rev 16진 문자열} → attrs용 버전 표 (numpy 배열 — attrs 복사 비용이 종목 수에 거의 무관)"""
+    codes = sorted(revs)
+    return {"codes": np.array(codes, dtype=str),
+            "tokens": np.array([int(revs[c][:16], 16) for c in codes], dtype=np.uint64)}
+
+def panel_versions(frame: pd.DataFrame, codes=None):
+    """frame의 버전 표 → codes(기본: 열) 순서 uint64 토큰 (표에 없는 종목 0). 표가 없으면 None."""
+    table = frame.attrs.get(VERSION_ATTR)
+    if not table:
+        return None
+    codes = np.asarray([str(c) for c in (frame.columns if codes is None else codes)], dtype=str)
+    known, tokens = table["codes"], table["tokens"]
+    pos = np.minimum(np.searchsorted(known, codes), max(len(known) - 1, 0))
+    found = (known[pos] == codes) if len(known) else np.zeros(len(codes), dtype=bool)
+    return np.where(found, tokens[pos] if len(known) else 0, 0).astype(np.uint64)
+
+def compact_float(values: np.ndarray) -> np.ndarray:
+    """float64 배열 → 손실 없으면 float32, 아니면 그대로"""
+    arr = np.asarray(values)
+    if arr.dtype != np.float64:
+        return arr
+    with np.errstate(over="ignore"):
+        small = arr.astype(np.float32)
+    return small if np.array_equal(small, arr, equal_nan=True) else arr
+
+def to_day_ordinals(dates) -> np.ndarray:
+    """datetime → int32 일수 (자정이 아니거나 NaT가 있으면 None)"""
+    ns = np.asarray(dates, dtype="datetime64[ns]")
+    days = ns.astype("datetime64[D]")
+    if np.isnat(ns).any() or not np.array_equal(days.astype("datetime64[ns]"), ns):
+        return None
+    return (days - EPOCH).astype(np.int32)
+
+def from_day_ordinals(days: np.ndarray) -> np.ndarray:
+    return (EPOCH + np.asarray(days, dtype=np.int64)).astype("datetime64[ns]")
+
+def concat_prices(parts: list) -> pd.DataFrame:
+    """Categorical code 패널 이어붙이기 — 종목 사전을 합집합(정렬, 미사용 제거)으로 맞춤"""
+    codes = pd.api.types.union_categoricals([p["code"].astype("category") for p in parts],
+                                            sort_categories=True, ignore_order=True)
+    out = pd.concat([p.drop(columns="code") for p in parts], ignore_index=True)
+    out.insert(list(parts[0].columns).index("code"), "code", codes.remove_unused_categories())
+    return out
+
+def to_wide(prices: pd.DataFrame, field: str = "close") -> pd.DataFrame:
+    """long 가격 패널 → (날짜 × 종목) 행렬. 중복 (date, code)는 마지막 값 사용."""
+    if prices.empty or field not in prices.columns:
+        return pd.DataFrame()
+    dedup = prices.drop_duplicates(["date", "code"], keep="last")
+    wide = dedup.pivot(index="date", columns="code", values=field).sort_index()
+    if isinstance(wide.columns, pd.CategoricalIndex):
+        wide.columns = pd.Index(wide.columns.astype(str), name="code")
+    if VERSION_ATTR in prices.attrs:
+        wide.attrs[VERSION_ATTR] = prices.attrs[VERSION_ATTR]
+    return wide
+
+def last_observed(panel: pd.DataFrame, reference: pd.DataFrame) -> pd.Series:
+    """종목별 마지막 관측일(reference 기준)의 panel 값 → 최신 횡단면"""
+    if panel.empty:
+        return pd.Series(dtype=float)
+    observed = reference.notna().to_numpy()
+    last_row = len(observed) - 1 - np.argmax(observed[::-1], axis=0)
+    values = panel.to_numpy()[last_row, np.arange(panel.shape[1])]
+    values = np.where(observed.any(axis=0), values, np.nan)
+    return pd.Series(values, index=panel.columns)
+
+def last_observed_rows(reference: pd.DataFrame, dates) -> np.ndarray:
+    """기준일별 · 종목별 마지막 관측 행 번호 (K × N, 기준일 전일까지 · 관측 없으면 -1)
+
+    기준일 사이 구간별 최대 행 번호(reduceat) → 구간 누적 최대 — (날짜 × 종목) 누적 행렬 없이 계산.
+    """
+    ends = reference.index.searchsorted(pd.DatetimeIndex(dates), side="left")
+    out = np.full((len(ends), reference.shape[1]), -1, dtype=np.int32)
+    bounds = np.unique(ends[ends > 0])                              # 구간 끝 (미포함)
+    if not len(bounds):
+        return out
+    X = reference.to_numpy(dtype=float)[:bounds[-1]]
+    row = np.where(np.isnan(X), np.int32(-1), np.arange(len(X), dtype=np.int32)[:, None])
+    starts = np.concatenate([[0], bounds[:-1]])
+    last = np.maximum.accumulate(np.maximum.reduceat(row, starts, axis=0), axis=0)
+    out[ends > 0] = last[np.searchsorted(bounds, ends[ends > 0])]
+    return out
+
+# --- 컬럼형 바이너리 패널 (npy + memmap) ---
+# 가격: <dir>/panel/{meta.json, dates.npy, <field>.npy (날짜 × 종목), versions.npy (선택, 종목별 원천 버전)}
+# 표 형식: <dir>/<name>/{meta.json, <column>.npy}
+PRICE_FIELDS = ["close", "volume", "open", "high", "low"]
+PANEL_DIR = "panel"
+FUNDAMENTAL_DIR = "fundamentals"
+PANEL_REF_FILE = "panel_ref.json"  # 공유 패널 참조 {"dir": 경로} — 배치 실행에서 전략별 디렉터리가 사용
+
+def _replace_dir(tmp_dir: str, final_dir: str):
+    """tmp → final 교체 (읽는 쪽이 반쯤 쓴 패널을 보지 않도록)"""
+    if os.path.isdir(final_dir):
+        shutil.rmtree(final_dir)
+    os.replace(tmp_dir, final_dir)
+
+def write_price_panel(prices: pd.DataFrame, out_dir: str, fields: list = None) -> str:
+    """long 가격 패널 → 필드별 (날짜 × 종목) npy 행렬"""
+    fields = [f for f in (fields or PRICE_FIELDS) if f in prices.columns]
+    return write_wide_panel({f: to_wide(prices, f) for f in fields}, out_dir)
+
+def write_wide_panel(wide: dict, out_dir: str, name: str = PANEL_DIR) -> str:
+    """필드별 (날짜 × 종목) 행렬 (같은 날짜·종목 축) → <out_dir>/<name>/ (기본 panel/)"""
+    fields = list(wide)
+    final_dir = os.path.join(out_dir, name)
+    tmp_dir = final_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    ref = wide[fields[0]] if fields else pd.DataFrame()
+    for f, frame in wide.items():
+        np.save(os.path.join(tmp_dir, f"{f}.npy"), compact_float(frame.to_numpy(dtype=np.float64)))
+    dates = pd.DatetimeIndex(ref.index).to_numpy(dtype="datetime64[ns]")
+    days = to_day_ordinals(dates)
+    np.save(os.path.join(tmp_dir, "dates.npy"), days if days is not None else dates)
+    versions = panel_versions(ref)
+    if versions is not None:
+        np.save(os.path.join(tmp_dir, "versions.npy"), versions)
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({"format": 2, "fields": fields, "codes": [str(c) for c in ref.columns]}, f)
+    _replace_dir(tmp_dir, final_dir)
+    return final_dir
+
+def has_price_panel(in_dir: str) -> bool:
+    return os.path.exists(os.path.join(in_dir, PANEL_DIR, "meta.json"))
+
+def read_price_panel(in_dir: str, fields: list = None, mmap: bool = True, name: str = PANEL_DIR) -> dict:
+    """필드별 (날짜 × 종목) DataFrame (저장 dtype 그대로). mmap=True면 복사 없이 memmap 위에 올림.
+
+    name: write_wide_panel로 기록한 다른 행렬 디렉터리 (signal_history 등)
+    """
+    panel_dir = os.path.join(in_dir, name)
+    with open(os.path.join(panel_dir, "meta.json")) as f:
+        meta = json.load(f)
+    mode = "r" if mmap else None
+    dates = np.load(os.path.join(panel_dir, "dates.npy"))
+    if np.issubdtype(dates.dtype, np.integer):
+        dates = from_day_ordinals(dates)
+    dates = pd.DatetimeIndex(dates, name="date")
+    codes = pd.Index(meta["codes"], name="code")
+    out = {f: pd.DataFrame(np.load(os.path.join(panel_dir, f"{f}.npy"), mmap_mode=mode),
+                           index=dates, columns=codes, copy=False)
+           for f in (fields or meta["fields"]) if f in meta["fields"]}
+    versions_path = os.path.join(panel_dir, "versions.npy")
+    if os.path.exists(versions_path):
+        order = np.argsort(np.asarray(meta["codes"], dtype=str), kind="stable")
+        table = {"codes": np.asarray(meta["codes"], dtype=str)[order], "tokens": np.load(versions_path)[order]}
+        for frame in out.values():
+            frame.attrs[VERSION_ATTR] = table
+    return out
+
+def wide_to_long(wide: dict) -> pd.DataFrame:
+    """필드별 wide 행렬 → long (date, code, ...) 패널 (관측값 있는 행만)"""
+    if not wide:
+        return pd.DataFrame(columns=["date", "code"] + PRICE_FIELDS)
+    long = pd.concat({f: frame.stack() for f, frame in wide.items()}, axis=1)
+    return long.reset_index().sort_values(["code", "date"]).reset_index(drop=True)
+
+def write_frame(df: pd.DataFrame, out_dir: str, name: str) -> str:
+    """표 형식 DataFrame → 컬럼별 npy (문자열은 사전+int32 id, 날짜는 int32 일수, 실수는 compact_float)"""
+    final_dir = os.path.join(out_dir, name)
+    tmp_dir = final_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    encodings, dictionaries = {}, {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            arr = values.to_numpy(dtype="datetime64[ns]")
+            days = to_day_ordinals(arr)
+            if days is not None:
+                arr, encodings[col] = days, "days"
+        elif pd.api.types.is_numeric_dtype(values):
+            arr = compact_float(values.to_numpy())
+        else:
+            cat = pd.Categorical(values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype(str))
+            arr, encodings[col] = cat.codes.astype(np.int32), "dict"
+            dictionaries[col] = [str(c) for c in cat.categories]
+        np.save(os.path.join(tmp_dir, f"{col}.npy"), arr)
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({"format": 2, "columns": list(df.columns), "rows": len(df),
+                   "encodings": encodings, "dictionaries": dictionaries}, f)
+    _replace_dir(tmp_dir, final_dir)
+    return final_dir
+
+def read_frame(in_dir: str, name: str, mmap: bool = True) -> pd.DataFrame:
+    """write_frame 역변환 — 사전 컬럼은 Categorical, 일수 컬럼은 datetime64"""
+    frame_dir = os.path.join(in_dir, name)
+    with open(os.path.join(frame_dir, "meta.json")) as f:
+        meta = json.load(f)
+    mode = "r" if mmap else None
+    encodings = meta.get("encodings", {})
+    cols = {}
+    for c in meta["columns"]:
+        arr = np.load(os.path.join(frame_dir, f"{c}.npy"), mmap_mode=mode)
+        if encodings.get(c) == "dict":
+            arr = pd.Categorical.from_codes(arr, categories=meta["dictionaries"][c])
+        elif encodings.get(c) == "days":
+            arr = from_day_ordinals(arr)
+        cols[c] = arr
+    return pd.DataFrame(cols)
+
+def write_panel_ref(out_dir: str, panel_dir: str):
+    """out_dir이 panel_dir의 가격/재무 패널을 쓰도록 참조 기록 (out_dir의 기존 패널은 제거)"""
+    for name in (PANEL_DIR, FUNDAMENTAL_DIR):
+        shutil.rmtree(os.path.join(out_dir, name), ignore_errors=True)
+    with open(os.path.join(out_dir, PANEL_REF_FILE), "w") as f:
+        json.dump({"dir": os.path.abspath(panel_dir)}, f)
+
+def panel_source(in_dir: str) -> str:
+    """패널을 실제로 읽을 디렉터리 (panel_ref.json이 있으면 참조 대상)"""
+    ref_path = os.path.join(in_dir, PANEL_REF_FILE)
+    if not os.path.exists(ref_path):
+        return in_dir
+    with open(ref_path) as f:
+        return os.path.join(in_dir, json.load(f)["dir"])
+
+def load_price_panel(in_dir: str, fields: list = None) -> dict:
+    """데이터 디렉터리의 가격 패널 (날짜 × 종목). 바이너리 없으면 prices.csv 폴백."""
+    in_dir = panel_source(in_dir)
+    if has_price_panel(in_dir):
+        return read_price_panel(in_dir, fields)
+    csv_path = os.path.join(in_dir, "prices.csv")
+    if not os.path.exists(csv_path):
+        return {}
+    prices = pd.read_csv(csv_path, parse_dates=["date"], dtype={"code": str})
+    return {f: to_wide(prices, f) for f in (fields or PRICE_FIELDS) if f in prices.columns}
+
+def load_fundamentals(in_dir: str) -> pd.DataFrame:
+    """재무 패널. 바이너리 없으면 fundamentals.csv 폴백."""
+    in_dir = panel_source(in_dir)
+    if os.path.exists(os.path.join(in_dir, FUNDAMENTAL_DIR, "meta.json")):
+        df = read_frame(in_dir, FUNDAMENTAL_DIR)
+        if isinstance(df["code"].dtype, pd.CategoricalDtype):  # 소형 표 — 조인 키 호환 위해 문자열로
+            df["code"] = df["code"].astype(str)
+        return df
+    csv_path = os.path.join(in_dir, "fundamentals.csv")
+    if not os.path.exists(csv_path):
+        return pd.DataFrame()
+    return pd.read_csv(csv_path, dtype={"code": str}, parse_dates=["report_date"])
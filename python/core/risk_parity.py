@@ -0,0 +1,102 @@
+"""리스크 패리티 — 축소 공분산 + 배치 Newton 풀이
+
+모든 함수는 앞 차원(리밸런싱 시점 K)에 대해 배치로 동작:
+수익률 창 (K × T × N) → 공분산 (K × N × N) → 비중 (K × N).
+관측이 없는 종목(mask=False)은 비중 0.
+"""
+import warnings
+import numpy as np
+
+def shrink_covariance(returns: np.ndarray, shrinkage=None) -> tuple[np.ndarray, np.ndarray]:
+    """Ledoit-Wolf 축소 공분산 (대각 타깃: 분산 유지, 상관만 0 쪽으로 축소).
+
+    returns: (..., T, N) 일별 수익률 (NaN = 관측 없음)
+    shrinkage: None이면 LW 최적 강도 추정, 숫자면 고정 강도 (0~1)
+    반환: (공분산 (..., N, N), 종목별 유효 mask (..., N))
+    """
+    R = np.asarray(returns, dtype=float)
+    valid = ~np.isnan(R)
+    count = valid.sum(axis=-2)
+    mask = count >= 2
+    mean = np.where(valid, R, 0).sum(axis=-2) / np.maximum(count, 1)
+    X = np.where(valid, R - mean[..., None, :], 0.0)
+    T = R.shape[-2]
+
+    S = np.swapaxes(X, -1, -2) @ X / max(T, 1)
+    diag = np.diagonal(S, axis1=-2, axis2=-1)
+    off = S - diag[..., None] * np.eye(S.shape[-1])
+
+    if shrinkage is None:
+        # delta = ||S - F||², beta = 표본 분산 추정치 (비대각 원소)
+        x2 = X * X
+        row = x2.sum(axis=-1)
+        pi = ((row ** 2).sum(axis=-1) - (x2 ** 2).sum(axis=(-2, -1))) / max(T, 1) ** 2
+        delta = (off ** 2).sum(axis=(-2, -1))
+        beta = np.maximum(pi - delta / max(T, 1), 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shrink = np.clip(np.where(delta > 0, beta / delta, 1.0), 0.0, 1.0)
+    else:
+        shrink = np.full(S.shape[:-2], float(shrinkage))
+    cov = S - shrink[..., None, None] * off
+
+    # 분산 0(거래정지 등) 종목은 유효 종목 분산 중앙값으로 바닥 처리
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 유효 종목이 없는 시점 (All-NaN)
+        floor = np.nanmedian(np.where(mask & (diag > 0), diag, np.nan), axis=-1)
+    floor = np.where(np.isnan(floor), 1e-4, floor)
+    idx = np.arange(S.shape[-1])
+    cov[..., idx, idx] = np.where(diag > 0, diag, floor[..., None])
+    return cov, mask
+
+def inverse_vol_weights(cov: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
+    """역변동성 비중 (..., N)"""
+    vol = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+    inv = np.where(mask if mask is not None else True, 1.0 / vol, 0.0)
+    return inv / np.maximum(inv.sum(axis=-1, keepdims=True), 1e-300)
+
+def risk_parity_weights(cov: np.ndarray, mask: np.ndarray = None, budgets: np.ndarray = None,
+                        tol: float = 1e-10, max_iter: int = 50) -> np.ndarray:
+    """위험 기여 균등(ERC) 비중 — 배치 damped Newton.
+
+    min ½ yᵀΣy − Σ bᵢ log yᵢ 의 해 y를 합 1로 정규화하면 위험 기여 ∝ b.
+    λ(Newton decrement)가 클 때 1/(1+λ) 감쇠 스텝으로 y > 0 유지, 보통 10회 이내 수렴.
+    cov: (K × N × N), mask: (K × N) 유효 종목, budgets: (K × N) 위험 예산 (기본 균등)
+    """
+    cov = np.asarray(cov, dtype=float)
+    single = cov.ndim == 2
+    if single:
+        cov = cov[None]
+        mask = None if mask is None else np.asarray(mask)[None]
+        budgets = None if budgets is None else np.asarray(budgets)[None]
+    K, N, _ = cov.shape
+    mask = np.ones((K, N), dtype=bool) if mask is None else mask.astype(bool)
+    b = np.where(mask, 1.0, 0.0) if budgets is None else np.where(mask, budgets, 0.0)
+    b = b / np.maximum(b.sum(axis=-1, keepdims=True), 1e-300)
+
+    # 무효 종목은 분리: 대각 1, 교차항 0, 기울기 0 → y 고정
+    pair = mask[:, :, None] & mask[:, None, :]
+    sigma = np.where(pair, cov, 0.0) + np.where(mask, 0.0, 1.0)[:, :, None] * np.eye(N)
+
+    # 초기값: 역변동성, yᵀΣy = 1로 스케일
+    y = np.where(mask, 1.0 / np.sqrt(np.diagonal(sigma, axis1=1, axis2=2)), 1.0)
+    q = np.einsum("ki,kij,kj->k", y * mask, sigma, y * mask)
+    y = np.where(mask, y / np.sqrt(np.where(q > 0, q, 1.0))[:, None], 1.0)
+    for _ in range(max_iter):
+        grad = np.where(mask, np.einsum("kij,kj->ki", sigma, y * mask) - b / y, 0.0)
+        hess = sigma + np.where(mask, b / y ** 2, 0.0)[:, :, None] * np.eye(N)
+        step = np.linalg.solve(hess, grad[..., None])[..., 0]
+        lam = np.sqrt(np.maximum((grad * step).sum(axis=-1), 0.0))
+        if lam.max() < tol:
+            break
+        damp = np.where(lam > 0.25, 1.0 / (1.0 + lam), 1.0)
+        y = y - damp[:, None] * step
+
+    w = np.where(mask, y, 0.0)
+    w = w / np.maximum(w.sum(axis=-1, keepdims=True), 1e-300)
+    return w[0] if single else w
+
+def risk_contributions(w: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """종목별 위험 기여 비율 (합 1)"""
+    marginal = np.einsum("...ij,...j->...i", cov, w)
+    rc = w * marginal
+    return rc / np.maximum(rc.sum(axis=-1, keepdims=True), 1e-300)
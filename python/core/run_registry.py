@@ -0,0 +1,205 @@
+"""실행 레지스트리 — runs/<date>_<strategy>/ 결과를 로컬 SQLite로 색인
+
+<runs>/registry.sqlite
+  runs    실행 디렉터리(run_id)당 1행: 전략, 스펙 해시, 기간, 성과 지표, walk-forward 요약, run_result 원문
+  equity  run_id당 자산곡선 blob — int32 일수 + float64 누적 자산 (zlib)
+backtest_agent / pipeline이 백테스트 직후 기록하고 reporter_agent가 report.md 경로를 붙임.
+같은 run_id는 덮어씀. 캐시 적중으로 복원된 실행은 index_run으로 파일에서 색인 (자산곡선 없음).
+조회·비교 CLI: registry.py
+"""
+import hashlib, json, os, re, sqlite3, sys, zlib
+from contextlib import contextmanager
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+from core.panel import to_day_ordinals, from_day_ordinals
+from core.metrics import METRIC_KEYS
+
+REGISTRY_FILE = "registry.sqlite"
+METRIC_COLUMNS = list(METRIC_KEYS)
+WF_COLUMNS = ["is_sharpe", "oos_sharpe", "wf_folds", "sharpe_degradation", "oos_positive_folds"]
+RUN_COLUMNS = ["run_id", "run_dir", "strategy", "spec_hash", "run_date", "recorded_at", "period_start", "period_end",
+               *METRIC_COLUMNS, *WF_COLUMNS, "holdings", "rebalances", "result"]
+SUMMARY_COLUMNS = [c for c in RUN_COLUMNS if c != "result"] + ["report_path"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    run_dir TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    spec_hash TEXT,
+    run_date TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    period_start TEXT,
+    period_end TEXT,
+    cagr REAL, sharpe REAL, sortino REAL, mdd REAL, win_rate REAL, profit_factor REAL,
+    is_sharpe REAL, oos_sharpe REAL, wf_folds INTEGER, sharpe_degradation REAL, oos_positive_folds REAL,
+    holdings INTEGER, rebalances INTEGER,
+    report_path TEXT,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_date ON runs (run_date);
+CREATE INDEX IF NOT EXISTS runs_strategy ON runs (strategy, run_date);
+CREATE TABLE IF NOT EXISTS equity (
+    run_id TEXT PRIMARY KEY REFERENCES runs (run_id) ON DELETE CASCADE,
+    days BLOB NOT NULL,
+    wealth BLOB NOT NULL
+);
+"""
+
+def default_path(run_dir: str) -> str:
+    """실행 디렉터리의 상위(runs/)에 있는 레지스트리"""
+    return os.path.join(os.path.dirname(os.path.abspath(run_dir)), REGISTRY_FILE)
+
+@contextmanager
+def connect(path: str):
+    """트랜잭션 1개 (정상 종료 시 commit) + 종료 시 close"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def spec_hash(spec: dict) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:16]
+
+def run_date(run_dir: str) -> str:
+    """디렉터리 이름 앞 YYYY-MM-DD (pipeline-runner 규칙), 없으면 오늘"""
+    m = re.match(r"(\d{4}-\d{2}-\d{2})_", os.path.basename(os.path.abspath(run_dir)))
+    return m.group(1) if m else date.today().isoformat()
+
+def encode_equity(returns: pd.Series) -> tuple:
+    """일별 수익률 → (int32 일수 blob, float64 누적 자산 blob)"""
+    days = to_day_ordinals(pd.DatetimeIndex(returns.index))
+    wealth = np.cumprod(1 + np.nan_to_num(returns.to_numpy(dtype=float)))
+    return zlib.compress(days.tobytes()), zlib.compress(wealth.tobytes())
+
+def decode_equity(days: bytes, wealth: bytes) -> pd.Series:
+    index = pd.DatetimeIndex(from_day_ordinals(np.frombuffer(zlib.decompress(days), dtype=np.int32)), name="date")
+    return pd.Series(np.frombuffer(zlib.decompress(wealth), dtype=np.float64), index=index, name="wealth")
+
+def _summary_row(run_dir: str, run_result: dict, spec: dict = None) -> dict:
+    metrics = run_result.get("metrics", {})
+    wf = run_result.get("walk_forward", {})
+    agg = wf.get("aggregate", {})
+    return {
+        "run_id": os.path.basename(os.path.abspath(run_dir)),
+        "run_dir": os.path.abspath(run_dir),
+        "strategy": run_result.get("strategy", "unknown"),
+        "spec_hash": spec_hash(spec) if spec else None,
+        "run_date": run_date(run_dir),
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "period_start": str(run_result.get("period", {}).get("start", ""))[:10] or None,
+        "period_end": str(run_result.get("period", {}).get("end", ""))[:10] or None,
+        **{k: metrics.get(k) for k in METRIC_COLUMNS},
+        "is_sharpe": (agg.get("in_sample_mean") or wf.get("in_sample") or {}).get("sharpe"),
+        "oos_sharpe": (agg.get("out_of_sample_mean") or wf.get("out_of_sample") or {}).get("sharpe"),
+        "wf_folds": len(wf.get("folds", [])) or None,
+        "sharpe_degradation": agg.get("sharpe_degradation"),
+        "oos_positive_folds": agg.get("oos_positive_folds"),
+        "holdings": run_result.get("holdings"),
+        "rebalances": run_result.get("rebalances"),
+        "result": json.dumps(run_result, sort_keys=True, default=str),
+    }
+
+def _upsert(conn: sqlite3.Connection, row: dict) -> bool:
+    """runs 행 기록 → 기존 행과 결과가 같았는지 (같으면 자산곡선 유지 가능)"""
+    prev = conn.execute("SELECT result FROM runs WHERE run_id = ?", (row["run_id"],)).fetchone()
+    updates = ", ".join(f"{c} = excluded.{c}" for c in RUN_COLUMNS[1:])
+    conn.execute(f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}) VALUES ({', '.join('?' * len(RUN_COLUMNS))}) "
+                 f"ON CONFLICT (run_id) DO UPDATE SET {updates}", [row[c] for c in RUN_COLUMNS])
+    return prev is not None and prev["result"] == row["result"]
+
+def record(path: str, run_dir: str, run_result: dict, spec: dict = None, returns: pd.Series = None) -> bool:
+    """백테스트 결과 1건 기록 (같은 run_id는 교체). returns가 있으면 자산곡선도 저장.
+
+    색인은 부가 기능 — 실패해도 실행은 계속 (경고만 출력, False 반환).
+    """
+    row = _summary_row(run_dir, run_result, spec)
+    try:
+        with connect(path) as conn:
+            _upsert(conn, row)
+            conn.execute("DELETE FROM equity WHERE run_id = ?", (row["run_id"],))
+            if returns is not None and len(returns):
+                conn.execute("INSERT INTO equity (run_id, days, wealth) VALUES (?, ?, ?)",
+                             (row["run_id"], *encode_equity(returns)))
+    except (sqlite3.Error, OSError) as e:
+        print(f"[Registry] 기록 실패 ({path}): {e}", file=sys.stderr)
+        return False
+    return True
+
+def index_run(path: str, run_dir: str) -> bool:
+    """디렉터리의 run_result.json (+ strategy_spec.json) 색인. 결과가 바뀌었으면 자산곡선 삭제."""
+    result_path = os.path.join(run_dir, "run_result.json")
+    if not os.path.exists(result_path):
+        return False
+    with open(result_path) as f:
+        run_result = json.load(f)
+    spec = None
+    spec_path = os.path.join(run_dir, "strategy_spec.json")
+    if os.path.exists(spec_path):
+        with open(spec_path) as f:
+            spec = json.load(f)
+    row = _summary_row(run_dir, run_result, spec)
+    report = os.path.join(run_dir, "report.md")
+    with connect(path) as conn:
+        if not _upsert(conn, row):
+            conn.execute("DELETE FROM equity WHERE run_id = ?", (row["run_id"],))
+        conn.execute("UPDATE runs SET report_path = ? WHERE run_id = ?",
+                     (os.path.abspath(report) if os.path.exists(report) else None, row["run_id"]))
+    return True
+
+def index_tree(path: str, runs_root: str, force: bool = False) -> int:
+    """runs_root 아래 실행 디렉터리 일괄 색인 (force=False면 미색인분만). 색인 건수 반환."""
+    with connect(path) as conn:
+        known = {r["run_id"] for r in conn.execute("SELECT run_id FROM runs")}
+    count = 0
+    for name in sorted(os.listdir(runs_root)) if os.path.isdir(runs_root) else []:
+        run_dir = os.path.join(runs_root, name)
+        if os.path.isdir(run_dir) and (force or name not in known) and index_run(path, run_dir):
+            count += 1
+    return count
+
+def attach_report(path: str, run_dir: str, report_path: str) -> bool:
+    """report.md 경로 기록 — 아직 색인 안 된 실행이면 파일에서 색인 (실패 시 경고만)"""
+    run_id = os.path.basename(os.path.abspath(run_dir))
+    try:
+        with connect(path) as conn:
+            updated = conn.execute("UPDATE runs SET report_path = ? WHERE run_id = ?",
+                                   (os.path.abspath(report_path), run_id)).rowcount
+        return bool(updated) or index_run(path, run_dir)
+    except (sqlite3.Error, OSError, ValueError) as e:
+        print(f"[Registry] 기록 실패 ({path}): {e}", file=sys.stderr)
+        return False
+
+def top_runs(path: str, metric: str = "sharpe", since: str = None, until: str = None, strategy: str = None,
+             limit: int = 10, per_strategy: bool = True) -> list:
+    """실행일 [since, until] 구간에서 metric 상위 실행 (per_strategy면 전략별 최고 1건) → [dict]"""
+    if metric not in METRIC_COLUMNS + WF_COLUMNS:
+        raise ValueError(f"알 수 없는 지표: {metric}")
+    where, params = [f"{metric} IS NOT NULL"], []
+    for clause, value in (("run_date >= ?", since), ("run_date <= ?", until), ("strategy = ?", strategy)):
+        if value:
+            where.append(clause)
+            params.append(value)
+    inner = (f"SELECT {', '.join(SUMMARY_COLUMNS)}, ROW_NUMBER() OVER (PARTITION BY strategy ORDER BY {metric} DESC, run_date DESC) AS k "
+             f"FROM runs WHERE {' AND '.join(where)}")
+    sql = (f"SELECT * FROM ({inner}) WHERE k = 1" if per_strategy else inner) + f" ORDER BY {metric} DESC LIMIT ?"
+    with connect(path) as conn:
+        return [{c: r[c] for c in SUMMARY_COLUMNS} for r in conn.execute(sql, [*params, limit])]
+
+def load_runs(path: str, run_ids: list) -> tuple[list, dict]:
+    """run_id 목록 → ([runs 행 dict], {run_id: 자산곡선 Series}) — 없는 id는 제외"""
+    marks = ", ".join("?" * len(run_ids))
+    with connect(path) as conn:
+        rows = {r["run_id"]: dict(r) for r in conn.execute(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM runs WHERE run_id IN ({marks})", run_ids)}
+        curves = {r["run_id"]: decode_equity(r["days"], r["wealth"])
+                  for r in conn.execute(f"SELECT * FROM equity WHERE run_id IN ({marks})", run_ids)}
+    return [rows[i] for i in run_ids if i in rows], curves
@@ -1,10 +1,14 @@
 """strategy_spec.json 검증"""
 import json, sys
+from core.factor_expr import compile_formulas
 
 REQUIRED_KEYS = ["name", "universe", "rebalance", "factors", "signal", "portfolio", "cost_model", "risk_limits"]
 VALID_METHODS = ["rank_sum", "rank_product"]
 VALID_PORTFOLIO = ["top_n_equal", "risk_parity"]
 VALID_FREQ = ["D", "W", "M", "Q"]
+VALID_WF_MODES = ["rolling", "anchored"]
+VALID_RP_WEIGHTING = ["erc", "inverse_vol"]
+VALID_BOOTSTRAP = ["stationary", "circular"]
 
 def validate(spec: dict) -> list[str]:
     errors = []
@@ -23,6 +27,13 @@ def validate(spec: dict) -> list[str]:
     for i, f in enumerate(spec["factors"]):
         if "id" not in f or "type" not in f:
             errors.append(f"factors[{i}]: id and type required")
+        elif f["type"] == "expr" and "formula" not in f:
+            errors.append(f"factors[{i}]: expr requires formula")
+        elif f["type"] in ("ratio", "expr"):
+            try:
+                compile_formulas({f["id"]: f.get("formula", f["id"])})
+            except ValueError as e:
+                errors.append(f"factors[{i}]: {e}")
 
     # signal
     s = spec["signal"]
@@ -33,6 +44,10 @@ def validate(spec: dict) -> list[str]:
     for wk in weights:
         if wk not in factor_ids:
             errors.append(f"signal.weights[{wk}] not in factors")
+    if s.get("method") == "rank_product" and any(w < 0 for w in weights.values()):
+        errors.append("signal.weights must be >= 0 for rank_product")
+    if not isinstance(s.get("history", False), bool):
+        errors.append("signal.history must be true or false")
 
     # portfolio
     p = spec["portfolio"]
@@ -40,16 +55,46 @@ def validate(spec: dict) -> list[str]:
         errors.append(f"portfolio.method must be one of {VALID_PORTFOLIO}")
     if p.get("n", 0) < 1:
         errors.append("portfolio.n must be >= 1")
+    if p.get("weighting", "erc") not in VALID_RP_WEIGHTING:
+        errors.append(f"portfolio.weighting must be one of {VALID_RP_WEIGHTING}")
 
     # cost_model
     c = spec["cost_model"]
     if c.get("fee_bps", -1) < 0 or c.get("slippage_bps", -1) < 0:
         errors.append("cost_model: fee_bps and slippage_bps must be >= 0")
+    exe = c.get("execution")
+    if isinstance(exe, dict):
+        if not 0 < exe.get("max_participation", 0.1) <= 1:
+            errors.append("cost_model.execution.max_participation must be in (0, 1]")
+        if exe.get("capital", 1) <= 0:
+            errors.append("cost_model.execution.capital must be > 0")
 
     # rebalance
     if spec["rebalance"].get("freq") not in VALID_FREQ:
         errors.append(f"rebalance.freq must be one of {VALID_FREQ}")
 
+    # walk_forward (선택)
+    wf = spec.get("walk_forward")
+    if wf is not None:
+        if wf.get("mode", "rolling") not in VALID_WF_MODES:
+            errors.append(f"walk_forward.mode must be one of {VALID_WF_MODES}")
+        if wf.get("folds", 4) < 1:
+            errors.append("walk_forward.folds must be >= 1")
+
+    # bootstrap (선택)
+    bs = spec.get("bootstrap")
+    if bs is not None:
+        if bs.get("method", "stationary") not in VALID_BOOTSTRAP:
+            errors.append(f"bootstrap.method must be one of {VALID_BOOTSTRAP}")
+        if bs.get("samples", 2000) < 100:
+            errors.append("bootstrap.samples must be >= 100")
+        if bs.get("block") is not None and bs["block"] < 1:
+            errors.append("bootstrap.block must be >= 1")
+        if not 0 < bs.get("confidence", 0.95) < 1:
+            errors.append("bootstrap.confidence must be in (0, 1)")
+        if bs.get("trials", 1) < 1:
+            errors.append("bootstrap.trials must be >= 1")
+
     return errors
 
 def load_and_validate(path: str) -> dict:
@@ -0,0 +1,26 @@
+"""프로세스 간 공유 배열 — multiprocessing.shared_memory 위 numpy 뷰
+
+부모가 share_array로 올리고 (이름, shape, dtype) 핸들을 워커에 넘기면,
+워커는 attach_array로 복사 없이 같은 메모리를 읽음.
+"""
+from multiprocessing import shared_memory
+import numpy as np
+
+def share_array(arr: np.ndarray) -> tuple:
+    """배열 → 공유 메모리 복사. (SharedMemory, 핸들) 반환 — 부모가 close/unlink 책임."""
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, {"name": shm.name, "shape": arr.shape, "dtype": arr.dtype.str}
+
+def attach_array(handle: dict) -> tuple:
+    """핸들 → (SharedMemory, 읽기 전용 ndarray 뷰). SharedMemory 참조를 유지해야 뷰가 유효."""
+    shm = shared_memory.SharedMemory(name=handle["name"])
+    arr = np.ndarray(handle["shape"], dtype=np.dtype(handle["dtype"]), buffer=shm.buf)
+    arr.flags.writeable = False
+    return shm, arr
+
+def release(blocks: list):
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,120 @@
+"""에이전트 실행 텔레메트리 — 단계(load/compute/write)별 wall/CPU 시간, peak RSS, 행·종목 수, I/O 바이트
+
+  with telemetry.session("factor_agent", args.telemetry, args.profile) as tel:
+      with telemetry.phase(tel, "load"):
+          ...
+      telemetry.count(tel, codes=len(codes))
+
+--telemetry PATH: 종료 시 레코드를 JSON 사이드카로 기록 (pipeline-runner가 pipeline_status.json에 병합)
+--profile PATH:   cProfile 결과(.prof) 덤프 (pstats / snakeviz로 열람)
+peak RSS는 가능하면 세션 시작 시 커널 최고치(VmHWM)를 초기화해 상주 워커에서도 실행 단위로 측정.
+I/O 바이트는 /proc/self/io 읽기/쓰기 syscall 합계 (memmap 페이지 읽기는 제외).
+"""
+import cProfile, json, os, resource, sys, time
+from contextlib import contextmanager
+
+FORMAT = 1
+
+def _cpu_seconds() -> float:
+    """현재 프로세스 + 종료된 자식 프로세스(가격 파싱 풀 등) CPU 시간"""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+def _io_bytes() -> dict:
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(":") for line in f.read().splitlines())
+        return {"read": int(fields["rchar"]), "written": int(fields["wchar"])}
+    except (OSError, KeyError, ValueError):
+        return {}
+
+def _reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_mb(reset: bool) -> float:
+    """세션 중 최고 RSS (MB). 초기화가 안 되는 환경이면 프로세스 수명 최고치."""
+    if reset:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 1024), 1)
+
+def start(agent: str) -> dict:
+    return {"format": FORMAT, "agent": agent, "pid": os.getpid(), "phases": [], "counts": {},
+            "_t0": time.perf_counter(), "_cpu0": _cpu_seconds(), "_io0": _io_bytes(),
+            "_rss_reset": _reset_peak_rss()}
+
+@contextmanager
+def phase(record: dict, name: str):
+    """구간 wall/CPU 시간 기록 (같은 이름이 반복되면 각각 기록, record가 None이면 기록 안 함)"""
+    if record is None:
+        yield
+        return
+    t0, cpu0 = time.perf_counter(), _cpu_seconds()
+    try:
+        yield
+    finally:
+        record["phases"].append({"name": name, "wall_ms": round((time.perf_counter() - t0) * 1000, 1),
+                                 "cpu_ms": round((_cpu_seconds() - cpu0) * 1000, 1)})
+
+def count(record: dict, **counts):
+    """행/종목 수 등 규모 지표"""
+    if record is None:
+        return
+    record["counts"].update({k: int(v) for k, v in counts.items()})
+
+def finish(record: dict, status: str = "ok") -> dict:
+    """공개 레코드 (내부 기준값 제거 + 합계)"""
+    out = {k: v for k, v in record.items() if not k.startswith("_")}
+    io_end = _io_bytes()
+    out.update({
+        "status": status,
+        "wall_ms": round((time.perf_counter() - record["_t0"]) * 1000, 1),
+        "cpu_ms": round((_cpu_seconds() - record["_cpu0"]) * 1000, 1),
+        "peak_rss_mb": _peak_rss_mb(record["_rss_reset"]),
+        "bytes_read": io_end["read"] - record["_io0"]["read"] if io_end and record["_io0"] else None,
+        "bytes_written": io_end["written"] - record["_io0"]["written"] if io_end and record["_io0"] else None,
+    })
+    return out
+
+def write(record: dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(record, f, indent=2)
+    os.replace(tmp, path)
+
+def add_arguments(parser):
+    parser.add_argument("--telemetry", default=None, help="텔레메트리 JSON 사이드카 경로")
+    parser.add_argument("--profile", default=None, help="cProfile 덤프(.prof) 경로 (opt-in)")
+
+@contextmanager
+def session(agent: str, telemetry_path: str = None, profile_path: str = None):
+    """에이전트 실행 1회 — 레코드를 넘겨주고 종료(실패 포함) 시 사이드카/프로파일 기록"""
+    record = start(agent)
+    profiler = cProfile.Profile() if profile_path else None
+    status = "ok"
+    if profiler:
+        profiler.enable()
+    try:
+        yield record
+    except BaseException as e:
+        status = "ok" if isinstance(e, SystemExit) and e.code in (0, None) else "failed"
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+            os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+            profiler.dump_stats(profile_path)
+        if telemetry_path:
+            write(finish(record, status), telemetry_path)
@@ -0,0 +1,268 @@
+"""Daily Agent — 새 거래일 증분 갱신 (라이브 트랙)
+
+전체 재빌드(패널 · 전 팩터 · 전 구간 백테스트 · calc_metrics) 대신 거래일 1일분을 O(종목 수)로 반영.
+  가격        팩터 lookback만큼의 종가 꼬리(<state>/panel/)에 새 행 추가, 오래된 행 제거
+  포트폴리오  보유 비중을 당일 수익률로 드리프트. 리밸런싱일이면 꼬리로 최신 횡단면 팩터·비중 재산출
+              (당일 종가 기준 교체 — 당일 수익률은 기존 보유분, 회전율만큼 수수료+슬리피지 차감)
+  성과        equity.bin에 (일수, 수익률) append + core.online_metrics 누산기 갱신 → live_result.json
+
+  python daily_agent.py --spec S --state DIR --seed --input <data_agent 출력> --weights weights.json
+  python daily_agent.py --spec S --state DIR --candles new_day.json --data-dir <원천 데이터>
+
+--seed: 백테스트 일별 수익률로 자산곡선·누산기를 초기화하고 마지막 구간 드리프트 비중을 보유분으로 시작.
+        spec.signal.history면 weights.json 옆 weight_history/ 스케줄로 시드 (백테스트와 같은 곡선).
+--candles: {종목코드: 일봉 | [일봉, …]} (historical/{code}.json과 같은 키). 이미 반영된 날짜는 건너뜀.
+체결 시뮬레이션(cost_model.execution)은 적용하지 않음. 주기적 전체 실행 후 --seed로 다시 맞춤.
+"""
+import json, os, sys, argparse
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from core.schemas import load_and_validate
+from core import telemetry, online_metrics, run_registry
+from core.panel import load_price_panel, write_wide_panel, to_wide, to_day_ordinals, from_day_ordinals
+from core.metrics import month_labels
+from core.cost_model import apply_cost_to_return
+from core.data_clock import get_rebalance_dates
+from core.factor_expr import compile_formulas, lookback
+import factor_agent, portfolio_agent
+from data_agent import parse_candles, columns_to_frame, build_fundamental_panel
+from backtest_agent import run_backtest, backtest_targets, _rebalance_index, _target_matrix
+from portfolio_agent import RISK_LOOKBACK
+
+STATE_FILE = "state.json"
+EQUITY_FILE = "equity.bin"
+RESULT_FILE = "live_result.json"
+EQUITY_DTYPE = np.dtype([("day", "<i4"), ("ret", "<f8")])
+FORMAT = 1
+
+def tail_rows(spec: dict) -> int:
+    """최신 횡단면 계산에 필요한 종가 행 수 (팩터 lookback, risk_parity 공분산 창)"""
+    formulas = {f["id"]: factor_agent.factor_formula(f) for f in spec["factors"]}
+    program = compile_formulas({fid: expr for fid, expr in formulas.items() if expr is not None})
+    rows = max([lookback(program, i) + 1 for i in program["outputs"].values()] or [1])
+    if spec["portfolio"].get("method") == "risk_parity":
+        rows = max(rows, int(spec["portfolio"].get("risk_lookback", RISK_LOOKBACK)) + 1)
+    return max(rows, 2)
+
+def next_rebalance(after: pd.Timestamp, freq: str) -> str:
+    """after 다음 날 이후 첫 리밸런싱일"""
+    start = after + timedelta(days=1)
+    return get_rebalance_dates(start.strftime("%Y-%m-%d"), (start + timedelta(days=366)).strftime("%Y-%m-%d"), freq)[0]
+
+def append_equity(state_dir: str, rows: int, dates, returns) -> int:
+    """equity.bin을 상태에 기록된 rows건으로 맞춘 뒤(중단된 이전 실행분 제거) 추가 → 총 건수"""
+    records = np.empty(len(returns), dtype=EQUITY_DTYPE)
+    records["day"] = to_day_ordinals(pd.DatetimeIndex(dates).normalize())
+    records["ret"] = returns
+    path = os.path.join(state_dir, EQUITY_FILE)
+    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        f.truncate(rows * EQUITY_DTYPE.itemsize)
+        f.seek(0, os.SEEK_END)
+        records.tofile(f)
+    return rows + len(records)
+
+def load_equity(state_dir: str) -> pd.Series:
+    """저장된 라이브 트랙 일별 수익률"""
+    records = np.fromfile(os.path.join(state_dir, EQUITY_FILE), dtype=EQUITY_DTYPE)
+    return pd.Series(records["ret"], index=pd.DatetimeIndex(from_day_ordinals(records["day"]), name="date"))
+
+def drifted_holdings(close: pd.DataFrame, targets, rebal_dates: list) -> tuple[dict, float]:
+    """백테스트 마지막 리밸런싱 이후 드리프트된 보유 비중 + 현금 비중"""
+    daily_ret = close.astype(float).pct_change().replace([np.inf, -np.inf], np.nan).fillna(0)
+    starts = _rebalance_index(close.index, rebal_dates)
+    W = _target_matrix(targets, close.columns, close.index, starts)[-1]
+    growth = np.exp(np.log1p(np.maximum(daily_ret.to_numpy()[starts[-1]:], -0.999999)).sum(axis=0))
+    value = (growth * W).sum() + (1 - W.sum())
+    held = {c: float(w) for c, w in zip(close.columns, growth * W / value) if w > 0}
+    return held, float((1 - W.sum()) / value)
+
+def seed(spec: dict, input_dir: str, weights, state_dir: str) -> dict:
+    """data_agent 출력 + 비중(dict 또는 날짜 × 종목 스케줄) → 백테스트 곡선으로 라이브 상태 초기화 (전 구간 1회 계산)"""
+    close = load_price_panel(input_dir, ["close"]).get("close", pd.DataFrame())
+    if close.empty:
+        raise ValueError(f"가격 패널 없음: {input_dir}")
+    rebal_path = os.path.join(input_dir, "rebalance_dates.json")
+    rebal_dates = json.load(open(rebal_path)) if os.path.exists(rebal_path) else []
+    targets = backtest_targets(spec, close, weights, rebal_dates)
+    cost = {k: v for k, v in spec["cost_model"].items() if k != "execution"}
+    port_ret, _ = run_backtest(close, targets, cost, rebal_dates)
+    holdings, cash = drifted_holdings(close, targets, rebal_dates) if len(port_ret) else ({}, 1.0)
+
+    os.makedirs(state_dir, exist_ok=True)
+    rows = append_equity(state_dir, 0, port_ret.index, port_ret.to_numpy(dtype=float))
+    write_wide_panel({"close": close.iloc[-tail_rows(spec):].astype(float)}, state_dir)
+
+    last = close.index[-1]
+    return {
+        "format": FORMAT,
+        "strategy": spec["name"],
+        "spec_hash": run_registry.spec_hash(spec),
+        "start_date": str(port_ret.index[0].date()) if len(port_ret) else str(last.date()),
+        "last_date": str(last.date()),
+        "next_rebalance": next_rebalance(last, spec["rebalance"]["freq"]),
+        "holdings": holdings,
+        "cash": cash,
+        "rebalances": 0,
+        "equity_rows": rows,
+        "accumulators": online_metrics.update(online_metrics.new_state(), port_ret.to_numpy(dtype=float),
+                                              month_labels(port_ret.index)),
+    }
+
+def read_candles(path: str) -> pd.DataFrame:
+    """{code: 일봉 | [일봉]} → (날짜 × 종목) 종가"""
+    with open(path) as f:
+        raw = json.load(f)
+    parts = [parse_candles(c if isinstance(c, list) else [c], code) for code, c in raw.items()]
+    prices = columns_to_frame([p for p in parts if len(p["date"])])
+    return to_wide(prices[prices["close"] > 0], "close")
+
+def rebalance(spec: dict, close: pd.DataFrame, fundamentals: pd.DataFrame, holdings: dict) -> tuple:
+    """꼬리 종가로 최신 횡단면 시그널 → 비중 (이전 비중 = 현재 보유분)"""
+    signals = factor_agent.score_signals(spec, close, fundamentals)
+    target = portfolio_agent.build_weights(signals, spec, holdings, close) if len(signals) >= 2 else {}
+    return signals, target
+
+def advance(spec: dict, state: dict, tail: pd.DataFrame, row: pd.Series, date: pd.Timestamp,
+            fundamentals) -> tuple:
+    """거래일 1일 반영 → (순수익률, 새 꼬리, 리밸런싱 산출물 | None). 비용 O(종목 수 × 꼬리 길이)."""
+    tail = pd.concat([tail, row.to_frame(date).T.astype(float)]).iloc[-tail_rows(spec):]
+    tail.index.name, tail.columns.name = "date", "code"
+
+    # 보유 비중 드리프트 — 전일 종가는 꼬리의 마지막 관측값, 당일 종가 없으면 수익률 0
+    holdings = state["holdings"]
+    prev = tail.iloc[:-1].ffill().iloc[-1] if len(tail) > 1 else tail.iloc[-1]
+    codes = list(holdings)
+    r = (tail.iloc[-1].reindex(codes) / prev.reindex(codes) - 1).replace([np.inf, -np.inf], np.nan).fillna(0)
+    w = np.array([holdings[c] for c in codes])
+    gross = float((w * r.to_numpy()).sum())
+    grown = w * (1 + r.to_numpy()) / (1 + gross) if codes else w
+    holdings = dict(zip(codes, grown.tolist()))
+    state["cash"] = state["cash"] / (1 + gross)
+
+    net, out = gross, None
+    if date >= pd.Timestamp(state["next_rebalance"]):
+        signals, target = rebalance(spec, tail, fundamentals(), holdings)
+        if target:
+            turnover = 0.5 * sum(abs(target.get(c, 0.0) - holdings.get(c, 0.0)) for c in set(target) | set(holdings))
+            cost = spec["cost_model"]
+            net = apply_cost_to_return(gross, turnover, cost.get("fee_bps", 3), cost.get("slippage_bps", 5))
+            holdings, state["cash"] = dict(target), 1.0 - sum(target.values())
+            state["rebalances"] += 1
+        state["next_rebalance"] = next_rebalance(date, spec["rebalance"]["freq"])
+        out = (signals, target)
+
+    state["holdings"] = {c: v for c, v in holdings.items() if v > 1e-12}
+    state["last_date"] = str(date.date())
+    online_metrics.update(state["accumulators"], [net], month_labels(pd.DatetimeIndex([date])))
+    return net, tail, out
+
+def live_result(spec: dict, state: dict) -> dict:
+    return {
+        "strategy": spec["name"],
+        "mode": "live",
+        "period": {"start": state["start_date"], "end": state["last_date"]},
+        "metrics": online_metrics.metrics(state["accumulators"]),
+        "holdings": len(state["holdings"]),
+        "weights": {c: round(w, 6) for c, w in sorted(state["holdings"].items(), key=lambda x: -x[1])},
+        "cash": round(state["cash"], 6),
+        "rebalances": state["rebalances"],
+        "next_rebalance": state["next_rebalance"],
+        "cost_model": spec["cost_model"],
+    }
+
+def write_state(state: dict, state_dir: str, tail: pd.DataFrame = None):
+    if tail is not None:
+        write_wide_panel({"close": tail}, state_dir)
+    tmp = os.path.join(state_dir, STATE_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, os.path.join(state_dir, STATE_FILE))
+
+def load_state(spec: dict, state_dir: str) -> dict:
+    path = os.path.join(state_dir, STATE_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"라이브 상태 없음 — 먼저 --seed: {path}")
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("format") != FORMAT or state.get("spec_hash") != run_registry.spec_hash(spec):
+        raise ValueError("스펙 또는 상태 형식이 바뀜 — --seed로 다시 초기화")
+    return state
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily Agent (incremental live track)")
+    parser.add_argument("--spec", required=True)
+    parser.add_argument("--state", required=True, help="라이브 상태 디렉터리")
+    parser.add_argument("--seed", action="store_true", help="백테스트 결과로 상태 초기화")
+    parser.add_argument("--input", default=None, help="--seed: data_agent 출력 디렉터리")
+    parser.add_argument("--weights", default=None, help="--seed: weights.json 경로")
+    parser.add_argument("--candles", default=None, help="새 거래일 일봉 JSON {code: candle | [candles]}")
+    parser.add_argument("--data-dir", default=None, help="--candles: 원천 데이터 디렉터리 (리밸런싱일 재무 조회)")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with telemetry.session("daily_agent", args.telemetry, args.profile) as tel:
+        spec = load_and_validate(args.spec)
+
+        if args.seed:
+            if not args.input or not args.weights:
+                parser.error("--seed에는 --input, --weights 필요")
+            with open(args.weights) as f:
+                weights = json.load(f)
+            if spec["signal"].get("history"):
+                schedule = portfolio_agent.load_weight_history(os.path.dirname(os.path.abspath(args.weights)))
+                if schedule is None:
+                    print("[DailyAgent] weight_history 없음 — weights.json 고정 비중 사용", file=sys.stderr)
+                else:
+                    weights = schedule
+            with telemetry.phase(tel, "compute"):
+                state = seed(spec, args.input, weights, args.state)
+            with telemetry.phase(tel, "write"):
+                write_state(state, args.state)
+            print(f"[DailyAgent] 초기화: {state['start_date']} ~ {state['last_date']}, "
+                  f"보유 {len(state['holdings'])}종목, 다음 리밸런싱 {state['next_rebalance']}")
+        else:
+            if not args.candles:
+                parser.error("--candles 또는 --seed 필요")
+            if not args.data_dir:
+                parser.error("--candles에는 --data-dir 필요 (리밸런싱일 재무 조회)")
+            with telemetry.phase(tel, "load"):
+                state = load_state(spec, args.state)
+                tail = load_price_panel(args.state, ["close"])["close"].astype(float)
+                new = read_candles(args.candles)
+                new = new[new.index > pd.Timestamp(state["last_date"])]
+            cache = {}
+
+            def fundamentals():
+                # 리밸런싱일에만, 실행당 1회 로드
+                if "f" not in cache:
+                    cache["f"] = build_fundamental_panel(args.data_dir)
+                return cache["f"]
+            latest = None
+            with telemetry.phase(tel, "compute"):
+                returns = []
+                for date, row in new.iterrows():
+                    net, tail, out = advance(spec, state, tail, row, date, fundamentals)
+                    returns.append(net)
+                    latest = out or latest
+                    print(f"[DailyAgent] {date.date()}: {net:+.4%}" + (" (리밸런싱)" if out else ""))
+            telemetry.count(tel, days=len(new), codes=tail.shape[1], tail_rows=len(tail),
+                            holdings=len(state["holdings"]))
+            with telemetry.phase(tel, "write"):
+                if len(new):
+                    state["equity_rows"] = append_equity(args.state, state["equity_rows"], new.index, returns)
+                    write_state(state, args.state, tail)
+                if latest:
+                    factor_agent.write_outputs(latest[0], args.state)
+                    portfolio_agent.write_outputs(latest[1], args.state)
+            if not len(new):
+                print(f"[DailyAgent] 새 거래일 없음 (마지막 반영 {state['last_date']})")
+
+        result = live_result(spec, state)
+        with open(os.path.join(args.state, RESULT_FILE), "w") as f:
+            json.dump(result, f, indent=2, default=str)
+        m = result["metrics"]
+        print(f"[DailyAgent] CAGR: {m['cagr']:.2%} | Sharpe: {m['sharpe']:.2f} | MDD: {m['mdd']:.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
-"""Data Agent — 가격+재무 데이터 → 시점 정합성 패널 CSV
+"""Data Agent — 가격+재무 데이터 → 시점 정합성 패널 (컬럼형 npy, 선택적 CSV)
 
 MVP: auto-trader 거래 데이터 + invest-quant 캐시에서 패널 구성.
 Node 브릿지가 KIS/DART 데이터를 JSON으로 전달하면 이를 정제.
 """
-import json, sys, os, argparse
+import json, sys, os, argparse, hashlib
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from core.schemas import load_and_validate
+from core import telemetry
 from core.data_clock import get_available_price_data, get_rebalance_dates
+from core.panel import (write_price_panel, write_frame, read_frame, read_price_panel, write_panel_ref, compact_float,
+                        concat_prices, version_table, VERSION_ATTR, FUNDAMENTAL_DIR, PANEL_REF_FILE)
 
 def load_json(path):
     if not os.path.exists(path):
@@ -15,56 +19,212 @@ def load_json(path):
     with open(path) as f:
         return json.load(f)
 
-def build_price_panel(data_dir: str) -> pd.DataFrame:
+PRICE_COLUMNS = ["date", "code", "close", "volume", "open", "high", "low"]
+PRICE_CACHE_DIR = os.path.join("cache", "price_panel")
+MANIFEST_FILE = "manifest.json"
+
+def list_candle_files(hist_dir: str) -> dict:
+    """{code: 경로} — {code}.json (배열) 만 사용, {code}_100d.json (캐시 래핑) 스킵"""
+    files = {}
+    if not os.path.isdir(hist_dir):
+        return files
+    for fname in os.listdir(hist_dir):
+        if not fname.endswith(".json") or fname.startswith("_"):
+            continue
+        if "_" in fname.replace(".json", ""):
+            continue
+        files[fname.replace(".json", "")] = os.path.join(hist_dir, fname)
+    return files
+
+# 컬럼: (일반 키, KIS 키)
+CANDLE_KEYS = {
+    "date": ("date", "stck_bsop_date"),
+    "close": ("close", "stck_clpr"),
+    "volume": ("volume", "acml_vol"),
+    "open": ("open", "stck_oprc"),
+    "high": ("high", "stck_hgpr"),
+    "low": ("low", "stck_lwpr"),
+}
+PARALLEL_MIN_FILES = 32  # 이보다 적으면 프로세스 풀 기동 비용이 더 큼
+
+def parse_candles(raw, code: str) -> dict:
+    """일봉 JSON (배열 또는 {candles: [...]}) → 컬럼별 배열 (date는 원본 문자열, code는 종목당 1개)"""
+    # 배열이면 직접, dict면 candles 키
+    candles = raw if isinstance(raw, list) else raw.get("candles", [])
+    candles = [c for c in candles if isinstance(c, dict)]
+    plain, kis = CANDLE_KEYS["date"]
+    cols = {"date": np.array([c.get(plain, c.get(kis, "")) for c in candles], dtype=str)}
+    for col, (plain, kis) in CANDLE_KEYS.items():
+        if col != "date":
+            cols[col] = np.array([c.get(plain, c.get(kis, 0)) for c in candles], dtype=np.float64)
+    cols["code"] = str(code).zfill(6)  # 앞자리 0 보존
+    return cols
+
+def read_candle_file(item: tuple) -> tuple:
+    """(code, path) → (code, sha1, 컬럼 배열 | None). 프로세스 풀 워커에서 실행."""
+    code, path = item
+    with open(path, "rb") as f:
+        blob = f.read()
+    digest = hashlib.sha1(blob).hexdigest()
+    try:
+        raw = json.loads(blob)
+    except ValueError:
+        raw = None
+    return code, digest, parse_candles(raw, code) if raw else None
+
+def read_candle_files(items: list, workers: int = None) -> list:
+    """파일 파싱을 프로세스 풀로 분산 (파일 수가 적으면 현재 프로세스에서)"""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(items) < PARALLEL_MIN_FILES:
+        return [read_candle_file(item) for item in items]
+    chunk = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(read_candle_file, items, chunksize=chunk))
+
+def normalize_dates(values: np.ndarray) -> pd.DatetimeIndex:
+    """YYYYMMDD / YYYY-MM-DD 혼재 문자열 → datetime (형식별 일괄 변환)"""
+    s = pd.Series(values, dtype=str)
+    compact = s.str.fullmatch(r"\d{8}")
+    out = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    if compact.any():
+        out[compact] = pd.to_datetime(s[compact], format="%Y%m%d")
+    if (~compact).any():
+        out[~compact] = pd.to_datetime(s[~compact])
+    return pd.DatetimeIndex(out)
+
+def columns_to_frame(parts: list) -> pd.DataFrame:
+    """종목별 컬럼 배열 → 한 번에 concat → long 패널 (code Categorical, 가격 compact_float)"""
+    if not parts:
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+    categories = sorted({p["code"] for p in parts})
+    ids = np.searchsorted(categories, [p["code"] for p in parts]).astype(np.int32)
+    cols = {"date": normalize_dates(np.concatenate([p["date"] for p in parts])),
+            "code": pd.Categorical.from_codes(np.repeat(ids, [len(p["date"]) for p in parts]), categories)}
+    cols.update({c: compact_float(np.concatenate([p[c] for p in parts])) for c in PRICE_COLUMNS if c not in cols})
+    return pd.DataFrame(cols, columns=PRICE_COLUMNS)
+
+def normalize_prices(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(["code", "date"]).reset_index(drop=True)
+
+def _file_stat(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _load_price_cache(cache_dir: str):
+    """(manifest, 정규화된 long 패널) — 캐시 없거나 손상 시 (None, None)"""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        return manifest, read_frame(cache_dir, "prices", mmap=False)
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+def _save_price_cache(cache_dir: str, manifest: dict, prices: pd.DataFrame):
+    os.makedirs(cache_dir, exist_ok=True)
+    write_frame(prices, cache_dir, "prices")
+    tmp = os.path.join(cache_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(cache_dir, MANIFEST_FILE))
+
+def _segments(prices: pd.DataFrame) -> dict:
+    """종목·날짜 정렬된 long 패널 → {code: (시작 행, 끝 행)}"""
+    if prices is None or prices.empty:
+        return {}
+    code = prices["code"].astype("category")
+    ids = code.cat.codes.to_numpy()
+    starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+    ends = np.append(starts[1:], len(ids))
+    return {str(code.cat.categories[ids[s]]): (s, e) for s, e in zip(starts, ends)}
+
+def appended_only(old: pd.DataFrame, new: pd.DataFrame, codes) -> set:
+    """codes 중 기존 행은 그대로 두고 뒤에 날짜만 추가된 종목 (과거 정정 없음)"""
+    if old is None or not codes:
+        return set()
+    old_seg, new_seg = _segments(old), _segments(new)
+    cols = [c for c in PRICE_COLUMNS if c != "code"]
+    old_cols = {c: old[c].to_numpy() for c in cols}
+    new_cols = {c: new[c].to_numpy() for c in cols}
+    out = set()
+    for code in codes:
+        key = str(code).zfill(6)
+        if key not in old_seg or key not in new_seg:
+            continue
+        (a0, a1), (b0, b1) = old_seg[key], new_seg[key]
+        n = a1 - a0
+        if b1 - b0 >= n and all(np.array_equal(old_cols[c][a0:a1], new_cols[c][b0:b0 + n], equal_nan=c != "date")
+                                for c in cols):
+            out.add(code)
+    return out
+
+def build_price_panel(data_dir: str, cache_dir: str = None, rebuild: bool = False,
+                      workers: int = None) -> pd.DataFrame:
     """Node 브릿지가 생성한 가격 캐시 → DataFrame.
-    캐시 없으면 auto-trader trades/portfolio에서 최소 패널 구성.
+
+    manifest(종목별 size/mtime/sha1/rev)와 정규화된 패널을 cache_dir에 보관하고,
+    신규·변경 파일만 다시 파싱해 병합. 삭제된 종목은 패널에서 제거.
+    rev는 종목 원천 버전 — 날짜만 뒤에 추가된 파일은 유지, 과거 값이 바뀌면 새 sha1로 교체.
+    반환 패널의 attrs에 버전 표(core.panel.VERSION_ATTR)를 실음 (팩터 저장소 키).
+    rebuild=True면 기존 캐시를 무시하고 전체 재파싱 후 캐시 재작성.
+    파싱은 workers개 프로세스로 분산 (기본: CPU 수).
     """
     hist_dir = os.path.join(data_dir, "historical")
-    rows = []
+    cache_dir = cache_dir or os.path.join(data_dir, PRICE_CACHE_DIR)
+    files = list_candle_files(hist_dir)
 
-    # 캐시된 일봉 데이터가 있으면 사용
-    if os.path.isdir(hist_dir):
-        for fname in os.listdir(hist_dir):
-            if not fname.endswith(".json") or fname.startswith("_"):
-                continue
-            # {code}.json (배열) 만 사용, {code}_100d.json (캐시 래핑) 스킵
-            if "_" in fname.replace(".json", ""):
-                continue
-            code = fname.replace(".json", "")
-            raw = load_json(os.path.join(hist_dir, fname))
-            if not raw:
-                continue
-            # 배열이면 직접, dict면 candles 키
-            candles = raw if isinstance(raw, list) else raw.get("candles", [])
-            for c in candles:
-                if not isinstance(c, dict):
-                    continue
-                date_str = c.get("date", c.get("stck_bsop_date", ""))
-                # YYYYMMDD → YYYY-MM-DD 변환
-                if len(date_str) == 8 and date_str.isdigit():
-                    date_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
-                rows.append({
-                    "date": date_str,
-                    "code": code,
-                    "close": float(c.get("close", c.get("stck_clpr", 0))),
-                    "volume": float(c.get("volume", c.get("acml_vol", 0))),
-                    "open": float(c.get("open", c.get("stck_oprc", 0))),
-                    "high": float(c.get("high", c.get("stck_hgpr", 0))),
-                    "low": float(c.get("low", c.get("stck_lwpr", 0))),
-                })
+    manifest, cached = _load_price_cache(cache_dir) if not rebuild else (None, None)
+    if cached is None:
+        manifest = {}
+    old_entries = manifest.get("files", {})
 
-    if not rows:
-        print("[DataAgent] 가격 캐시 없음 — 빈 패널 반환", file=sys.stderr)
-        return pd.DataFrame(columns=["date", "code", "close", "volume", "open", "high", "low"])
+    entries, pending = {}, []
+    for code, path in files.items():
+        stat = _file_stat(path)
+        prev = old_entries.get(code)
+        if prev and prev["size"] == stat["size"] and prev["mtime_ns"] == stat["mtime_ns"]:
+            entries[code] = prev
+        else:
+            entries[code] = stat
+            pending.append((code, path))
 
-    df = pd.DataFrame(rows)
-    df["date"] = pd.to_datetime(df["date"])
-    df["code"] = df["code"].astype(str).str.zfill(6)  # 앞자리 0 보존
-    df = df.sort_values(["code", "date"]).reset_index(drop=True)
-    return df
+    changed = {}
+    for code, digest, cols in read_candle_files(pending, workers):
+        entries[code] = {**entries[code], "sha1": digest, "rev": digest}
+        prev = old_entries.get(code)
+        if prev and prev.get("sha1") == digest:
+            entries[code]["rev"] = prev.get("rev", digest)
+            continue  # touch만 된 파일
+        changed[code] = cols
+
+    removed = set(old_entries) - set(files)
+    if cached is not None and not changed and not removed:
+        if entries != old_entries:
+            _save_price_cache(cache_dir, {"format": 1, "files": entries}, cached)
+        prices = cached
+    else:
+        parts = []
+        if cached is not None:
+            stale = {str(c).zfill(6) for c in set(changed) | removed}
+            parts.append(cached[~cached["code"].isin(stale)])
+        parts.append(columns_to_frame([cols for cols in changed.values() if cols is not None]))
+        parts = [p for p in parts if not p.empty]
+        prices = normalize_prices(concat_prices(parts)) if parts \
+            else pd.DataFrame(columns=PRICE_COLUMNS)
+        for code in appended_only(cached, prices, [c for c in changed if "rev" in old_entries.get(c, {})]):
+            entries[code]["rev"] = old_entries[code]["rev"]
+        _save_price_cache(cache_dir, {"format": 1, "files": entries}, prices)
+        print(f"[DataAgent] 가격 캐시: {len(changed)}개 재파싱, {len(removed)}개 제거, "
+              f"{len(files) - len(changed)}개 재사용", file=sys.stderr)
+
+    if prices.empty:
+        print("[DataAgent] 가격 캐시 없음 — 빈 패널 반환", file=sys.stderr)
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+    prices.attrs[VERSION_ATTR] = version_table({str(c).zfill(6): e.get("rev", e.get("sha1"))
+                                                for c, e in entries.items() if e.get("rev", e.get("sha1"))})
+    return prices
 
 def build_fundamental_panel(data_dir: str) -> pd.DataFrame:
-    """캐시된 재무 데이터 → DataFrame"""
+    """캐시된 재무 데이터 → 재무 이력 DataFrame (종목 × vintage, report_date 오름차순)"""
     fund_dir = os.path.join(data_dir, "fundamentals")
     rows = []
 
@@ -79,16 +239,17 @@ def build_fundamental_panel(data_dir: str) -> pd.DataFrame:
             data = load_json(os.path.join(fund_dir, fname))
             if not data:
                 continue
-            ratios = data.get("ratios", data)
-            rows.append({
-                "code": code,
-                "per": float(ratios.get("per", 0)),
-                "pbr": float(ratios.get("pbr", 0)),
-                "roe": float(ratios.get("roe", 0)),
-                "debt_ratio": float(ratios.get("debtRatio", ratios.get("debt_ratio", 0))),
-                "op_margin": float(ratios.get("operatingMargin", ratios.get("op_margin", 0))),
-                "report_date": ratios.get("reportDate", ratios.get("report_date", "2025-01-01")),
-            })
+            # 과거 vintage(history) + 최신(ratios) 모두 보관
+            for ratios in data.get("history", []) + [data.get("ratios", data)]:
+                rows.append({
+                    "code": code,
+                    "per": float(ratios.get("per", 0)),
+                    "pbr": float(ratios.get("pbr", 0)),
+                    "roe": float(ratios.get("roe", 0)),
+                    "debt_ratio": float(ratios.get("debtRatio", ratios.get("debt_ratio", 0))),
+                    "op_margin": float(ratios.get("operatingMargin", ratios.get("op_margin", 0))),
+                    "report_date": ratios.get("reportDate", ratios.get("report_date", "2025-01-01")),
+                })
 
     if not rows:
         print("[DataAgent] 재무 캐시 없음 — 빈 패널 반환", file=sys.stderr)
@@ -96,26 +257,16 @@ def build_fundamental_panel(data_dir: str) -> pd.DataFrame:
 
     df = pd.DataFrame(rows)
     df["report_date"] = pd.to_datetime(df["report_date"])
-    return df
-
-def main():
-    parser = argparse.ArgumentParser(description="Data Agent")
-    parser.add_argument("--spec", required=True, help="strategy_spec.json 경로")
-    parser.add_argument("--data-dir", default="/home/taeho/invest-quant/data", help="데이터 디렉터리")
-    parser.add_argument("--output", required=True, help="출력 디렉터리")
-    args = parser.parse_args()
-
-    spec = load_and_validate(args.spec)
-    os.makedirs(args.output, exist_ok=True)
+    # 종목·공시일 정렬, 같은 공시일 중복은 최신 파일 값 유지
+    df = df.drop_duplicates(["code", "report_date"], keep="last")
+    return df.sort_values(["code", "report_date"], kind="stable").reset_index(drop=True)
 
-    # 가격 패널
-    prices = build_price_panel(args.data_dir)
-    prices.to_csv(os.path.join(args.output, "prices.csv"), index=False)
+def run(spec: dict, data_dir: str, rebuild: bool = False, workers: int = None) -> dict:
+    """가격/재무 패널 + 리밸런싱 일정 (메모리 상 결과)"""
+    prices = build_price_panel(data_dir, rebuild=rebuild, workers=workers)
     print(f"[DataAgent] 가격 패널: {len(prices)} rows, {prices['code'].nunique()} stocks")
 
-    # 재무 패널
-    fundamentals = build_fundamental_panel(args.data_dir)
-    fundamentals.to_csv(os.path.join(args.output, "fundamentals.csv"), index=False)
+    fundamentals = build_fundamental_panel(data_dir)
     print(f"[DataAgent] 재무 패널: {len(fundamentals)} rows")
 
     # 리밸런싱 일정
@@ -125,20 +276,84 @@ def main():
     else:
         start, end = "2026-01-01", "2026-12-31"
     rebal_dates = get_rebalance_dates(start, end, spec["rebalance"]["freq"])
-    with open(os.path.join(args.output, "rebalance_dates.json"), "w") as f:
-        json.dump(rebal_dates, f, indent=2)
     print(f"[DataAgent] 리밸런싱 일정: {len(rebal_dates)} dates")
 
-    # 결과 요약
-    result = {
+    summary = {
         "status": "ok",
         "price_rows": len(prices),
         "stocks": int(prices["code"].nunique()) if not prices.empty else 0,
         "fundamental_rows": len(fundamentals),
         "rebalance_dates": len(rebal_dates),
     }
-    with open(os.path.join(args.output, "data_summary.json"), "w") as f:
-        json.dump(result, f, indent=2)
+    return {"prices": prices, "fundamentals": fundamentals, "rebal_dates": rebal_dates, "summary": summary}
+
+def link(spec: dict, panel_dir: str) -> dict:
+    """공유 패널(다른 data_agent 출력)을 다시 만들지 않고 전략별 리밸런싱 일정만 계산"""
+    with open(os.path.join(panel_dir, "data_summary.json")) as f:
+        summary = json.load(f)
+    close = read_price_panel(panel_dir, ["close"]).get("close", pd.DataFrame())
+    if len(close):
+        start, end = close.index[0].strftime("%Y-%m-%d"), close.index[-1].strftime("%Y-%m-%d")
+    else:
+        start, end = "2026-01-01", "2026-12-31"
+    rebal_dates = get_rebalance_dates(start, end, spec["rebalance"]["freq"])
+    print(f"[DataAgent] 공유 패널 사용: {panel_dir} ({summary.get('stocks', 0)} stocks), "
+          f"리밸런싱 일정: {len(rebal_dates)} dates")
+    return {"panel_dir": panel_dir, "rebal_dates": rebal_dates,
+            "summary": {**summary, "rebalance_dates": len(rebal_dates)}}
+
+def write_link_outputs(result: dict, output: str):
+    """panel_ref.json, rebalance_dates.json, data_summary.json"""
+    os.makedirs(output, exist_ok=True)
+    write_panel_ref(output, result["panel_dir"])
+    with open(os.path.join(output, "rebalance_dates.json"), "w") as f:
+        json.dump(result["rebal_dates"], f, indent=2)
+    with open(os.path.join(output, "data_summary.json"), "w") as f:
+        json.dump(result["summary"], f, indent=2)
+
+def write_outputs(result: dict, output: str, csv: bool = False):
+    """panel/, fundamentals/, rebalance_dates.json, data_summary.json (+ 선택적 CSV)"""
+    os.makedirs(output, exist_ok=True)
+    if os.path.exists(os.path.join(output, PANEL_REF_FILE)):  # 이전 배치 실행의 참조 대신 자체 패널 사용
+        os.remove(os.path.join(output, PANEL_REF_FILE))
+    write_price_panel(result["prices"], output)
+    write_frame(result["fundamentals"], output, FUNDAMENTAL_DIR)
+    if csv:
+        result["prices"].to_csv(os.path.join(output, "prices.csv"), index=False)
+        result["fundamentals"].to_csv(os.path.join(output, "fundamentals.csv"), index=False)
+    with open(os.path.join(output, "rebalance_dates.json"), "w") as f:
+        json.dump(result["rebal_dates"], f, indent=2)
+    with open(os.path.join(output, "data_summary.json"), "w") as f:
+        json.dump(result["summary"], f, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Data Agent")
+    parser.add_argument("--spec", required=True, help="strategy_spec.json 경로")
+    parser.add_argument("--data-dir", default="/home/taeho/invest-quant/data", help="데이터 디렉터리")
+    parser.add_argument("--output", required=True, help="출력 디렉터리")
+    parser.add_argument("--rebuild", action="store_true", help="가격 캐시 무시하고 전체 재파싱")
+    parser.add_argument("--workers", type=int, default=None, help="가격 파일 파싱 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--csv", action="store_true", help="디버그용 prices.csv / fundamentals.csv 추가 출력")
+    parser.add_argument("--panel-from", default=None,
+                        help="이미 만든 data_agent 출력 디렉터리 — 패널은 참조만 하고 리밸런싱 일정만 계산")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with telemetry.session("data_agent", args.telemetry, args.profile) as tel:
+        spec = load_and_validate(args.spec)
+        if args.panel_from:
+            with telemetry.phase(tel, "load"):
+                result = link(spec, args.panel_from)
+            telemetry.count(tel, codes=result["summary"].get("stocks", 0), rebalance_dates=len(result["rebal_dates"]))
+            with telemetry.phase(tel, "write"):
+                write_link_outputs(result, args.output)
+            return
+        with telemetry.phase(tel, "load"):
+            result = run(spec, args.data_dir, rebuild=args.rebuild, workers=args.workers)
+        telemetry.count(tel, price_rows=len(result["prices"]), codes=result["summary"]["stocks"],
+                        fundamental_rows=len(result["fundamentals"]), rebalance_dates=len(result["rebal_dates"]))
+        with telemetry.phase(tel, "write"):
+            write_outputs(result, args.output, csv=args.csv)
 
 if __name__ == "__main__":
     main()
@@ -1,11 +1,19 @@
 """Factor Agent — 팩터 계산/시그널 생성
 
-각 팩터별 cross-sectional 백분위 랭킹 → 복합 스코어 → 종목 랭킹
+각 팩터별 cross-sectional 백분위 랭킹 → 복합 스코어 (rank_sum / rank_product) → 종목 랭킹
+spec.signal.history면 리밸런싱일별 시그널 이력 (기준일 × 종목 복합 스코어 / 랭킹)도 생성 — 행별 일괄 랭킹.
 """
-import json, sys, os, argparse
+import json, sys, os, argparse, shutil, warnings
 import pandas as pd
 import numpy as np
 from core.schemas import load_and_validate
+from core import telemetry
+from core.panel import to_wide, load_price_panel, load_fundamentals, write_wide_panel, read_price_panel, \
+    last_observed_rows
+from core.factor_expr import compile_formulas, evaluate, evaluate_history
+from core.data_clock import fundamentals_asof
+
+SIGNAL_HISTORY_DIR = "signal_history"  # <output>/signal_history/{meta.json, dates.npy, composite_score.npy, rank.npy}
 
 def winsorize(series: pd.Series, lower: float = 0.01, upper: float = 0.99) -> pd.Series:
     """극단값 제거"""
@@ -23,113 +31,244 @@ def percentile_rank(series: pd.Series) -> pd.Series:
     """백분위 랭킹 (0~100)"""
     return series.rank(pct=True) * 100
 
-def calc_momentum(prices: pd.DataFrame, code: str, lookback: int, skip: int = 0) -> float:
-    """가격 모멘텀: lookback일 수익률 (최근 skip일 제외)"""
-    stock = prices[prices["code"] == code].sort_values("date")
-    if len(stock) < lookback + skip:
-        return np.nan
-    if skip > 0:
-        end_price = stock["close"].iloc[-(skip + 1)]
-    else:
-        end_price = stock["close"].iloc[-1]
-    start_price = stock["close"].iloc[-(lookback + skip)]
-    if start_price == 0:
-        return np.nan
-    return (end_price - start_price) / start_price * 100
-
-def compute_factor(factor_spec: dict, prices: pd.DataFrame, fundamentals: pd.DataFrame, codes: list) -> pd.Series:
-    """팩터 정의에 따라 종목별 팩터 값 계산"""
-    ftype = factor_spec["type"]
-    fid = factor_spec["id"]
-
-    if ftype == "ratio":
-        formula = factor_spec.get("formula", fid)
-        col_map = {"1/PER": ("per", True), "PER": ("per", False),
-                   "1/PBR": ("pbr", True), "PBR": ("pbr", False),
-                   "ROE": ("roe", False), "roe": ("roe", False)}
-        if formula in col_map:
-            col, invert = col_map[formula]
-            if col not in fundamentals.columns:
-                return pd.Series(np.nan, index=codes, name=fid)
-            vals = fundamentals.set_index("code").reindex(codes)[col]
-            if invert:
-                vals = vals.replace(0, np.nan)
-                vals = 1.0 / vals
-            return vals.rename(fid)
-        return pd.Series(np.nan, index=codes, name=fid)
-
-    elif ftype == "price_momentum":
-        lookback = factor_spec.get("lookback", 60)
-        skip = factor_spec.get("skip", 0)
-        vals = pd.Series({c: calc_momentum(prices, c, lookback, skip) for c in codes}, name=fid)
-        return vals
-
-    return pd.Series(np.nan, index=codes, name=fid)
-
-def main():
-    parser = argparse.ArgumentParser(description="Factor Agent")
-    parser.add_argument("--spec", required=True)
-    parser.add_argument("--input", required=True, help="data_agent 출력 디렉터리")
-    parser.add_argument("--output", required=True)
-    args = parser.parse_args()
+def row_ranks(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """행별 오름차순 랭킹 (1부터, 동점은 평균 — Series.rank 기본값) + 행별 유효 개수. NaN은 NaN."""
+    X = np.asarray(X, dtype=float)
+    K, N = X.shape
+    order = np.argsort(X, axis=1, kind="stable")                   # NaN은 행 끝으로
+    S = np.take_along_axis(X, order, axis=1)
+    pos = np.arange(N)
+    start = np.ones((K, N), dtype=bool)
+    start[:, 1:] = S[:, 1:] != S[:, :-1]
+    end = np.ones((K, N), dtype=bool)
+    end[:, :-1] = start[:, 1:]
+    first = np.maximum.accumulate(np.where(start, pos, 0), axis=1)
+    last = np.minimum.accumulate(np.where(end, pos, N - 1)[:, ::-1], axis=1)[:, ::-1]
+    ranks = np.empty((K, N))
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=1)
+    valid = ~np.isnan(X)
+    return np.where(valid, ranks, np.nan), valid.sum(axis=1)
 
-    spec = load_and_validate(args.spec)
-    os.makedirs(args.output, exist_ok=True)
+def percentile_rank_rows(X: np.ndarray) -> np.ndarray:
+    """행별 백분위 랭킹 (0~100) — percentile_rank의 (K × N) 일괄판"""
+    ranks, count = row_ranks(X)
+    return ranks / np.maximum(count, 1)[:, None] * 100
 
-    prices = pd.read_csv(os.path.join(args.input, "prices.csv"), parse_dates=["date"], dtype={"code": str}) \
-        if os.path.exists(os.path.join(args.input, "prices.csv")) else pd.DataFrame()
-    fundamentals = pd.read_csv(os.path.join(args.input, "fundamentals.csv"), dtype={"code": str}) \
-        if os.path.exists(os.path.join(args.input, "fundamentals.csv")) else pd.DataFrame()
+def winsorize_rows(X: np.ndarray, lower: float = 0.01, upper: float = 0.99) -> np.ndarray:
+    """행별 극단값 제거 (winsorize와 같은 선형 보간 분위수)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 전부 NaN인 행
+        lo, hi = np.nanquantile(X, [lower, upper], axis=1)
+    return np.clip(X, lo[:, None], hi[:, None])
 
-    # 유니버스: 가격+재무 모두 있는 종목
-    codes = sorted(set(prices["code"].unique()) | set(fundamentals["code"].unique())) if not prices.empty or not fundamentals.empty else []
+def zscore_rows(X: np.ndarray) -> np.ndarray:
+    """행별 표준화 (zscore와 같은 규칙: 표준편차 0이면 0, 유효값 1개 이하면 NaN)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(X, axis=1, keepdims=True)
+        std = np.nanstd(X, axis=1, ddof=1, keepdims=True)
+        return np.where(std == 0, X * 0, (X - mean) / std)
 
-    if len(codes) < 2:
-        print("[FactorAgent] 종목 수 부족 — 최소 2개 필요", file=sys.stderr)
-        pd.DataFrame(columns=["code", "composite_score", "rank"]).to_csv(
-            os.path.join(args.output, "signals.csv"), index=False)
-        json.dump({"status": "insufficient_data", "stocks": len(codes)},
-                  open(os.path.join(args.output, "factor_summary.json"), "w"), indent=2)
-        return
+# 팩터 type → 수식 (ratio/expr는 formula 그대로, 나머지는 수식으로 전개)
+FACTOR_FORMULAS = {
+    "ratio": lambda f: f.get("formula", f["id"]),
+    "expr": lambda f: f["formula"],
+    "price_momentum": lambda f: f"ret({f.get('lookback', 60)}, skip={f.get('skip', 0)}) * 100",
+}
 
-    # 팩터 계산
-    factor_df = pd.DataFrame(index=codes)
-    for fspec in spec["factors"]:
-        raw = compute_factor(fspec, prices, fundamentals, codes)
-        # winsorize
-        if "winsorize" in fspec:
-            lo, hi = fspec["winsorize"]
-            raw = winsorize(raw, lo, hi)
-        # zscore
-        if fspec.get("zscore"):
-            raw = zscore(raw)
-        # 백분위 랭킹
-        factor_df[fspec["id"]] = percentile_rank(raw)
+def factor_formula(factor_spec: dict):
+    """팩터 정의 → 수식 문자열 (지원하지 않는 type이면 None)"""
+    builder = FACTOR_FORMULAS.get(factor_spec["type"])
+    return builder(factor_spec) if builder else None
 
+def factor_values(fspecs: list, close: pd.DataFrame, fundamentals: pd.DataFrame, codes: list,
+                  store: str = None) -> pd.DataFrame:
+    """팩터 원값 (종목 × 팩터 id) — 전 팩터 수식을 한 프로그램으로 컴파일해 공통 부분식 1회 계산.
+
+    store: 팩터 저장소 디렉터리 (가격 시계열 팩터 재사용). 지원하지 않는 type은 NaN 열.
+    """
+    formulas = {f["id"]: factor_formula(f) for f in fspecs}
+    program = compile_formulas({fid: expr for fid, expr in formulas.items() if expr is not None})
+    values = evaluate(program, close, fundamentals, codes, store=store)
+    return values.reindex(columns=list(formulas))
+
+def compute_factor(factor_spec: dict, prices: pd.DataFrame, fundamentals: pd.DataFrame, codes: list,
+                   close: pd.DataFrame = None) -> pd.Series:
+    """팩터 정의에 따라 종목별 팩터 값 계산 (close: 미리 피벗한 종가 행렬, 없으면 prices에서 생성)"""
+    if close is None:
+        close = to_wide(prices, "close")
+    return factor_values([factor_spec], close, fundamentals, codes)[factor_spec["id"]]
+
+def universe(close: pd.DataFrame, fundamentals: pd.DataFrame) -> list:
+    """유니버스: 가격 또는 재무 데이터가 있는 종목"""
+    return sorted(set(close.columns) | set(fundamentals["code"] if not fundamentals.empty else []))
+
+def factor_rank(fspec: dict, close: pd.DataFrame, fundamentals: pd.DataFrame, codes: list,
+                raw: pd.Series = None) -> pd.Series:
+    """팩터 원값 → winsorize → zscore → 백분위 랭킹 (raw: 미리 계산한 원값)"""
+    if raw is None:
+        raw = compute_factor(fspec, None, fundamentals, codes, close=close)
+    # winsorize
+    if "winsorize" in fspec:
+        lo, hi = fspec["winsorize"]
+        raw = winsorize(raw, lo, hi)
+    # zscore
+    if fspec.get("zscore"):
+        raw = zscore(raw)
+    # 백분위 랭킹
+    return percentile_rank(raw)
+
+def factor_rank_rows(fspec: dict, X: np.ndarray) -> np.ndarray:
+    """팩터 원값 (K × N) → 행별 winsorize → zscore → 백분위 랭킹 (factor_rank의 일괄판)"""
+    if "winsorize" in fspec:
+        lo, hi = fspec["winsorize"]
+        X = winsorize_rows(X, lo, hi)
+    if fspec.get("zscore"):
+        X = zscore_rows(X)
+    return percentile_rank_rows(X)
+
+def factor_ranks(fspecs: list, close: pd.DataFrame, fundamentals: pd.DataFrame, codes: list,
+                 store: str = None) -> pd.DataFrame:
+    """전 팩터 백분위 (종목 × 팩터 id) — 원값은 factor_values로 일괄 계산"""
+    raw = factor_values(fspecs, close, fundamentals, codes, store=store)
+    return pd.DataFrame({f["id"]: factor_rank(f, close, fundamentals, codes, raw=raw[f["id"]]) for f in fspecs},
+                        index=codes)
+
+def composite(ranks, weights: dict, method: str = "rank_sum"):
+    """팩터 백분위 → 복합 스코어 (Series 또는 배열 공통)
+
+    rank_sum:     Σ w · p
+    rank_product: Π p^w — 가중 기하 결합, 한 팩터라도 하위면 크게 감점 (가중치 합 1이면 0~100 척도)
+    """
+    terms = [(ranks[fid], w) for fid, w in weights.items() if fid in ranks]
+    if method == "rank_product":
+        score = 1.0
+        for p, w in terms:
+            score = score * p ** w
+        return score
+    return sum(p * w for p, w in terms)
+
+def combine_scores(factor_df: pd.DataFrame, weights: dict, method: str = "rank_sum") -> pd.DataFrame:
+    """팩터 백분위 → 복합 스코어 + 랭킹 (rank 오름차순 정렬)"""
     # NaN을 50(중립)으로 채움 (해당 팩터 데이터 없는 종목)
     factor_df = factor_df.fillna(50.0)
 
     # 복합 스코어
-    weights = spec["signal"]["weights"]
-    factor_df["composite_score"] = sum(
-        factor_df[fid] * w for fid, w in weights.items() if fid in factor_df.columns
-    )
+    factor_df["composite_score"] = composite(factor_df, weights, method)
     factor_df["rank"] = factor_df["composite_score"].rank(ascending=False).fillna(len(factor_df)).astype(int)
     factor_df = factor_df.sort_values("rank")
     factor_df.index.name = "code"
+    return factor_df
+
+def universe_rows(close: pd.DataFrame, fundamentals: pd.DataFrame, codes: list, dates) -> np.ndarray:
+    """기준일별 유니버스 (K × N bool): 전일까지 가격 관측 또는 공시 래그가 지난 재무가 있는 종목"""
+    active = last_observed_rows(close.reindex(columns=codes), dates) >= 0 if not close.empty \
+        else np.zeros((len(dates), len(codes)), dtype=bool)
+    if not fundamentals.empty and "report_date" in fundamentals.columns:
+        known = fundamentals_asof(fundamentals, list(dates))
+        k = pd.DatetimeIndex(dates).get_indexer(known["asof_date"])
+        j = pd.Index(codes).get_indexer(known["code"])
+        active[k[(k >= 0) & (j >= 0)], j[(k >= 0) & (j >= 0)]] = True
+    return active
+
+def signal_history(spec: dict, close: pd.DataFrame, fundamentals: pd.DataFrame, dates: list,
+                   store: str = None) -> dict:
+    """리밸런싱일별 시그널 → {"composite_score", "rank"}: (기준일 × 종목) DataFrame
+
+    기준일 d마다 d 전일까지 가격 · d에 사용 가능한 재무만으로 score_signals와 같은 절차
+    (winsorize → zscore → 백분위 → 결합 → 랭킹)를 행별 일괄 계산. 유니버스 밖 종목 / 종목 2개 미만인 행은 NaN.
+    """
+    codes = universe(close, fundamentals)
+    dates = pd.DatetimeIndex(pd.to_datetime(pd.Index(dates))).unique().sort_values()
+    fspecs = spec["factors"]
+    formulas = {f["id"]: factor_formula(f) for f in fspecs}
+    program = compile_formulas({fid: expr for fid, expr in formulas.items() if expr is not None})
+    raw = evaluate_history(program, close, fundamentals, codes, dates, store=store)
+
+    active = universe_rows(close, fundamentals, codes, dates)
+    active &= (active.sum(axis=1) >= 2)[:, None]
+    nan = np.full(active.shape, np.nan)
+    ranks = {f["id"]: np.where(active, factor_rank_rows(f, np.where(active, raw.get(f["id"], nan), np.nan)), np.nan)
+             for f in fspecs}
+    filled = {fid: np.where(np.isnan(p), 50.0, p) for fid, p in ranks.items()}
+    score = np.where(active, composite(filled, spec["signal"]["weights"], spec["signal"].get("method", "rank_sum")),
+                     np.nan)
+    rank = np.floor(row_ranks(-score)[0])
+    print(f"[FactorAgent] 시그널 이력 {len(dates)}개 기준일 × {len(codes)} 종목")
+    return {"composite_score": pd.DataFrame(score, index=dates, columns=codes),
+            "rank": pd.DataFrame(rank, index=dates, columns=codes)}
+
+def load_signal_history(in_dir: str) -> dict:
+    """write_outputs가 기록한 시그널 이력 (없으면 None)"""
+    if not os.path.exists(os.path.join(in_dir, SIGNAL_HISTORY_DIR, "meta.json")):
+        return None
+    return read_price_panel(in_dir, name=SIGNAL_HISTORY_DIR)
+
+def score_signals(spec: dict, close: pd.DataFrame, fundamentals: pd.DataFrame, store: str = None) -> pd.DataFrame:
+    """팩터 백분위 → 복합 스코어 → 랭킹 (index=code, rank 오름차순). 종목 2개 미만이면 빈 DataFrame.
+
+    store: 팩터 저장소 디렉터리 (None이면 매번 전체 계산)
+    """
+    codes = universe(close, fundamentals)
+    if len(codes) < 2:
+        print("[FactorAgent] 종목 수 부족 — 최소 2개 필요", file=sys.stderr)
+        return pd.DataFrame(columns=["composite_score", "rank"], index=pd.Index(codes, name="code"))
+
+    # 팩터 계산
+    factor_df = combine_scores(factor_ranks(spec["factors"], close, fundamentals, codes, store=store),
+                               spec["signal"]["weights"], spec["signal"].get("method", "rank_sum"))
 
-    # 출력
-    factor_df.to_csv(os.path.join(args.output, "signals.csv"))
     print(f"[FactorAgent] {len(factor_df)} 종목 스코어링 완료")
     print(f"[FactorAgent] 상위 5:")
     for _, row in factor_df.head(5).iterrows():
         print(f"  {row.name}: score={row['composite_score']:.1f} rank={int(row['rank'])}")
+    return factor_df
 
-    # 요약
-    result = {"status": "ok", "stocks": len(factor_df),
-              "top5": factor_df.head(5).reset_index()[["code", "composite_score", "rank"]].to_dict("records")}
-    with open(os.path.join(args.output, "factor_summary.json"), "w") as f:
+def write_outputs(factor_df: pd.DataFrame, output: str, history: dict = None):
+    """signals.csv + factor_summary.json (+ history 있으면 signal_history/, 없으면 이전 이력 제거)"""
+    os.makedirs(output, exist_ok=True)
+    if history is not None:
+        write_wide_panel(history, output, name=SIGNAL_HISTORY_DIR)
+    else:
+        shutil.rmtree(os.path.join(output, SIGNAL_HISTORY_DIR), ignore_errors=True)
+    if len(factor_df) < 2:
+        pd.DataFrame(columns=["code", "composite_score", "rank"]).to_csv(
+            os.path.join(output, "signals.csv"), index=False)
+        result = {"status": "insufficient_data", "stocks": len(factor_df)}
+    else:
+        factor_df.to_csv(os.path.join(output, "signals.csv"))
+        result = {"status": "ok", "stocks": len(factor_df),
+                  "top5": factor_df.head(5).reset_index()[["code", "composite_score", "rank"]].to_dict("records")}
+    with open(os.path.join(output, "factor_summary.json"), "w") as f:
         json.dump(result, f, indent=2, default=str)
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Factor Agent")
+    parser.add_argument("--spec", required=True)
+    parser.add_argument("--input", required=True, help="data_agent 출력 디렉터리")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--factor-store", default=None, help="팩터 저장소 디렉터리 (전략·실행 간 팩터 값 재사용)")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with telemetry.session("factor_agent", args.telemetry, args.profile) as tel:
+        spec = load_and_validate(args.spec)
+        with telemetry.phase(tel, "load"):
+            close = load_price_panel(args.input, ["close"]).get("close", pd.DataFrame())
+            fundamentals = load_fundamentals(args.input)
+        with telemetry.phase(tel, "compute"):
+            signals = score_signals(spec, close, fundamentals, store=args.factor_store)
+        history = None
+        if spec["signal"].get("history"):
+            with telemetry.phase(tel, "history"):
+                rebal_path = os.path.join(args.input, "rebalance_dates.json")
+                rebal_dates = json.load(open(rebal_path)) if os.path.exists(rebal_path) else []
+                history = signal_history(spec, close, fundamentals, rebal_dates, store=args.factor_store)
+        telemetry.count(tel, dates=len(close), codes=len(signals), factors=len(spec["factors"]),
+                        fundamental_rows=len(fundamentals),
+                        history_dates=len(history["rank"]) if history is not None else 0)
+        with telemetry.phase(tel, "write"):
+            write_outputs(signals, args.output, history)
+
 if __name__ == "__main__":
     main()
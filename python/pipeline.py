@@ -0,0 +1,96 @@
+"""Pipeline — Data → Factor → Portfolio → Backtest → Report 단일 프로세스 실행
+
+에이전트 간 DataFrame을 파일 왕복 없이 메모리로 전달.
+run 디렉터리 결과물(run_result.json, trades.csv, report.md)은 항상 저장하고,
+중간 산출물(panel/, signals.csv, weights.json …)은 --artifacts 지정 시에만 저장.
+"""
+import json, os, argparse
+import data_agent, factor_agent, portfolio_agent, backtest_agent, reporter_agent
+from core.schemas import load_and_validate
+from core.panel import to_wide
+from core.factor_store import FACTOR_STORE_DIR
+from core import telemetry, run_registry
+
+def run_pipeline(spec: dict, data_dir: str, run_dir: str, artifacts_dir: str = None,
+                 prev_weights: dict = None, rebuild: bool = False, workers: int = None,
+                 factor_store: str = None, tel: dict = None, registry: str = None) -> dict:
+    """전 단계 실행 → {"data", "signals", "weights", "run_result", "trades", "returns"}
+
+    factor_store: 팩터 저장소 디렉터리 (None이면 팩터 매번 전체 계산)
+    registry: 실행 레지스트리 경로 (None이면 기록 안 함)
+    tel: 텔레메트리 레코드 (단계별 구간 기록)
+    """
+    # 1. Data
+    with telemetry.phase(tel, "data"):
+        data = data_agent.run(spec, data_dir, rebuild=rebuild, workers=workers)
+        if artifacts_dir:
+            data_agent.write_outputs(data, artifacts_dir)
+        close = to_wide(data["prices"], "close")
+
+    # 2. Factor (spec.signal.history면 리밸런싱일별 시그널 이력까지)
+    with telemetry.phase(tel, "factor"):
+        signals = factor_agent.score_signals(spec, close, data["fundamentals"], store=factor_store)
+        history = factor_agent.signal_history(spec, close, data["fundamentals"], data["rebal_dates"],
+                                              store=factor_store) if spec["signal"].get("history") else None
+        if artifacts_dir:
+            factor_agent.write_outputs(signals, artifacts_dir, history)
+
+    # 3. Portfolio
+    with telemetry.phase(tel, "portfolio"):
+        weights = portfolio_agent.build_weights(signals, spec, prev_weights or {}, close)
+        schedule = portfolio_agent.weight_history(history, spec, close) if history is not None else None
+        portfolio_agent.print_weights(weights)
+        if artifacts_dir:
+            portfolio_agent.write_outputs(weights, artifacts_dir, schedule)
+
+    # 4. Backtest (스케줄이 있으면 리밸런싱일마다 종목 재선정)
+    with telemetry.phase(tel, "backtest"):
+        run_result, trades, returns = backtest_agent.evaluate(spec, close, weights if schedule is None else schedule,
+                                                               data["rebal_dates"], data["fundamentals"],
+                                                               to_wide(data["prices"], "volume"))
+        backtest_agent.write_outputs(run_result, trades, run_dir)
+        if registry:
+            run_registry.record(registry, run_dir, run_result, spec, returns)
+
+    # 5. Report
+    with telemetry.phase(tel, "report"):
+        report_path = reporter_agent.write_outputs(reporter_agent.render_report(run_result, signals, weights), run_dir)
+        if registry:
+            run_registry.attach_report(registry, run_dir, report_path)
+    telemetry.count(tel, price_rows=len(data["prices"]), dates=len(close), codes=close.shape[1],
+                    holdings=len(weights), trades=len(trades))
+
+    return {"data": data, "signals": signals, "weights": weights,
+            "run_result": run_result, "trades": trades, "returns": returns}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline (single process)")
+    parser.add_argument("--spec", required=True)
+    parser.add_argument("--data-dir", required=True, help="원천 데이터 디렉터리 (historical/, fundamentals/)")
+    parser.add_argument("--run-dir", required=True, help="runs/ 결과 디렉터리")
+    parser.add_argument("--artifacts", default=None, help="중간 산출물 저장 디렉터리 (미지정 시 저장 안 함)")
+    parser.add_argument("--prev-weights", default=None, help="이전 비중 JSON")
+    parser.add_argument("--rebuild", action="store_true", help="가격 캐시 무시하고 전체 재파싱")
+    parser.add_argument("--workers", type=int, default=None, help="가격 파일 파싱 프로세스 수")
+    parser.add_argument("--factor-store", default=None,
+                        help=f"팩터 저장소 디렉터리 (기본: <data-dir>/{FACTOR_STORE_DIR})")
+    parser.add_argument("--registry", default=None,
+                        help=f"실행 레지스트리 경로 (기본: <run-dir 상위>/{run_registry.REGISTRY_FILE})")
+    parser.add_argument("--no-registry", action="store_true", help="실행 레지스트리 기록 안 함")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with telemetry.session("pipeline", args.telemetry, args.profile) as tel:
+        spec = load_and_validate(args.spec)
+        os.makedirs(args.run_dir, exist_ok=True)
+        prev = {}
+        if args.prev_weights and os.path.exists(args.prev_weights):
+            with open(args.prev_weights) as f:
+                prev = json.load(f)
+        run_pipeline(spec, args.data_dir, args.run_dir, artifacts_dir=args.artifacts,
+                     prev_weights=prev, rebuild=args.rebuild, workers=args.workers,
+                     factor_store=args.factor_store or os.path.join(args.data_dir, FACTOR_STORE_DIR), tel=tel,
+                     registry=None if args.no_registry else args.registry or run_registry.default_path(args.run_dir))
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,63 @@
 """Portfolio Agent — 시그널 → 목표 비중 (제약 조건 반영)
 
-MVP: top_n_equal (상위 N개 동일 비중) + 섹터/비중/회전율 제약
+top_n_equal: 상위 N개 동일 비중 + 섹터/비중/회전율 제약
+risk_parity: 상위 N개 위험 기여 균등(ERC) 또는 역변동성 — 축소 공분산, 리밸런싱일 일괄 풀이
+입력에 시그널 이력(signal_history/)이 있으면 리밸런싱일별 비중 스케줄(weight_history/)도 생성.
 """
-import json, sys, os, argparse
+import json, sys, os, argparse, shutil
 import pandas as pd
 import numpy as np
 from core.schemas import load_and_validate
+from core import telemetry
+from core.panel import load_price_panel, write_wide_panel, read_price_panel
+from core.risk_parity import shrink_covariance, risk_parity_weights, inverse_vol_weights
+from core.constraints import load_sector_map, sector_index, DEFAULT_SECTOR, cap_weights, project_weights
+from factor_agent import load_signal_history
 
-# 간이 섹터 매핑 (코스피200 주요 50종목)
-SECTOR_MAP = {
-    "005930": "반도체", "000660": "반도체", "042700": "반도체", "009150": "반도체",
-    "005380": "자동차", "000270": "자동차", "012330": "자동차",
-    "035420": "IT", "035720": "IT", "036570": "IT", "018260": "IT",
-    "068270": "바이오", "207940": "바이오", "000100": "바이오",
-    "006400": "2차전지", "373220": "2차전지", "247540": "2차전지",
-    "003550": "지주", "034730": "지주", "267250": "지주", "078930": "지주",
-    "051910": "화학", "011170": "화학", "096770": "화학", "010950": "화학",
-    "055550": "금융", "105560": "금융", "086790": "금융", "032830": "금융",
-    "316140": "금융", "138040": "금융", "024110": "금융", "000810": "금융", "006800": "금융",
-    "015760": "유틸리티", "017670": "통신", "030200": "통신",
-    "005490": "철강", "004020": "철강", "010130": "철강",
-    "028260": "건설", "047050": "무역",
-    "066570": "전자", "003490": "항공", "011200": "해운",
-    "009540": "조선", "042660": "조선", "010140": "조선", "329180": "조선",
-    "352820": "엔터",
-}
+RISK_LOOKBACK = 120  # 공분산 추정 창 (거래일)
+WEIGHT_HISTORY_DIR = "weight_history"  # <output>/weight_history/{meta.json, dates.npy, weight.npy}
 
-def get_sector(code: str) -> str:
-    return SECTOR_MAP.get(code, "기타")
+SECTOR_MAP = load_sector_map()
 
-def build_weights(signals: pd.DataFrame, spec: dict, prev_weights: dict = None) -> dict:
-    """상위 N개 동일 비중 + 제약 조건"""
+def get_sector(code: str) -> str:
+    return SECTOR_MAP.get(code, DEFAULT_SECTOR)
+
+def risk_parity_matrix(close: pd.DataFrame, codes: list, as_of: list, pconf: dict) -> np.ndarray:
+    """기준일별 리스크 패리티 비중 (K × N) — 기준일 전일까지 lookback 창 공분산을 일괄 추정·풀이.
+
+    pconf: risk_lookback (기본 120), shrinkage (기본 LW 자동), weighting ("erc" | "inverse_vol"),
+           max_weight, sector_cap. 가격 없는 종목은 비중 0.
+    """
+    lookback = int(pconf.get("risk_lookback", RISK_LOOKBACK))
+    ret = close.reindex(columns=codes).astype(float).pct_change().replace([np.inf, -np.inf], np.nan).to_numpy(dtype=float)
+    ends = close.index.searchsorted(pd.to_datetime(pd.Index(as_of)), side="left")  # 기준일 당일 수익률 제외
+    # (K × lookback) 행 인덱스 — 상장 전 구간은 NaN 행으로 채움
+    rows = ends[:, None] - lookback + np.arange(lookback)
+    padded = np.vstack([np.full((1, len(codes)), np.nan), ret])
+    windows = padded[np.where(rows >= 0, rows + 1, 0)]
+
+    cov, mask = shrink_covariance(windows, pconf.get("shrinkage"))
+    if pconf.get("weighting", "erc") == "inverse_vol":
+        W = inverse_vol_weights(cov, mask)
+    else:
+        W = risk_parity_weights(cov, mask)
+    sectors, _ = sector_index(codes, SECTOR_MAP)
+    W = cap_weights(W, pconf.get("max_weight", 1.0), sectors, pconf.get("sector_cap", 1.0))
+    return np.where(mask, W, 0.0)
+
+def weight_schedule(close: pd.DataFrame, codes: list, rebal_dates: list, spec: dict) -> pd.DataFrame:
+    """리밸런싱일 × 종목 리스크 패리티 비중 (백테스트용, 각 시점 이전 데이터만 사용)"""
+    dates = pd.to_datetime(pd.Index(rebal_dates)) if rebal_dates else close.index[:1]
+    dates = dates[dates <= close.index[-1]].union(close.index[:1])
+    W = risk_parity_matrix(close, codes, list(dates), spec["portfolio"])
+    return pd.DataFrame(W, index=dates, columns=codes)
+
+def build_weights(signals: pd.DataFrame, spec: dict, prev_weights: dict = None,
+                  prices: pd.DataFrame = None) -> dict:
+    """상위 N개 비중 산출 (top_n_equal / risk_parity) + 제약 조건 (core.constraints 동시 투영)
+
+    prices: (날짜 × 종목) 종가 — risk_parity 공분산 추정용. 없으면 동일 비중으로 대체.
+    """
     pconf = spec["portfolio"]
     n = pconf["n"]
     max_weight = pconf.get("max_weight", 1.0)
@@ -44,93 +71,120 @@ def build_weights(signals: pd.DataFrame, spec: dict, prev_weights: dict = None)
     if not codes:
         return {}
 
-    # 동일 비중
-    raw_weight = 1.0 / len(codes)
-    weights = {c: min(raw_weight, max_weight) for c in codes}
-
-    # 섹터 캡 적용
-    sector_weights = {}
-    for c, w in weights.items():
-        s = get_sector(c)
-        sector_weights.setdefault(s, []).append(c)
-
-    for sector, sector_codes in sector_weights.items():
-        total = sum(weights[c] for c in sector_codes)
-        if total > sector_cap:
-            scale = sector_cap / total
-            for c in sector_codes:
-                weights[c] *= scale
-
-    # 정규화 (합계 = 1.0)
-    total = sum(weights.values())
-    if total > 0:
-        weights = {c: w / total for c, w in weights.items()}
-
-    # 회전율 제약
-    if prev_weights:
-        turnover = sum(abs(weights.get(c, 0) - prev_weights.get(c, 0))
-                       for c in set(list(weights.keys()) + list(prev_weights.keys())))
-        if turnover > max_turnover:
-            scale = max_turnover / turnover
-            # 변화분만 스케일링
-            for c in weights:
-                prev = prev_weights.get(c, 0)
-                weights[c] = prev + (weights[c] - prev) * scale
-            # 빠진 종목 복원
-            for c in prev_weights:
-                if c not in weights:
-                    weights[c] = prev_weights[c] * (1 - scale)
-            # 재정규화
-            total = sum(weights.values())
-            if total > 0:
-                weights = {c: w / total for c, w in weights.items()}
+    if pconf.get("method") == "risk_parity" and prices is not None and not prices.empty:
+        # 리스크 패리티 원비중 (최신 종가까지 반영 — 다음 거래일부터 적용)
+        target = risk_parity_matrix(prices, codes, [prices.index[-1] + pd.Timedelta(days=1)], pconf)[0]
+    else:
+        if pconf.get("method") == "risk_parity":
+            print("[PortfolioAgent] 가격 데이터 없음 — risk_parity 대신 동일 비중", file=sys.stderr)
+        target = np.full(len(codes), 1.0 / len(codes))
+
+    # 이전 보유 종목까지 합집합 열로 두고 상한 / 섹터 캡 / 회전율 동시 투영
+    prev_weights = prev_weights or {}
+    columns = codes + [c for c in prev_weights if c not in set(codes)]
+    W = np.zeros((1, len(columns)))
+    W[0, :len(codes)] = target
+    prev = np.array([[prev_weights.get(c, 0.0) for c in columns]]) if prev_weights else None
+    sectors, _ = sector_index(columns, SECTOR_MAP)
+    W = project_weights(W, max_weight, sectors, sector_cap, prev, max_turnover if prev_weights else None)
+    weights = dict(zip(columns, W[0].tolist()))
 
     # 0 이하 제거
     weights = {c: round(w, 6) for c, w in weights.items() if w > 0.001}
     return weights
 
-def main():
-    parser = argparse.ArgumentParser(description="Portfolio Agent")
-    parser.add_argument("--spec", required=True)
-    parser.add_argument("--input", required=True, help="factor_agent 출력 디렉터리")
-    parser.add_argument("--output", required=True)
-    parser.add_argument("--prev-weights", default=None, help="이전 비중 JSON")
-    args = parser.parse_args()
-
-    spec = load_and_validate(args.spec)
-    os.makedirs(args.output, exist_ok=True)
-
-    signals_path = os.path.join(args.input, "signals.csv")
-    if not os.path.exists(signals_path):
-        print("[PortfolioAgent] signals.csv 없음", file=sys.stderr)
-        sys.exit(1)
-
-    signals = pd.read_csv(signals_path, dtype={"code": str}, index_col="code")
-
-    prev = {}
-    if args.prev_weights and os.path.exists(args.prev_weights):
-        with open(args.prev_weights) as f:
-            prev = json.load(f)
-
-    weights = build_weights(signals, spec, prev)
-
-    # 출력
-    out_path = os.path.join(args.output, "weights.json")
-    with open(out_path, "w") as f:
+def weight_history(history: dict, spec: dict, prices: pd.DataFrame = None) -> pd.DataFrame:
+    """시그널 이력 → 리밸런싱일 × 종목 비중 스케줄 (백테스트 run_backtest 입력 형식)
+
+    기준일마다 그 행의 랭킹으로 build_weights — 회전율 제약의 이전 비중은 직전 기준일 비중,
+    risk_parity 공분산은 기준일 전일까지 가격. 시그널이 없는 기준일은 전액 현금.
+    """
+    score, rank = history["composite_score"], history["rank"]
+    rows, prev = [], {}
+    for d in rank.index:
+        r = rank.loc[d].dropna()
+        if len(r) < 2:
+            rows.append({})
+            prev = {}
+            continue
+        signals = pd.DataFrame({"composite_score": score.loc[d, r.index], "rank": r}).sort_values("rank", kind="stable")
+        window = prices.iloc[:prices.index.searchsorted(d)] if prices is not None else None
+        prev = build_weights(signals, spec, prev, window)
+        rows.append(prev)
+    table = pd.DataFrame(rows, index=rank.index, columns=sorted({c for w in rows for c in w}))
+    return table.fillna(0.0)
+
+def load_weight_history(in_dir: str) -> pd.DataFrame:
+    """write_outputs가 기록한 비중 스케줄 (없으면 None)"""
+    if not os.path.exists(os.path.join(in_dir, WEIGHT_HISTORY_DIR, "meta.json")):
+        return None
+    return read_price_panel(in_dir, name=WEIGHT_HISTORY_DIR)["weight"].astype(float)
+
+def write_outputs(weights: dict, output: str, schedule: pd.DataFrame = None):
+    """weights.json + portfolio_summary.json (+ schedule 있으면 weight_history/, 없으면 이전 스케줄 제거)"""
+    os.makedirs(output, exist_ok=True)
+    if schedule is not None:
+        write_wide_panel({"weight": schedule}, output, name=WEIGHT_HISTORY_DIR)
+    else:
+        shutil.rmtree(os.path.join(output, WEIGHT_HISTORY_DIR), ignore_errors=True)
+    with open(os.path.join(output, "weights.json"), "w") as f:
         json.dump(weights, f, indent=2)
 
-    print(f"[PortfolioAgent] {len(weights)} 종목 비중 설정")
-    for c, w in sorted(weights.items(), key=lambda x: -x[1])[:5]:
-        print(f"  {c} ({get_sector(c)}): {w:.2%}")
-
-    # 요약
     result = {"status": "ok", "holdings": len(weights),
               "weights": weights, "sectors": {}}
     for c, w in weights.items():
         s = get_sector(c)
         result["sectors"][s] = result["sectors"].get(s, 0) + w
-    with open(os.path.join(args.output, "portfolio_summary.json"), "w") as f:
+    with open(os.path.join(output, "portfolio_summary.json"), "w") as f:
         json.dump(result, f, indent=2)
 
+def print_weights(weights: dict):
+    print(f"[PortfolioAgent] {len(weights)} 종목 비중 설정")
+    for c, w in sorted(weights.items(), key=lambda x: -x[1])[:5]:
+        print(f"  {c} ({get_sector(c)}): {w:.2%}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Portfolio Agent")
+    parser.add_argument("--spec", required=True)
+    parser.add_argument("--input", required=True, help="factor_agent 출력 디렉터리")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--prev-weights", default=None, help="이전 비중 JSON")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with telemetry.session("portfolio_agent", args.telemetry, args.profile) as tel:
+        spec = load_and_validate(args.spec)
+
+        signals_path = os.path.join(args.input, "signals.csv")
+        if not os.path.exists(signals_path):
+            print("[PortfolioAgent] signals.csv 없음", file=sys.stderr)
+            sys.exit(1)
+
+        with telemetry.phase(tel, "load"):
+            signals = pd.read_csv(signals_path, dtype={"code": str}, index_col="code")
+
+            prev = {}
+            if args.prev_weights and os.path.exists(args.prev_weights):
+                with open(args.prev_weights) as f:
+                    prev = json.load(f)
+
+            close = None
+            if spec["portfolio"].get("method") == "risk_parity":
+                close = load_price_panel(args.input, ["close"]).get("close")
+            history = load_signal_history(args.input) if spec["signal"].get("history") else None
+
+        with telemetry.phase(tel, "compute"):
+            weights = build_weights(signals, spec, prev, close)
+        schedule = None
+        if history is not None:
+            with telemetry.phase(tel, "history"):
+                schedule = weight_history(history, spec, close)
+            print(f"[PortfolioAgent] 비중 스케줄 {len(schedule)}개 리밸런싱일 × {schedule.shape[1]} 종목")
+        telemetry.count(tel, codes=len(signals), holdings=len(weights), prev_holdings=len(prev),
+                        history_dates=len(schedule) if schedule is not None else 0)
+        print_weights(weights)
+        with telemetry.phase(tel, "write"):
+            write_outputs(weights, args.output, schedule)
+
 if __name__ == "__main__":
     main()
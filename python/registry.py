@@ -0,0 +1,143 @@
+"""Run Registry CLI — runs/ 실행 결과 색인 조회·비교
+
+  python registry.py index                               # runs/ 아래 미색인 실행 일괄 색인
+  python registry.py top --metric sharpe --quarter last  # 지난 분기 Sharpe 상위 전략
+  python registry.py compare RUN_ID RUN_ID … [--start --end] [--output compare.md]
+"""
+import json, os, sys, argparse
+from datetime import date
+import numpy as np
+import pandas as pd
+from core import run_registry
+from core.metrics import batch_metrics, month_labels, round_metrics, METRIC_KEYS
+
+RUNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "runs")
+
+def quarter_range(which: str, today: date = None) -> tuple[str, str]:
+    """"current" | "last" → (분기 첫날, 분기 말일) ISO 문자열"""
+    today = today or date.today()
+    q = (today.month - 1) // 3 - (1 if which == "last" else 0)
+    year, q = today.year + q // 4, q % 4
+    start = pd.Timestamp(year=year, month=q * 3 + 1, day=1)
+    end = start + pd.offsets.QuarterEnd()
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+def window_metrics(curve: pd.Series, start: str = None, end: str = None) -> dict:
+    """자산곡선 구간 [start, end]의 성과 지표 (run_result 형식)"""
+    window = curve.loc[start:end]
+    if len(window) < 2:
+        return {k: None for k in METRIC_KEYS}
+    pos = curve.index.get_loc(window.index[0])
+    wealth = window.to_numpy()
+    base = np.concatenate([[curve.iloc[pos - 1] if pos > 0 else 1.0], wealth[:-1]])  # 곡선 시작 자산 = 1
+    return round_metrics(batch_metrics(wealth / base - 1, month_labels(window.index)))
+
+def _fmt(v, pct: bool = False) -> str:
+    if v is None or (isinstance(v, float) and np.isnan(v)):
+        return "-"
+    return f"{v:.2%}" if pct else (f"{v:.2f}" if isinstance(v, float) else str(v))
+
+PERCENT = {"cagr", "mdd", "win_rate", "sharpe_degradation", "oos_positive_folds"}
+
+def render_table(rows: list, columns: list) -> str:
+    lines = ["| " + " | ".join(columns) + " |", "|" + "|".join("------" for _ in columns) + "|"]
+    for r in rows:
+        lines.append("| " + " | ".join(_fmt(r.get(c), c in PERCENT) for c in columns) + " |")
+    return "\n".join(lines)
+
+def render_compare(rows: list, curves: dict, start: str = None, end: str = None) -> str:
+    """실행 간 비교 리포트 Markdown — 저장 지표, walk-forward, 공통 구간 지표, 일별 수익률 상관"""
+    ids = [r["run_id"] for r in rows]
+    lines = [f"# Run Comparison ({len(rows)} runs)", "", "## 성과 지표 (전 구간)", "",
+             render_table(rows, ["run_id", "strategy", "period_start", "period_end", *run_registry.METRIC_COLUMNS]),
+             "", "## Walk-Forward", "",
+             render_table(rows, ["run_id", "spec_hash", *run_registry.WF_COLUMNS]), ""]
+
+    with_curve = [i for i in ids if i in curves]
+    if with_curve:
+        # 공통 구간: 지정 없으면 자산곡선이 모두 겹치는 기간
+        lo = start or max(curves[i].index[0] for i in with_curve).strftime("%Y-%m-%d")
+        hi = end or min(curves[i].index[-1] for i in with_curve).strftime("%Y-%m-%d")
+        window = [{"run_id": i, **window_metrics(curves[i], lo, hi)} for i in with_curve]
+        lines += [f"## 구간 성과 ({lo} ~ {hi})", "", render_table(window, ["run_id", *METRIC_KEYS]), ""]
+        if len(with_curve) > 1:
+            daily = pd.DataFrame({i: curves[i].loc[lo:hi].pct_change() for i in with_curve}).corr()
+            lines += ["## 일별 수익률 상관", "", "| | " + " | ".join(with_curve) + " |",
+                      "|---|" + "|".join("------" for _ in with_curve) + "|"]
+            lines += [f"| {i} | " + " | ".join(_fmt(float(daily.loc[i, j])) for j in with_curve) + " |"
+                      for i in with_curve]
+            lines.append("")
+    missing = [i for i in ids if i not in curves]
+    if missing:
+        lines += [f"> 자산곡선 없음 (캐시 복원 또는 파일 색인): {', '.join(missing)}", ""]
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Registry")
+    parser.add_argument("--registry", default=None,
+                        help=f"레지스트리 경로 (기본: runs/{run_registry.REGISTRY_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_index = sub.add_parser("index", help="실행 디렉터리 색인")
+    p_index.add_argument("--runs", default=RUNS_DIR, help="runs/ 디렉터리")
+    p_index.add_argument("--run-dir", default=None, help="이 실행 하나만 색인")
+    p_index.add_argument("--force", action="store_true", help="이미 색인된 실행도 다시 읽기")
+
+    p_top = sub.add_parser("top", help="지표 상위 실행")
+    p_top.add_argument("--metric", default="sharpe",
+                       choices=run_registry.METRIC_COLUMNS + run_registry.WF_COLUMNS)
+    p_top.add_argument("--since", default=None, help="실행일 하한 (YYYY-MM-DD)")
+    p_top.add_argument("--until", default=None, help="실행일 상한 (YYYY-MM-DD)")
+    p_top.add_argument("--quarter", choices=["current", "last"], default=None, help="실행일 분기 (since/until 대신)")
+    p_top.add_argument("--strategy", default=None)
+    p_top.add_argument("--limit", type=int, default=10)
+    p_top.add_argument("--all-runs", action="store_true", help="전략별 최고 1건 대신 모든 실행")
+    p_top.add_argument("--json", action="store_true")
+
+    p_cmp = sub.add_parser("compare", help="실행 간 비교 리포트")
+    p_cmp.add_argument("run_ids", nargs="+")
+    p_cmp.add_argument("--start", default=None, help="구간 지표 시작일 (기본: 공통 구간)")
+    p_cmp.add_argument("--end", default=None)
+    p_cmp.add_argument("--output", default=None, help="Markdown 저장 경로 (기본: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.command == "index":
+        registry = args.registry or (run_registry.default_path(args.run_dir) if args.run_dir
+                                     else os.path.join(args.runs, run_registry.REGISTRY_FILE))
+        if args.run_dir:
+            count = int(run_registry.index_run(registry, args.run_dir))
+        else:
+            count = run_registry.index_tree(registry, args.runs, force=args.force)
+        print(f"[Registry] {count}건 색인: {registry}", file=sys.stderr)
+        return
+
+    registry = args.registry or os.path.join(RUNS_DIR, run_registry.REGISTRY_FILE)
+    if not os.path.exists(registry):
+        print(f"[Registry] 레지스트리 없음: {registry}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == "top":
+        since, until = quarter_range(args.quarter) if args.quarter else (args.since, args.until)
+        rows = run_registry.top_runs(registry, args.metric, since, until, args.strategy, args.limit,
+                                     per_strategy=not args.all_runs)
+        if args.json:
+            print(json.dumps(rows, indent=2, ensure_ascii=False))
+        else:
+            print(render_table(rows, ["run_id", "strategy", "run_date", args.metric,
+                                      *[c for c in ("cagr", "mdd", "oos_sharpe") if c != args.metric]]))
+        return
+
+    rows, curves = run_registry.load_runs(registry, args.run_ids)
+    unknown = set(args.run_ids) - {r["run_id"] for r in rows}
+    if unknown:
+        print(f"[Registry] 없는 실행: {', '.join(sorted(unknown))}", file=sys.stderr)
+    report = render_compare(rows, curves, args.start, args.end)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+        print(f"[Registry] 비교 리포트: {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,18 @@
 """Reporter Agent — 팩터 근거 + 성과 리포트 Markdown 생성"""
 import json, sys, os, argparse
 import pandas as pd
-from datetime import datetime
-
-def main():
-    parser = argparse.ArgumentParser(description="Reporter Agent")
-    parser.add_argument("--run-dir", required=True, help="runs/ 결과 디렉터리")
-    parser.add_argument("--signals", default=None, help="signals.csv 경로")
-    parser.add_argument("--weights", default=None, help="weights.json 경로")
-    args = parser.parse_args()
-
-    run_dir = args.run_dir
-    result_path = os.path.join(run_dir, "run_result.json")
-
-    if not os.path.exists(result_path):
-        print("[Reporter] run_result.json 없음", file=sys.stderr)
-        sys.exit(1)
-
-    with open(result_path) as f:
-        result = json.load(f)
-
-    # 시그널 로드
-    signals = None
-    if args.signals and os.path.exists(args.signals):
-        signals = pd.read_csv(args.signals, dtype={"code": str}, index_col="code")
-
-    # 비중 로드
-    weights = {}
-    if args.weights and os.path.exists(args.weights):
-        with open(args.weights) as f:
-            weights = json.load(f)
+from core import telemetry, run_registry
 
+def render_report(result: dict, signals: pd.DataFrame = None, weights: dict = None) -> str:
+    """run_result + 시그널 + 비중 → Markdown (입력만으로 결정 — 같은 입력이면 같은 리포트, 단계 캐시 전제)"""
+    weights = weights or {}
+    period = result.get("period", {})
     # Markdown 생성
     m = result.get("metrics", {})
     wf = result.get("walk_forward", {})
     lines = [
         f"# Quant Report: {result.get('strategy', 'unknown')}",
-        f"생성: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        f"기간: {str(period.get('start', ''))[:10]} ~ {str(period.get('end', ''))[:10]}",
         "",
         "## 성과 요약",
         "",
@@ -52,7 +28,28 @@ def main():
     ]
 
     # Walk-forward
-    if wf:
+    if wf.get("folds"):
+        agg = wf.get("aggregate", {})
+        lines += [
+            f"## Walk-Forward 검증 ({wf.get('mode', 'rolling')}, {agg.get('folds', len(wf['folds']))} folds)",
+            "",
+            "| Fold | 테스트 구간 | IS Sharpe | OOS Sharpe | OOS 수익률 | OOS MDD |",
+            "|------|------------|-----------|------------|-----------|---------|",
+        ]
+        for f in wf["folds"]:
+            tr, te = f["train_metrics"], f["test_metrics"]
+            lines.append(f"| {f['fold']} | {f['test']['start']} ~ {f['test']['end']} | {tr['sharpe']:.2f} | "
+                         f"{te['sharpe']:.2f} | {te['total_return']:.2%} | {te['mdd']:.2%} |")
+        degradation = agg.get("sharpe_degradation")
+        lines += [
+            "",
+            f"- 평균 Sharpe: IS {agg.get('in_sample_mean', {}).get('sharpe', 0):.2f} / "
+            f"OOS {agg.get('out_of_sample_mean', {}).get('sharpe', 0):.2f}"
+            + (f" (저하 {degradation:.0%})" if degradation is not None else ""),
+            f"- OOS 양(+)수익 fold 비율: {agg.get('oos_positive_folds', 0):.0%}",
+            "",
+        ]
+    elif wf:
         is_m = wf.get("in_sample", {})
         oos_m = wf.get("out_of_sample", {})
         lines += [
@@ -64,9 +61,28 @@ def main():
             f"| Out-of-Sample (30%) | {oos_m.get('sharpe', 0):.2f} | {oos_m.get('cagr', 0):.2%} | {oos_m.get('mdd', 0):.2%} |",
             "",
         ]
-        if "warning" in wf:
-            lines.append(f"> **경고**: {wf['warning']}")
-            lines.append("")
+    if "warning" in wf:
+        lines.append(f"> **경고**: {wf['warning']}")
+        lines.append("")
+
+    # 부트스트랩 유의성
+    boot = result.get("bootstrap")
+    if boot:
+        lines += [
+            f"## 부트스트랩 유의성 ({boot['method']}, block {boot['block']}, {boot['samples']}회)",
+            "",
+            f"| 지표 | 추정치 | {boot['confidence']:.0%} 신뢰구간 |",
+            "|------|--------|-------------|",
+            f"| Sharpe | {boot['sharpe']['estimate']:.2f} | {boot['sharpe']['ci'][0]:.2f} ~ {boot['sharpe']['ci'][1]:.2f} |",
+            f"| CAGR | {boot['cagr']['estimate']:.2%} | {boot['cagr']['ci'][0]:.2%} ~ {boot['cagr']['ci'][1]:.2%} |",
+            f"| MDD | {boot['mdd']['estimate']:.2%} | {boot['mdd']['ci'][0]:.2%} ~ {boot['mdd']['ci'][1]:.2%} |",
+            "",
+            f"- PSR (Sharpe > 0): {boot['psr']:.1%} / 재표본 Sharpe ≤ 0 비율: {boot['p_sharpe_le_0']:.1%}",
+            f"- DSR (시행 {boot['trials']}회, 기준 Sharpe {boot['sharpe_threshold']:.2f}): {boot['dsr']:.1%}",
+            "",
+        ]
+        if "warning" in boot:
+            lines += [f"> **경고**: {boot['warning']}", ""]
 
     # 편입 종목 + 팩터 근거
     if weights and signals is not None and not signals.empty:
@@ -104,11 +120,56 @@ def main():
         "*Generated by InvestQuant Pipeline*",
     ]
 
-    report = "\n".join(lines)
+    return "\n".join(lines)
+
+def write_outputs(report: str, run_dir: str) -> str:
     out_path = os.path.join(run_dir, "report.md")
     with open(out_path, "w") as f:
         f.write(report)
     print(f"[Reporter] 리포트 생성: {out_path}")
+    return out_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reporter Agent")
+    parser.add_argument("--run-dir", required=True, help="runs/ 결과 디렉터리")
+    parser.add_argument("--signals", default=None, help="signals.csv 경로")
+    parser.add_argument("--weights", default=None, help="weights.json 경로")
+    parser.add_argument("--registry", default=None,
+                        help=f"실행 레지스트리 경로 (기본: <run-dir 상위>/{run_registry.REGISTRY_FILE})")
+    parser.add_argument("--no-registry", action="store_true", help="실행 레지스트리 기록 안 함")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with telemetry.session("reporter_agent", args.telemetry, args.profile) as tel:
+        run_dir = args.run_dir
+        result_path = os.path.join(run_dir, "run_result.json")
+
+        if not os.path.exists(result_path):
+            print("[Reporter] run_result.json 없음", file=sys.stderr)
+            sys.exit(1)
+
+        with telemetry.phase(tel, "load"):
+            with open(result_path) as f:
+                result = json.load(f)
+
+            # 시그널 로드
+            signals = None
+            if args.signals and os.path.exists(args.signals):
+                signals = pd.read_csv(args.signals, dtype={"code": str}, index_col="code")
+
+            # 비중 로드
+            weights = {}
+            if args.weights and os.path.exists(args.weights):
+                with open(args.weights) as f:
+                    weights = json.load(f)
+
+        with telemetry.phase(tel, "compute"):
+            report = render_report(result, signals, weights)
+        telemetry.count(tel, signals=len(signals) if signals is not None else 0, holdings=len(weights))
+        with telemetry.phase(tel, "write"):
+            out_path = write_outputs(report, run_dir)
+            if not args.no_registry:
+                run_registry.attach_report(args.registry or run_registry.default_path(run_dir), run_dir, out_path)
 
 if __name__ == "__main__":
     main()
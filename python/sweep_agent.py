@@ -0,0 +1,248 @@
+"""Sweep Agent — 전략 스펙 파라미터 스윕 (그리드 / 랜덤 서치)
+
+패널·재무 데이터는 한 번만 로드하고, 변형들이 공유하는 팩터 백분위는 고유 정의당
+한 번만 계산해 공유 메모리에 올린 뒤 포트폴리오/백테스트 평가를 프로세스 풀로 분산.
+
+그리드 JSON: {"factors.mom_60d.lookback": [20, 60, 120], "portfolio.n": [10, 20]}
+rebalance.* 를 바꾼 변형은 리밸런싱 일정을 패널 기간으로 다시 계산 (data_agent와 같은 규칙).
+랜덤 서치는 값 목록 대신 {"min": 0.1, "max": 0.4} 범위도 허용 (정수끼리면 정수 샘플). 그리드는 목록만.
+파이프라인과 같은 평가: cost_model.execution이면 거래량도 공유해 체결 시뮬레이션,
+signal.history면 변형마다 리밸런싱일별 시그널 이력 → 비중 스케줄로 백테스트.
+"""
+import json, sys, os, argparse, copy, itertools, random
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+from core.schemas import load_and_validate, validate
+from core.panel import load_price_panel, load_fundamentals
+from core.shared import share_array, attach_array, release
+from core.data_clock import get_rebalance_dates
+from factor_agent import universe, factor_ranks, combine_scores, signal_history
+from portfolio_agent import build_weights, weight_history
+from backtest_agent import run_backtest, calc_metrics, backtest_targets, holdings_count
+
+def set_param(spec: dict, path: str, value):
+    """점 경로에 값 설정. 'factors.<id>.<field>'는 factors 배열에서 id로 찾음."""
+    keys = path.split(".")
+    node = spec
+    for k in keys[:-1]:
+        if isinstance(node, list):
+            match = [f for f in node if isinstance(f, dict) and f.get("id") == k]
+            if not match:
+                raise KeyError(f"{path}: factor id '{k}' 없음")
+            node = match[0]
+        else:
+            node = node.setdefault(k, {})
+    node[keys[-1]] = value
+
+def apply_params(spec: dict, params: dict) -> dict:
+    variant = copy.deepcopy(spec)
+    for path, value in params.items():
+        set_param(variant, path, value)
+    return variant
+
+def expand_grid(grid: dict) -> list[dict]:
+    """그리드 → 전체 조합 (값은 목록만 — {"min", "max"} 범위는 랜덤 서치 전용)"""
+    for path, dom in grid.items():
+        if not isinstance(dom, list):
+            raise ValueError(f"{path}: 그리드 값은 목록이어야 함 (범위는 --random에서만 사용)")
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+def sample_params(space: dict, n: int, seed: int = 0) -> list[dict]:
+    """랜덤 서치: 목록이면 균등 선택, {"min", "max"}면 균등 분포 (중복 조합 제거)"""
+    rng = random.Random(seed)
+    seen, out = set(), []
+    for _ in range(n * 10):
+        if len(out) >= n:
+            break
+        params = {}
+        for path, dom in space.items():
+            if isinstance(dom, dict):
+                lo, hi = dom["min"], dom["max"]
+                params[path] = rng.randint(lo, hi) if isinstance(lo, int) and isinstance(hi, int) \
+                    else round(rng.uniform(lo, hi), 6)
+            else:
+                params[path] = rng.choice(dom)
+        key = json.dumps(params, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            out.append(params)
+    return out
+
+def factor_key(fspec: dict) -> str:
+    """팩터 정의 정규화 키 (id 제외 — 같은 정의면 id가 달라도 재사용)"""
+    return json.dumps({k: v for k, v in fspec.items() if k != "id"}, sort_keys=True)
+
+# --- 워커 상태 (공유 메모리 뷰) ---
+_STATE = {}
+
+def _init_worker(close_handle: dict, ranks_handle: dict, dates: list, close_codes: list, codes: list,
+                 volume_handle: dict = None, fundamentals: pd.DataFrame = None):
+    shm_close, close = attach_array(close_handle)
+    shm_ranks, ranks = attach_array(ranks_handle)
+    index = pd.DatetimeIndex(dates)
+    _STATE.update({
+        "shm": [shm_close, shm_ranks],
+        "close": pd.DataFrame(close, index=index, columns=close_codes, copy=False),
+        "ranks": ranks,
+        "codes": codes,
+        "volume": None,
+        "fundamentals": fundamentals if fundamentals is not None else pd.DataFrame(),
+    })
+    if volume_handle is not None:
+        shm_volume, volume = attach_array(volume_handle)
+        _STATE["shm"].append(shm_volume)
+        _STATE["volume"] = pd.DataFrame(volume, index=index, columns=close_codes, copy=False)
+
+def evaluate_variant(task: tuple) -> dict:
+    """변형 하나: 공유 팩터 백분위 조합(signal.history면 기준일별 시그널 이력) → 비중 → 백테스트 → 지표"""
+    idx, spec, rows, rebal_dates = task
+    close = _STATE["close"]
+    if spec["signal"].get("history"):
+        history = signal_history(spec, close, _STATE["fundamentals"], rebal_dates)
+        weights = weight_history(history, spec, prices=close)
+    else:
+        factor_df = pd.DataFrame({fid: _STATE["ranks"][row] for fid, row in rows.items()}, index=_STATE["codes"])
+        signals = combine_scores(factor_df, spec["signal"]["weights"], spec["signal"].get("method", "rank_sum"))
+        weights = build_weights(signals, spec, prices=close)
+    targets = backtest_targets(spec, close, weights, rebal_dates)
+    port_ret, trades = run_backtest(close, targets, spec["cost_model"], rebal_dates, _STATE["volume"])
+    return {"variant": idx, **calc_metrics(port_ret), "holdings": holdings_count(weights),
+            "trades": len(trades)}
+
+def variant_rebalance_dates(spec: dict, variant: dict, close: pd.DataFrame, rebal_dates: list, cache: dict) -> list:
+    """변형의 리밸런싱 일정 — rebalance가 기본 스펙과 같으면 입력 일정, 다르면 패널 기간으로 재계산"""
+    if variant["rebalance"] == spec["rebalance"] or close.empty:
+        return rebal_dates
+    freq = variant["rebalance"]["freq"]
+    if freq not in cache:
+        cache[freq] = get_rebalance_dates(close.index[0].strftime("%Y-%m-%d"),
+                                          close.index[-1].strftime("%Y-%m-%d"), freq)
+    return cache[freq]
+
+def run_sweep(spec: dict, param_sets: list[dict], close: pd.DataFrame, fundamentals: pd.DataFrame,
+              rebal_dates: list, workers: int = None, rank_by: str = "sharpe",
+              volume: pd.DataFrame = None) -> pd.DataFrame:
+    """변형 전체 평가 → rank_by 내림차순 결과 표
+
+    volume: (날짜 × 종목) 거래량 — cost_model.execution 변형의 체결 시뮬레이션용 (없으면 고정 비용)
+    """
+    codes = universe(close, fundamentals)
+
+    # 변형 생성 + 검증
+    variants, failed = [], []
+    for i, params in enumerate(param_sets):
+        try:
+            variant = apply_params(spec, params)
+            errors = validate(variant)
+        except Exception as e:  # 잘못된 경로·타입 — 해당 변형만 실패 처리
+            failed.append({"variant": i, "error": f"{type(e).__name__}: {e}"})
+            continue
+        if errors:
+            failed.append({"variant": i, "error": "; ".join(errors)})
+            continue
+        variants.append((i, variant))
+
+    # 고유 팩터 정의별 백분위 1회 계산 (signal.history 변형은 워커에서 기준일별로 계산)
+    unique, rows_per_variant = {}, []
+    for _, variant in variants:
+        rows = {}
+        for fspec in ([] if variant["signal"].get("history") else variant["factors"]):
+            rows[fspec["id"]] = unique.setdefault(factor_key(fspec), (len(unique), fspec))[0]
+        rows_per_variant.append(rows)
+    ordered = sorted(unique.values(), key=lambda x: x[0])
+    # 고유 정의끼리 id가 겹칠 수 있어 순번 id로 일괄 계산 (공통 부분식 공유)
+    ranks = factor_ranks([{**f, "id": f"#{k}"} for k, f in ordered], close, fundamentals, codes) \
+        .to_numpy(dtype=float).T if ordered else np.zeros((0, len(codes)))
+    print(f"[SweepAgent] 변형 {len(variants)}개 (실패 {len(failed)}) / 고유 팩터 {len(ordered)}개", file=sys.stderr)
+
+    blocks = []
+    try:
+        shm_close, close_handle = share_array(close.to_numpy(dtype=float))
+        blocks.append(shm_close)
+        shm_ranks, ranks_handle = share_array(ranks)
+        blocks.append(shm_ranks)
+        volume_handle = None
+        if volume is not None and any(v["cost_model"].get("execution") for _, v in variants):
+            shm_volume, volume_handle = share_array(volume.reindex(index=close.index, columns=close.columns)
+                                                    .to_numpy(dtype=float))
+            blocks.append(shm_volume)
+        history = any(v["signal"].get("history") for _, v in variants)
+        init_args = (close_handle, ranks_handle, list(close.index), list(close.columns), codes,
+                     volume_handle, fundamentals if history else None)
+        schedules = {}
+        tasks = [(i, v, rows, variant_rebalance_dates(spec, v, close, rebal_dates, schedules))
+                 for (i, v), rows in zip(variants, rows_per_variant)]
+
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(tasks) < 2:
+            _init_worker(*init_args)
+            results = [evaluate_variant(t) for t in tasks]
+        else:
+            chunk = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                results = list(pool.map(evaluate_variant, tasks, chunksize=chunk))
+    finally:
+        attached = _STATE.pop("shm", [])
+        _STATE.clear()  # 뷰 참조 해제 후 close
+        for shm in attached:
+            shm.close()
+        release(blocks)
+
+    table = pd.DataFrame(results + failed)
+    if table.empty:
+        return table
+    params = pd.DataFrame(param_sets)
+    params.index.name = "variant"
+    table = table.merge(params.reset_index(), on="variant", how="left")
+    if rank_by in table.columns:
+        table = table.sort_values(rank_by, ascending=False, na_position="last").reset_index(drop=True)
+    table.insert(0, "rank", range(1, len(table) + 1))
+    return table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep Agent")
+    parser.add_argument("--spec", required=True)
+    parser.add_argument("--input", required=True, help="data_agent 출력 디렉터리")
+    parser.add_argument("--grid", required=True, help="파라미터 공간 JSON 경로")
+    parser.add_argument("--random", type=int, default=0, help="랜덤 서치 표본 수 (0이면 그리드 전체)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="평가 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--rank-by", default="sharpe", help="정렬 지표")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args(argv)
+
+    spec = load_and_validate(args.spec)
+    with open(args.grid) as f:
+        space = json.load(f)
+    try:
+        param_sets = sample_params(space, args.random, args.seed) if args.random else expand_grid(space)
+    except ValueError as e:
+        parser.error(str(e))
+
+    fields = ["close", "volume"] if any(k.startswith("cost_model.execution") for k in space) \
+        or spec["cost_model"].get("execution") else ["close"]
+    panel = load_price_panel(args.input, fields)
+    close = panel.get("close", pd.DataFrame())
+    fundamentals = load_fundamentals(args.input)
+    rebal_path = os.path.join(args.input, "rebalance_dates.json")
+    rebal_dates = json.load(open(rebal_path)) if os.path.exists(rebal_path) else []
+
+    table = run_sweep(spec, param_sets, close, fundamentals, rebal_dates,
+                      workers=args.workers, rank_by=args.rank_by, volume=panel.get("volume"))
+
+    os.makedirs(args.output, exist_ok=True)
+    table.to_csv(os.path.join(args.output, "sweep_results.csv"), index=False)
+    best = table.iloc[0].to_dict() if not table.empty else {}
+    with open(os.path.join(args.output, "sweep_summary.json"), "w") as f:
+        json.dump({"strategy": spec["name"], "variants": len(param_sets), "rank_by": args.rank_by,
+                   "best": best}, f, indent=2, default=str)
+
+    print(f"[SweepAgent] {len(table)}개 변형 평가 완료 ({args.rank_by} 기준)")
+    for _, row in table.head(5).iterrows():
+        params = ", ".join(f"{k}={row[k]}" for k in space)
+        print(f"  #{int(row['rank'])} {args.rank_by}={row.get(args.rank_by)} | {params}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""python/ 디렉터리를 import 경로에 추가 (에이전트 모듈 · core 패키지) + 공용 가격 픽스처"""
+import os, sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def make_close():
+    """시드 고정 랜덤워크 종가 (날짜 × 종목, 종목 코드 000000…) 생성 함수
+
+    vol: 일 변동성 (스칼라 또는 종목별 배열), halts: 거래 정지(NaN) 비율
+    """
+    def make(T=200, N=6, seed=0, vol=0.01, drift=0.0, start="2023-01-02", halts=0.0):
+        rng = np.random.default_rng(seed)
+        X = 100 * np.exp(np.cumsum(rng.normal(drift, vol, (T, N)), axis=0))
+        if halts:
+            X[rng.random((T, N)) < halts] = np.nan
+        return pd.DataFrame(X, index=pd.bdate_range(start, periods=T), columns=[f"{j:06d}" for j in range(N)])
+    return make
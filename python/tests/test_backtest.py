@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from backtest_agent import run_backtest
+
+def _reference(close: pd.DataFrame, schedule: pd.DataFrame, rebal_dates: list, fee_bps: float, slip_bps: float):
+    """일자별 루프: 리밸런싱일에 목표 비중으로 복귀 (편도 회전율 × 왕복 비용), 사이 구간은 보유 금액 드리프트"""
+    R = close.pct_change().fillna(0).to_numpy()
+    dates = close.index
+    starts = {0} | {int(dates.searchsorted(pd.Timestamp(d))) for d in rebal_dates}
+    holdings, cash, out = np.zeros(close.shape[1]), 1.0, []
+    for t in range(len(dates)):
+        cost = 0.0
+        if t in starts:
+            value = holdings.sum() + cash
+            drift = holdings / value
+            past = schedule[schedule.index <= dates[t]]
+            target = past.iloc[-1].reindex(close.columns, fill_value=0).to_numpy() if len(past) \
+                else np.zeros(close.shape[1])
+            cost = 0.5 * np.abs(target - drift).sum() * 2 * (fee_bps + slip_bps) / 10000
+            holdings, cash = target.copy(), 1.0 - target.sum()
+        before = holdings.sum() + cash
+        holdings = holdings * (1 + R[t])
+        out.append((holdings.sum() + cash) / before - 1 - cost)
+    return np.array(out)
+
+def test_run_backtest_matches_daily_loop(make_close):
+    close = make_close(T=120, vol=0.015)
+    rebal = ["2023-02-01", "2023-03-04", "2023-04-03", "2023-05-01"]  # 03-04는 토요일 → 다음 거래일
+    # 종목이 바뀌는 스케줄 · 행 합 < 1 (현금) · 첫 행은 첫 거래일 이후
+    schedule = pd.DataFrame([[0.3, 0.3, 0.2, 0.0, 0.0],
+                             [0.0, 0.25, 0.25, 0.25, 0.25],
+                             [0.5, 0.0, 0.0, 0.0, 0.2]],
+                            index=pd.to_datetime(["2023-01-20", "2023-03-04", "2023-04-03"]),
+                            columns=list(close.columns[:5]))
+    ret, trades = run_backtest(close, schedule, {"fee_bps": 3, "slippage_bps": 5}, rebal)
+    np.testing.assert_allclose(ret.to_numpy(), _reference(close, schedule, rebal, 3, 5), atol=1e-12)
+    assert {t["date"] for t in trades} == {"2023-02-01", "2023-03-06", "2023-04-03", "2023-05-01"}
+
+def test_run_backtest_fixed_weights_match_daily_loop(make_close):
+    close = make_close(T=120, seed=1, vol=0.015)
+    weights = {"000000": 0.4, "000003": 0.35, "000005": 0.25}
+    rebal = ["2023-02-01", "2023-03-01", "2023-04-03", "2023-05-01", "2023-06-01"]
+    ret, _ = run_backtest(close, weights, {"fee_bps": 10, "slippage_bps": 20}, rebal)
+    schedule = pd.DataFrame([weights], index=[close.index[0]])
+    np.testing.assert_allclose(ret.to_numpy(), _reference(close, schedule, rebal, 10, 20), atol=1e-12)
@@ -0,0 +1,29 @@
+import numpy as np
+from core.bootstrap import bootstrap_metrics, resample_indices
+from core.metrics import batch_metrics, month_labels
+
+def _returns(n=300, seed=0):
+    return np.random.default_rng(seed).normal(0.0005, 0.01, n)
+
+def test_same_seed_same_resamples():
+    r = _returns()
+    a = bootstrap_metrics(r, samples=64, block=5, seed=7, max_bytes=200_000)  # 여러 chunk
+    b = bootstrap_metrics(r, samples=64, block=5, seed=7, max_bytes=200_000)
+    assert all(len(a[k]) == 64 for k in a)
+    for k in a:
+        np.testing.assert_array_equal(a[k], b[k])
+
+def test_matrix_scoring_matches_per_sample():
+    r = _returns(seed=1)
+    months = month_labels(None, len(r))
+    idx = resample_indices(np.random.default_rng(3), len(r), 16, 5)
+    scored = batch_metrics(r[idx], months)
+    for j in range(idx.shape[1]):
+        col = batch_metrics(r[idx[:, j]], months)
+        for k in scored:
+            np.testing.assert_allclose(scored[k][j], col[k][0])
+
+def test_circular_blocks_are_contiguous():
+    idx = resample_indices(np.random.default_rng(0), 100, 8, 10, "circular")
+    steps = (np.diff(idx, axis=0) % 100)[np.arange(1, 100) % 10 != 0]
+    assert (steps == 1).all()
@@ -0,0 +1,32 @@
+import numpy as np
+from core.constraints import cap_weights, project_weights, violations
+
+def _weights(seed=0, K=20, N=15):
+    rng = np.random.default_rng(seed)
+    W = rng.gamma(0.5, size=(K, N))
+    return W / W.sum(axis=1, keepdims=True)
+
+SECTORS = np.array([0, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 4, 4, 5])
+
+def test_cap_weights_feasible_and_fully_invested():
+    W = cap_weights(_weights(), 0.12, SECTORS, 0.3)
+    np.testing.assert_allclose(W.sum(axis=1), 1.0)
+    assert violations(W, 0.12, SECTORS, 0.3).max() < 1e-9
+
+def test_infeasible_caps_leave_cash():
+    # 종목 상한 합 0.6+0.6 가능해도 섹터 상한 0.4 × 2 = 0.8 — 초과분은 재정규화하지 않고 현금
+    sectors = np.array([0, 0, 0, 0, 1, 1])
+    W = np.full((1, 6), 1 / 6)
+    for capped in (cap_weights(W, 0.3, sectors, 0.4), project_weights(W, 0.3, sectors, 0.4, W, 0.1)):
+        assert violations(capped, 0.3, sectors, 0.4).max() < 1e-9
+        np.testing.assert_allclose(capped.sum(axis=1), 0.8)
+
+def test_batch_rows_match_single_rows():
+    W = _weights(1)
+    batch = cap_weights(W, 0.1, SECTORS, 0.25)
+    np.testing.assert_allclose(batch, np.vstack([cap_weights(w[None], 0.1, SECTORS, 0.25) for w in W]))
+
+def test_project_weights_meets_all_constraints():
+    prev = cap_weights(_weights(2), 0.15, SECTORS, 0.35)
+    W = project_weights(_weights(3), 0.15, SECTORS, 0.35, prev, 0.4)
+    assert violations(W, 0.15, SECTORS, 0.35, prev, 0.4).max() < 1e-9
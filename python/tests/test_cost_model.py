@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from backtest_agent import run_backtest
+from core.cost_model import simulate_execution, apply_cost_to_return
+
+def test_unlimited_capacity_matches_flat_cost(make_close):
+    # 체결 한도 없음 + 충격 계수 0 → 리밸런싱일 전량 체결, 비용은 고정 비용 경로와 같음
+    rng = np.random.default_rng(0)
+    T, N = 60, 4
+    trade = rng.normal(0, 0.2, (3, N))
+    starts = np.array([0, 20, 40])
+    out = simulate_execution(trade, starts, rng.normal(0, 0.01, (T, N)), np.full((T, N), np.inf),
+                             np.full((T, N), 0.02), 3, 5, 0.1, 0.0)
+    turnover = 0.5 * np.abs(trade).sum(axis=1)
+    np.testing.assert_allclose(out["cost"][starts], -apply_cost_to_return(0.0, turnover, 3, 5))
+    assert not out["cost"][np.setdiff1d(np.arange(T), starts)].any() and not out["adjust"].any()
+    assert (out["filled"] == 1).all() and (out["days"] == 0).all()
+
+    close = make_close(T=120, vol=0.015)
+    rebal = ["2023-02-01", "2023-03-01", "2023-04-03", "2023-05-01"]
+    weights = {"000000": 0.4, "000002": 0.35, "000004": 0.25}
+    volume = pd.DataFrame(np.inf, index=close.index, columns=close.columns)
+    flat, _ = run_backtest(close, weights, {"fee_bps": 3, "slippage_bps": 5}, rebal)
+    simulated, _ = run_backtest(close, weights, {"fee_bps": 3, "slippage_bps": 5,
+                                                 "execution": {"impact_coef": 0.0}}, rebal, volume)
+    np.testing.assert_allclose(simulated.to_numpy(), flat.to_numpy(), atol=1e-12)
+
+def test_binding_participation_carries_unfilled_to_next_order():
+    # 일 0.1씩만 체결 — 첫 구간(3일) 매수 0.5 중 0.3 체결, 남은 0.2는 다음 리밸런싱 주문(+0.1)에 합산
+    T, N = 6, 1
+    returns = np.full((T, N), 0.01)
+    out = simulate_execution(np.array([[0.5], [0.1]]), np.array([0, 3]), returns, np.full((T, N), 0.1),
+                             np.zeros((T, N)), 0, 0, 0.1, 0.0)
+    np.testing.assert_allclose(out["filled"][:, 0], [0.6, 1.0])
+    np.testing.assert_array_equal(out["days"][:, 0], [-1, 2])
+    # 미체결 비중은 현금 — 수익률 보정 = −(미체결 비중 × 수익률)
+    np.testing.assert_allclose(out["adjust"], -0.01 * np.array([0.4, 0.3, 0.2, 0.2, 0.1, 0.0]))
@@ -0,0 +1,23 @@
+import json, os
+import pytest
+from core.factor_expr import compile_formulas
+from core.schemas import validate
+
+STRATEGIES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "strategies")
+
+def test_known_names_compile():
+    program = compile_formulas({"a": "1/PER + roe * Debt_Ratio", "b": "ret(20) / vol(20)"})
+    assert program["columns"] == {"per", "roe", "debt_ratio"}
+    assert program["fields"] == {"close"}
+
+@pytest.mark.parametrize("formula", ["1/PRE", "ma(price, 5)", "roe - eps"])
+def test_unknown_name_rejected(formula):
+    with pytest.raises(ValueError, match="알 수 없는 이름"):
+        compile_formulas({"a": formula})
+
+def test_spec_validation_reports_typo():
+    with open(os.path.join(STRATEGIES_DIR, "low_per_high_roe.json")) as f:
+        spec = json.load(f)
+    assert validate(spec) == []
+    spec["factors"][0]["formula"] = "1/PRE"
+    assert any("pre" in e for e in validate(spec))
@@ -0,0 +1,74 @@
+import json, os
+import numpy as np
+import pandas as pd
+from core import factor_store
+from core.factor_expr import compile_formulas, evaluate, evaluate_history
+from core.panel import VERSION_ATTR, version_table
+
+FORMULAS = {"mom": "ret(20, skip=2) * 100", "lowvol": "-vol(15)", "trend": "close / ma(close, 10) - 1"}
+
+def _close(make_close, seed=0):
+    close = make_close(T=160, N=10, seed=seed, halts=0.02)
+    close.iloc[:30, 2] = np.nan                      # 늦은 상장
+    return close
+
+def _versioned(close, revs=None):
+    """data_agent가 싣는 종목별 원천 버전 표 부착 (revs: 바꿀 종목 → rev)"""
+    close.attrs[VERSION_ATTR] = version_table({c: (revs or {}).get(c, f"{j + 1:016x}") for j, c in enumerate(close.columns)})
+    return close
+
+def test_store_fetch_matches_full_compute(tmp_path, make_close):
+    program = compile_formulas(FORMULAS)
+    full = _versioned(_close(make_close))
+    codes = list(full.columns)
+    empty = pd.DataFrame()
+    # 1) 짧은 구간·일부 종목으로 저장소 채움 → 2) 날짜·종목이 늘어난 패널을 저장소로 계산
+    part = full.iloc[:120, :7]
+    np.testing.assert_allclose(evaluate(program, part, empty, list(part.columns), store=str(tmp_path)),
+                               evaluate(program, part, empty, list(part.columns)))
+    np.testing.assert_allclose(evaluate(program, full, empty, codes, store=str(tmp_path)),
+                               evaluate(program, full, empty, codes))
+    # 과거 종가가 정정된 종목은 저장값을 버리고 다시 계산
+    revised = full.copy()
+    revised.iloc[50, 4] *= 1.1
+    _versioned(revised, {codes[4]: "ff" * 8})
+    np.testing.assert_allclose(evaluate(program, revised, empty, codes, store=str(tmp_path)),
+                               evaluate(program, revised, empty, codes))
+
+def test_store_history_matches_full_compute(tmp_path, make_close):
+    program = compile_formulas(FORMULAS)
+    close = _versioned(_close(make_close, seed=1))
+    codes = list(close.columns)
+    dates = [str(d.date()) for d in close.index[40::21]]
+    evaluate_history(program, close.iloc[:100], pd.DataFrame(), codes, dates[:2], store=str(tmp_path))
+    cached = evaluate_history(program, close, pd.DataFrame(), codes, dates, store=str(tmp_path))
+    fresh = evaluate_history(program, close, pd.DataFrame(), codes, dates)
+    for fid in FORMULAS:
+        np.testing.assert_allclose(cached[fid], fresh[fid])
+
+def test_store_serves_sub_windows_without_rewrite(tmp_path, make_close):
+    program = compile_formulas(FORMULAS)
+    full = _versioned(_close(make_close, seed=2))
+    codes = list(full.columns)
+    empty = pd.DataFrame()
+    evaluate(program, full, empty, codes, store=str(tmp_path))
+    metas = sorted(os.path.join(tmp_path, d, "meta.json") for d in os.listdir(tmp_path))
+    before = [json.load(open(m))["shape"] for m in metas]
+    # 앞부분·중간 구간 요청은 저장값에서 잘라 쓰고 (중간은 앞 lookback행 재계산) 항목은 그대로
+    for window in (full.iloc[:90], full.iloc[40:130]):
+        np.testing.assert_allclose(evaluate(program, window, empty, codes, store=str(tmp_path)),
+                                   evaluate(program, window, empty, codes))
+    assert [json.load(open(m))["shape"] for m in metas] == before
+    # 행 전체 비교 — 이동 평균 (lookback 10)
+    ma = lambda X: pd.DataFrame(X).rolling(10).mean().to_numpy()
+    factor_store.fetch(str(tmp_path), "ma10", full, ma, 10)
+    for window in (full.iloc[:70], full.iloc[25:120], full.iloc[150:]):
+        np.testing.assert_allclose(factor_store.fetch(str(tmp_path), "ma10", window, ma, 10),
+                                   ma(window.to_numpy()))
+    assert json.load(open(os.path.join(tmp_path, factor_store.entry_key("ma10"), "meta.json")))["shape"] == list(full.shape)
+
+def test_store_skipped_without_versions(tmp_path, make_close):
+    program = compile_formulas(FORMULAS)
+    close = _close(make_close, seed=3)
+    evaluate(program, close, pd.DataFrame(), list(close.columns), store=str(tmp_path))
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from backtest_agent import calc_metrics
+from core.metrics import batch_metrics, round_metrics, month_labels, rolling_sharpe, rolling_drawdown, \
+    RF_ANNUAL, TRADING_DAYS
+
+def _returns(T=400, K=5, seed=0):
+    rng = np.random.default_rng(seed)
+    R = rng.normal(0.0004, 0.012, (T, K))
+    R[:37, 1] = np.nan                                # 늦게 시작한 흐름 (NaN 패딩)
+    R[:250, 3] = np.nan
+    return pd.DataFrame(R, index=pd.bdate_range("2022-01-03", periods=T))
+
+def test_batch_columns_match_single_series():
+    R = _returns()
+    batch = batch_metrics(R.to_numpy(), month_labels(R.index))
+    for k in R.columns:
+        assert round_metrics(batch, k) == calc_metrics(R[k].dropna())
+
+def test_rolling_sharpe_matches_pandas():
+    R = _returns().dropna(axis=1)
+    rolling = R.rolling(60)
+    expected = (rolling.mean() - RF_ANNUAL / TRADING_DAYS) / rolling.std() * np.sqrt(TRADING_DAYS)
+    np.testing.assert_allclose(rolling_sharpe(R.to_numpy(), 60), expected.to_numpy(), rtol=1e-8, atol=1e-10)
+    # 변동 없는 창은 0 (pandas는 ±inf)
+    flat = rolling_sharpe(_returns().fillna(0).to_numpy(), 60)[:250, 3]
+    assert np.isnan(flat[:59]).all() and (flat[59:] == 0).all()
+
+def test_rolling_drawdown_matches_cummax():
+    R = _returns().fillna(0)
+    wealth = (1 + R).cumprod()
+    np.testing.assert_allclose(rolling_drawdown(R.to_numpy()), (wealth / wealth.cummax() - 1).to_numpy(),
+                               atol=1e-12)
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core import online_metrics
+from core.metrics import batch_metrics, month_labels, round_metrics
+
+def _returns(seed=0, T=400):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=T)
+    return pd.Series(rng.normal(0.0004, 0.012, T), index=dates)
+
+@pytest.mark.parametrize("splits", [[], [1], [37, 38, 120], [21, 22, 250, 399]])
+def test_online_matches_batch(splits):
+    ret = _returns()
+    months = month_labels(ret.index)
+    state = online_metrics.new_state()
+    bounds = [0, *splits, len(ret)]
+    for s, e in zip(bounds[:-1], bounds[1:]):
+        online_metrics.update(state, ret.to_numpy()[s:e], months[s:e])
+    assert online_metrics.metrics(state) == round_metrics(batch_metrics(ret.to_numpy(), months))
+
+def test_online_skips_nan_like_batch():
+    ret = _returns(1, 120)
+    ret.iloc[[5, 40, 41, 90]] = np.nan
+    months = month_labels(ret.index)
+    state = online_metrics.update(online_metrics.new_state(), ret.to_numpy(), months)
+    assert online_metrics.metrics(state) == round_metrics(batch_metrics(ret.to_numpy(), months))
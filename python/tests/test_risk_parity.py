@@ -0,0 +1,27 @@
+import numpy as np
+from portfolio_agent import risk_parity_matrix, weight_schedule
+
+VOLS = 0.01 * (1 + np.arange(6))  # 종목마다 다른 변동성
+
+def test_weights_ignore_rebalance_day_prices(make_close):
+    close = make_close(vol=VOLS)
+    codes = list(close.columns)
+    d = close.index[150]
+    shocked = close.copy()
+    shocked.loc[d:] *= np.linspace(0.5, 2.0, len(codes))  # d일 종가부터 변경
+    for weighting in ("erc", "inverse_vol"):
+        pconf = {"weighting": weighting, "risk_lookback": 60}
+        W = risk_parity_matrix(close, codes, [d], pconf)
+        W_shocked = risk_parity_matrix(shocked, codes, [d], pconf)
+        np.testing.assert_allclose(W, W_shocked)
+        assert abs(W.sum() - 1) < 1e-9
+
+def test_weight_schedule_uses_prior_data_only(make_close):
+    close = make_close(seed=1, vol=VOLS)
+    codes = list(close.columns)
+    spec = {"portfolio": {"method": "risk_parity", "risk_lookback": 60}}
+    rebal = [str(close.index[k].date()) for k in (80, 120, 160)]
+    base = weight_schedule(close, codes, rebal, spec)
+    shocked = close.copy()
+    shocked.iloc[160:] *= 3.0
+    np.testing.assert_allclose(base.to_numpy(), weight_schedule(shocked, codes, rebal, spec).to_numpy())
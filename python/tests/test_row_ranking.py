@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from factor_agent import (row_ranks, percentile_rank, percentile_rank_rows, winsorize, winsorize_rows,
+                          zscore, zscore_rows)
+
+def _matrix(seed=0, K=12, N=40):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(K, N))
+    X[:, ::7] = np.round(X[:, ::7], 1)           # 동점
+    X[rng.random((K, N)) < 0.15] = np.nan        # 결측
+    X[3] = np.nan                                # 전부 결측인 행
+    X[4, :] = 1.5                                # 전부 같은 값
+    X[5, 1:] = np.nan                            # 유효값 1개
+    return X
+
+def _by_rows(fn, X):
+    return np.vstack([fn(pd.Series(row)).to_numpy(dtype=float) for row in X])
+
+def test_row_ranks_match_series_rank():
+    X = _matrix()
+    ranks, count = row_ranks(X)
+    np.testing.assert_allclose(ranks, _by_rows(lambda s: s.rank(), X))
+    np.testing.assert_array_equal(count, (~np.isnan(X)).sum(axis=1))
+
+def test_percentile_rank_rows_match_series():
+    X = _matrix(1)
+    np.testing.assert_allclose(percentile_rank_rows(X), _by_rows(percentile_rank, X))
+
+def test_winsorize_rows_match_series():
+    X = _matrix(2)
+    np.testing.assert_allclose(winsorize_rows(X, 0.05, 0.95), _by_rows(lambda s: winsorize(s, 0.05, 0.95), X))
+
+def test_zscore_rows_match_series():
+    X = _matrix(3)
+    np.testing.assert_allclose(zscore_rows(X), _by_rows(zscore, X))
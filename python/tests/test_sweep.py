@@ -0,0 +1,53 @@
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+from core.data_clock import get_rebalance_dates
+from backtest_agent import evaluate
+from factor_agent import signal_history
+from portfolio_agent import weight_history
+from sweep_agent import run_sweep, expand_grid
+
+SPEC = {
+    "name": "sweep_test",
+    "universe": {"market": "KR"},
+    "rebalance": {"freq": "M"},
+    "factors": [{"id": "mom", "type": "price_momentum", "lookback": 20}],
+    "signal": {"method": "rank_sum", "weights": {"mom": 1.0}},
+    "portfolio": {"method": "top_n_equal", "n": 4},
+    "cost_model": {"fee_bps": 3, "slippage_bps": 5},
+    "risk_limits": {},
+}
+
+def test_rebalance_sweep_recomputes_schedule(make_close):
+    close = make_close(T=260, N=8)
+    dates, spec = close.index, SPEC
+    rebal = get_rebalance_dates("2023-01-02", str(dates[-1].date()), "M")
+    table = run_sweep(spec, [{"rebalance.freq": f} for f in ("M", "Q", "W")], close, pd.DataFrame(), rebal,
+                      workers=1).set_index("rebalance.freq")
+    assert table.loc["W", "trades"] > table.loc["M", "trades"] > table.loc["Q", "trades"]
+
+def test_invalid_variants_fail_without_aborting(make_close):
+    close = make_close(T=260, N=8)
+    rebal = get_rebalance_dates("2023-01-02", str(close.index[-1].date()), "M")
+    table = run_sweep(SPEC, [{"portfolio.n": "min"}, {"factors.nope.lookback": 5}, {"portfolio.n": 3}],
+                      close, pd.DataFrame(), rebal, workers=1).set_index("variant")
+    assert table.loc[0, "error"].startswith("TypeError") and table.loc[1, "error"].startswith("KeyError")
+    assert np.isfinite(table.loc[2, "sharpe"])
+    with pytest.raises(ValueError):
+        expand_grid({"portfolio.n": {"min": 2, "max": 6}})
+
+def test_variant_matches_pipeline_history_and_execution(make_close):
+    # signal.history + 체결 시뮬레이션 — 파이프라인 (시그널 이력 → 비중 스케줄 → 백테스트)과 같은 결과
+    close = make_close(T=260, N=8, seed=1)
+    volume = pd.DataFrame(np.random.default_rng(2).uniform(2e3, 2e4, close.shape), index=close.index,
+                          columns=close.columns)
+    spec = copy.deepcopy(SPEC)
+    spec["signal"]["history"] = True
+    spec["cost_model"]["execution"] = {"capital": 1e7, "max_participation": 0.05}
+    rebal = get_rebalance_dates("2023-01-02", str(close.index[-1].date()), "M")
+    table = run_sweep(spec, [{}], close, pd.DataFrame(), rebal, workers=1, volume=volume)
+    schedule = weight_history(signal_history(spec, close, pd.DataFrame(), rebal), spec, prices=close)
+    run_result, trades, _ = evaluate(spec, close, schedule, rebal, volume=volume)
+    assert table.loc[0, "trades"] == len(trades)
+    assert table.loc[0, "sharpe"] == pytest.approx(run_result["metrics"]["sharpe"])
@@ -0,0 +1,21 @@
+import pandas as pd
+from backtest_agent import evaluate
+
+def test_is_oos_reported_on_same_basis(make_close):
+    close = make_close(T=300, N=8, seed=3, drift=0.0003, start="2022-01-03")
+    dates = close.index
+    spec = {
+        "name": "wf_test",
+        "factors": [{"id": "mom", "type": "price_momentum", "lookback": 20, "skip": 0}],
+        "signal": {"weights": {"mom": 1.0}},
+        "portfolio": {"method": "top_n_equal", "n": 4},
+        "risk_limits": {},
+        "cost_model": {"fee_bps": 3, "slippage_bps": 5},
+        "walk_forward": {"mode": "rolling", "folds": 3, "workers": 1},
+    }
+    rebal = [str(d.date()) for d in dates[::21]]
+    result, _, _ = evaluate(spec, close, {c: 0.25 for c in close.columns[:4]}, rebal, pd.DataFrame())
+    wf = result["walk_forward"]
+    assert set(wf["in_sample"]) == set(wf["out_of_sample"])
+    assert wf["in_sample"] == wf["aggregate"]["in_sample_mean"]
+    assert wf["out_of_sample"] == wf["aggregate"]["out_of_sample_mean"]
@@ -0,0 +1,84 @@
+"""Python Worker — 에이전트 상주 실행기 (JSON-lines over stdio)
+
+Node 브릿지가 에이전트마다 python3를 새로 띄우는 대신, 이 프로세스 하나가
+pandas/numpy를 한 번만 import하고 요청을 받아 에이전트 main()을 in-process 실행.
+
+요청:  {"id": 1, "op": "run", "agent": "factor_agent", "args": ["--spec", ...]}
+       {"id": 2, "op": "ping"}
+응답:  {"id": 1, "ok": true, "stdout": "...", "stderr": "...", "duration_ms": 12}
+
+에이전트 실행은 전용 스레드 1개에서 순차 처리하고, ping은 입력 루프에서 즉시 응답.
+"""
+import io, json, os, sys, time, traceback, importlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr
+
+AGENTS = ["data_agent", "factor_agent", "portfolio_agent", "backtest_agent", "reporter_agent", "pipeline",
+          "registry", "daily_agent"]
+STARTED = time.time()
+
+def preload():
+    """무거운 의존성 선 import (첫 요청 지연 제거)"""
+    import numpy, pandas  # noqa: F401
+    for name in AGENTS:
+        importlib.import_module(name)
+
+def run_agent(agent: str, args: list) -> dict:
+    """에이전트 main(argv) 실행 — stdout/stderr는 응답에 담아 프로토콜 채널과 분리"""
+    if agent not in AGENTS:
+        return {"ok": False, "stdout": "", "stderr": "", "error": f"unknown agent: {agent}"}
+    out, err = io.StringIO(), io.StringIO()
+    ok, error = True, None
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            importlib.import_module(agent).main(args)
+        except SystemExit as e:
+            if e.code not in (0, None):
+                ok, error = False, f"exit {e.code}"
+        except Exception as e:
+            traceback.print_exc()
+            ok, error = False, f"{type(e).__name__}: {e}"
+    result = {"ok": ok, "stdout": out.getvalue(), "stderr": err.getvalue()}
+    if error:
+        result["error"] = error
+    return result
+
+def handle(request: dict) -> dict:
+    op = request.get("op", "run")
+    if op == "ping":
+        return {"ok": True, "pid": os.getpid(), "uptime_s": round(time.time() - STARTED, 1)}
+    if op == "run":
+        return run_agent(request.get("agent", ""), request.get("args", []))
+    return {"ok": False, "error": f"unknown op: {op}"}
+
+def main():
+    channel = sys.stdout
+    lock = threading.Lock()
+    runner = ThreadPoolExecutor(max_workers=1)
+
+    def respond(request: dict, start: float):
+        response = handle(request)
+        response["id"] = request.get("id")
+        response["duration_ms"] = int((time.time() - start) * 1000)
+        with lock:
+            channel.write(json.dumps(response, ensure_ascii=False) + "\n")
+            channel.flush()
+
+    preload()
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        start = time.time()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = {"op": "invalid"}
+        if request.get("op") == "run":
+            runner.submit(respond, request, start)
+        else:
+            respond(request, start)
+    runner.shutdown(wait=True)
+
+if __name__ == "__main__":
+    main()
@@ -71,6 +71,7 @@ const TARGETS = [
 
 const HIST_DIR = path.resolve(__dirname, '..', 'data', 'historical');
 const FUND_DIR = path.resolve(__dirname, '..', 'data', 'fundamentals');
+const MAX_VINTAGES = 12; // 종목별 보존할 과거 vintage 수 (사업보고서 기준 12년)
 
 async function collectPrice(stock) {
   try {
@@ -88,6 +89,23 @@ async function collectPrice(stock) {
   }
 }
 
+/**
+ * 기존 파일의 이전 vintage 보존 (data_agent 시점별 재무 조회용)
+ * 현재 결산기 이전 것만 남겨 같은 결산기 재수집분은 교체 (수집일이 찍힌 예전 vintage도 정리)
+ * — 결산기가 바뀔 때만 vintage가 늘고, 최근 MAX_VINTAGES개만 유지
+ */
+function priorVintages(outPath, reportDate) {
+  if (!fs.existsSync(outPath)) return [];
+  try {
+    const prev = JSON.parse(fs.readFileSync(outPath, 'utf-8'));
+    return [...(prev.history || []), ...(prev.ratios ? [prev.ratios] : [])]
+      .filter(r => r.reportDate < reportDate)
+      .slice(-MAX_VINTAGES);
+  } catch {
+    return [];
+  }
+}
+
 async function collectFundamental(stock) {
   try {
     const result = await scoreFundamental(stock.code, stock.cap, stock.shares);
@@ -97,18 +115,21 @@ async function collectFundamental(stock) {
     }
 
     const outPath = path.join(FUND_DIR, `${stock.code}.json`);
+    const ratios = {
+      per: result.ratios?.per || 0,
+      pbr: result.ratios?.pbr || 0,
+      roe: result.ratios?.roe || 0,
+      debtRatio: result.ratios?.debtRatio || 0,
+      operatingMargin: result.ratios?.operatingMargin || 0,
+      // 결산기말 (사업보고서 사업연도) — 공시 지연은 data_agent 래그(FINANCIAL_LAG_DAYS)로 반영
+      reportDate: `${result.year}-12-31`,
+    };
     fs.writeFileSync(outPath, JSON.stringify({
       code: stock.code,
       name: stock.name,
       score: result.score,
-      ratios: {
-        per: result.ratios?.per || 0,
-        pbr: result.ratios?.pbr || 0,
-        roe: result.ratios?.roe || 0,
-        debtRatio: result.ratios?.debtRatio || 0,
-        operatingMargin: result.ratios?.operatingMargin || 0,
-        reportDate: new Date().toISOString().slice(0, 10),
-      },
+      ratios,
+      history: priorVintages(outPath, ratios.reportDate),
       breakdown: result.breakdown,
     }, null, 2));
     logger.info(MOD, `재무: ${stock.name}(${stock.code}) 점수=${result.score}`);
@@ -349,6 +349,14 @@ app.get('/api/pipeline/status', (req, res) => {
   });
 });
 
+// Python 워커 헬스체크
+app.get('/api/pipeline/python-health', async (req, res) => {
+  const bridge = require('./modules/factor/python-bridge');
+  const health = await bridge.health();
+  const ok = health.workers.every(w => w.ok);
+  res.status(ok ? 200 : 503).json({ ok, ...health });
+});
+
 // 모니터링 상태
 app.get('/api/monitor/status', (req, res) => {
   const autoTraderData = path2.resolve(__dirname, '..', 'auto-trader', 'data');